@@ -1,4 +1,8 @@
 import argparse
+import datetime
+import ipaddress
+from cryptography import x509
+from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.hazmat.primitives import serialization
 from rich.console import Console
@@ -99,13 +103,54 @@ def inspect_keys():
     with open("public.pem") as f:
         console.print(Syntax(f.read(), "pem", theme="monokai", line_numbers=True))
 
+def self_signed_cert(common_name: str = "localhost", days: int = 365, cert_path: str = "cert.pem"):
+    """
+    Wrap the Ed25519 key from private.pem in a self-signed X.509 certificate,
+    e.g. for local TLS testing (echo-server). Run gen-ed first.
+    """
+    with open("private.pem", "rb") as f:
+        private_key = serialization.load_pem_private_key(f.read(), password=None)
+
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name) # self-signed: issuer == subject
+        .public_key(private_key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=days))
+        .add_extension(x509.SubjectAlternativeName([ # loopback IPs too, clients often dial 127.0.0.1
+            x509.DNSName(common_name),
+            x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+            x509.IPAddress(ipaddress.ip_address("::1")),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(private_key, algorithm=None) # Ed25519 signs without a separate hash
+    )
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+    console.print(
+        Panel.fit(
+            f"[bold green] ✅ Self-signed certificate for {common_name} [/bold green]\n"
+            f"Saved as: [cyan]{cert_path}[/cyan] (key: [cyan]private.pem[/cyan])",
+            border_style="green"
+        )
+    )
+
     
 if __name__ == "__main__": #Standard Python “main guard” so the script runs when executed directly.
     parser = argparse.ArgumentParser(description="Key management tool")
-    parser.add_argument("command", choices=["gen-ed", "inspect"], help="command to run")
+    parser.add_argument("command", choices=["gen-ed", "inspect", "self-signed"], help="command to run")
+    parser.add_argument("--cn", default="localhost", help="certificate common name (self-signed)")
+    parser.add_argument("--days", type=int, default=365, help="certificate validity (self-signed)")
     args = parser.parse_args()
 
     if args.command == "gen-ed":
         ed_gen_key()
     elif args.command == "inspect":
-        inspect_keys()
\ No newline at end of file
+        inspect_keys()
+    elif args.command == "self-signed":
+        self_signed_cert(args.cn, args.days)
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Save / load times and file sizes: CSV vs Parquet vs Arrow IPC (Feather).
+
+"read" is file -> DataFrame only (parsing), "load" is the whole load_csv/load_columnar
+into a ContactBook (validation + indexes included, the same for every format).
+
+python bench_columnar.py --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import columnar
+from contact import Contact
+from contact_book import ContactBook
+
+FORMATS = [ # (label, file name, compression)
+    ("csv", "contacts.csv", None),
+    ("parquet zstd", "contacts.parquet", "zstd"),
+    ("parquet snappy", "contacts.parquet", "snappy"),
+    ("feather lz4", "contacts.feather", "lz4"),
+    ("feather raw", "contacts.feather", "uncompressed"),
+]
+
+
+def make_book(n: int) -> ContactBook:
+    book = ContactBook()
+    for i in range(n):
+        book.add_contact(Contact(cname=f"Person {i}", phone=f"0{700000000 + i}", email=f"p{i}@example.com"))
+    return book
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def run(rows: int) -> list:
+    book = make_book(rows)
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        for label, name, compression in FORMATS:
+            path = os.path.join(d, name)
+            if compression is None:
+                save = timed(book.save_to_Panda, path)
+                read = timed(lambda: pd.read_csv(path, dtype=str, keep_default_na=False))
+                load = timed(ContactBook().load_csv, path)
+            else:
+                save = timed(book.save_columnar, path, compression)
+                read = timed(columnar.read_frame, path)
+                load = timed(ContactBook().load_columnar, path)
+            results.append((label, os.path.getsize(path) / 2**20, save, read, load))
+            os.remove(path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV vs Parquet vs Arrow IPC for ContactBook")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    print(f"rows {args.rows}")
+    print(f"{'format':<16}{'MiB':>8}{'save s':>9}{'read s':>9}{'load s':>9}")
+    for label, mib, save, read, load in run(args.rows):
+        print(f"{label:<16}{mib:>8.1f}{save:>9.3f}{read:>9.3f}{load:>9.3f}")
@@ -0,0 +1,125 @@
+"""
+Throughput of a shared book under mixed load: ConcurrentContactBook (lock-free searches,
+retried under the lock if they overlapped a write) vs a plain ContactBook behind one mutex. Readers do search_for / find_by_phone /
+search_prefix, writers update_contacts / add_contact / remove_contact.
+
+Python threads share the GIL, so this measures locking overhead and scheduling, not
+parallel speedup. Searches that never block also never give up the GIL to a writer:
+a writer that does (Contact() -> uuid4 -> os.urandom, or any I/O) waits up to a switch
+interval per write to get it back from busy readers, so writers get a smaller share of
+the CPU than behind a mutex, where the readers queue up. --switch-interval shows how
+much of the gap that is.
+
+python bench_concurrent.py --readers 8 --writers 2 --seconds 3 [--switch-interval 0.0005]
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from contact import Contact
+from contact_book import ContactBook
+from concurrent_book import ConcurrentContactBook
+
+
+class MutexBook:
+    """Baseline: every call holds one lock."""
+
+    def __init__(self):
+        self.book = ContactBook()
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.book, name)
+
+        def locked(*args, **kwargs):
+            with self.lock:
+                return method(*args, **kwargs)
+        return locked
+
+
+def fill(book, n: int):
+    for i in range(n):
+        book.add_contact(Contact(cname=f"Person {i}", phone=str(i), email=f"p{i}@example.com"))
+
+
+def run(make_book, size: int, readers: int, writers: int, seconds: float, seed: int = 7) -> dict:
+    book = make_book()
+    fill(book, size)
+    ids = [c.cid for c in book.list_contacts()]
+    stop = threading.Event()
+    counts = {"reads": 0, "writes": 0}
+    read_latency = []
+    count_lock = threading.Lock()
+
+    def reader(i):
+        rng, n, lat = random.Random(seed + i), 0, []
+        while not stop.is_set():
+            k = rng.randrange(size)
+            t0 = time.perf_counter()
+            op = n % 3
+            if op == 0:
+                book.search_for(f"Person {k}")
+            elif op == 1:
+                book.find_by_phone(str(k))
+            else:
+                book.search_prefix(f"Person {k}", limit=10)
+            lat.append(time.perf_counter() - t0)
+            n += 1
+        with count_lock:
+            counts["reads"] += n
+            read_latency.extend(lat)
+
+    def writer(i):
+        rng, n = random.Random(seed + 1000 + i), 0
+        while not stop.is_set():
+            k = rng.randrange(size)
+            op = n % 3
+            if op == 0:
+                book.update_contacts(ids[k], phone=str(rng.randrange(size)))
+            elif op == 1:
+                book.add_contact(Contact(cname=f"New {i} {n}", phone=str(k), email=f"n{i}.{n}@example.com"))
+            else:
+                found = book.search_for(f"New {i} {n - 1}")
+                if found:
+                    book.remove_contact(found[0])
+            n += 1
+        with count_lock:
+            counts["writes"] += n
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    read_latency.sort()
+    return {
+        "reads_per_s": counts["reads"] / seconds,
+        "writes_per_s": counts["writes"] / seconds,
+        "read_p50_us": statistics.median(read_latency) * 1e6 if read_latency else 0.0,
+        "read_p99_us": read_latency[int(len(read_latency) * 0.99)] * 1e6 if read_latency else 0.0,
+        "locked_reads": getattr(book, "read_retries", 0), # searches that had to wait for the write lock
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared ContactBook throughput: lock-free reads vs one mutex")
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--switch-interval", type=float, help="sys.setswitchinterval() (default 0.005 s)")
+    args = parser.parse_args()
+    if args.switch_interval:
+        sys.setswitchinterval(args.switch_interval)
+    print(f"size {args.size}, {args.readers} readers, {args.writers} writers, {args.seconds}s")
+    for label, make in (("lockfree", ConcurrentContactBook), ("mutex", MutexBook)):
+        r = run(make, args.size, args.readers, args.writers, args.seconds)
+        print(f"{label:<8} reads/s {r['reads_per_s']:>9.0f}  writes/s {r['writes_per_s']:>8.0f}  "
+              f"read p50 {r['read_p50_us']:>7.1f}us  p99 {r['read_p99_us']:>8.1f}us  locked reads {r['locked_reads']}")
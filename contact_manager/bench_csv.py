@@ -0,0 +1,71 @@
+"""
+CSV load/save: the bulk column-wise path vs the old row-by-row one
+(iterrows + Contact() per row, asdict per contact on save).
+
+python bench_csv.py --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+from dataclasses import asdict
+
+import pandas as pd
+
+from contact import Contact
+from contact_book import ContactBook
+
+
+def make_book(n: int) -> ContactBook:
+    book = ContactBook()
+    for i in range(n):
+        book.add_contact(Contact(cname=f"Person {i}", phone=f"0{700000000 + i}", email=f"p{i}@example.com"))
+    return book
+
+
+def old_save(book: ContactBook, path: str):
+    rows = []
+    for c in book.list_contacts():
+        d = asdict(c)
+        d["cid"] = str(d["cid"])
+        rows.append(d)
+    pd.DataFrame(rows, columns=["cname", "phone", "email", "cid"]).to_csv(path, index=False)
+
+
+def old_load(path: str) -> ContactBook:
+    book = ContactBook()
+    df = pd.read_csv(path, encoding="UTF-8")
+    for _, row in df.iterrows():
+        c = Contact(cname=row["cname"], phone=str(row["phone"]), email=row["email"])
+        c.cid = row["cid"]
+        book.add_contact(c)
+    return book
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def run(rows: int) -> dict:
+    book = make_book(rows)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "contacts.csv")
+        return {
+            "rows": rows,
+            "save_old_s": timed(old_save, book, path),
+            "save_new_s": timed(book.save_to_Panda, path),
+            "load_old_s": timed(old_load, path),
+            "load_new_s": timed(ContactBook().load_csv, path),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ContactBook CSV load/save timings")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    r = run(args.rows)
+    print(f"rows {r['rows']}")
+    print(f"save  old {r['save_old_s']:.2f}s  new {r['save_new_s']:.2f}s  ({r['save_old_s'] / r['save_new_s']:.1f}x)")
+    print(f"load  old {r['load_old_s']:.2f}s  new {r['load_new_s']:.2f}s  ({r['load_old_s'] / r['load_new_s']:.1f}x)")
@@ -0,0 +1,79 @@
+"""
+Fuzzy search latency on a large book.
+
+Names are random first names + syllable surnames (mostly distinct, like a real
+book); queries are existing names with one typo (swap, drop or replace a letter).
+
+python bench_fuzzy.py --size 1000000 --queries 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from contact import Contact
+from contact_book import ContactBook
+
+FIRST = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William",
+         "Elizabeth", "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+         "Charles", "Karen", "Wanjiru", "Kamau", "Otieno", "Akinyi", "Mwangi", "Njeri", "Hiro", "Yuki",
+         "Chen", "Mei", "Ravi", "Priya", "Omar", "Fatima", "Lars", "Ingrid", "Pierre", "Amelie"]
+SYLLABLES = ["ka", "mo", "ri", "ten", "sa", "lo", "vi", "nder", "ber", "gu", "sh", "ton", "ma", "el",
+             "dri", "ko", "zu", "an", "son", "wi", "ha", "ne", "ro", "li", "ti", "ba", "do", "mi", "re", "us"]
+
+
+def random_name(rng: random.Random) -> str:
+    last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{rng.choice(FIRST)} {last.capitalize()}"
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(("swap", "drop", "replace"))
+    if kind == "swap":
+        return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+    if kind == "drop":
+        return name[:i] + name[i + 1:]
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def run(size: int, queries: int = 200, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    book = ContactBook()
+    names = [random_name(rng) for _ in range(size)]
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        book.add_contact(Contact(cname=name, phone=str(1000000 + i), email=f"u{i}@example.com"))
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    book.fuzzy_search("warmup") # builds the trigram index
+    index_s = time.perf_counter() - start
+
+    times, found = [], 0
+    for _ in range(queries):
+        target = rng.choice(names)
+        q = typo(target, rng)
+        t0 = time.perf_counter()
+        hits = book.fuzzy_search(q, threshold=0.3, limit=10)
+        times.append(time.perf_counter() - t0)
+        found += any(c.cname == target for c, _score in hits)
+    times.sort()
+    return {
+        "size": size,
+        "distinct_names": len(book._by_name),
+        "load_s": load_s,
+        "index_build_s": index_s,
+        "median_ms": statistics.median(times) * 1e3,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] * 1e3,
+        "recall_at_10": found / queries,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trigram fuzzy search latency")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    for k, v in run(args.size, args.queries).items():
+        print(f"{k:<16}{v:.3f}" if isinstance(v, float) else f"{k:<16}{v}")
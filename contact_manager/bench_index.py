@@ -0,0 +1,66 @@
+"""
+Query cost vs book size: indexed ContactBook lookups against the old linear scan.
+
+python bench_index.py --sizes 1000 10000 100000 300000
+"""
+import argparse
+import random
+import time
+
+from contact import Contact
+from contact_book import ContactBook
+
+FIRST = ["Alice", "Bob", "Carol", "Dan", "Eve", "Frank", "Grace", "Heidi", "Ivan", "Judy"]
+
+
+def build_book(n: int, seed: int = 1) -> ContactBook:
+    rng = random.Random(seed)
+    book = ContactBook()
+    for i in range(n):
+        name = f"{rng.choice(FIRST)} {i:07d}"
+        book.add_contact(Contact(cname=name, phone=f"+1 555 {i:07d}", email=f"user{i}@example.com"))
+    return book
+
+
+def linear_search(book: ContactBook, name: str):
+    """What search_for used to do."""
+    return [c for c in book.list_contacts() if c.cname.lower() == name.lower()]
+
+
+def per_query_us(fn, queries, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        best = min(best, (time.perf_counter() - start) / len(queries))
+    return best * 1e6
+
+
+def run(sizes, queries: int = 200) -> list:
+    rows = []
+    for n in sizes:
+        book = build_book(n)
+        rng = random.Random(2)
+        picks = [rng.choice(book.list_contacts()) for _ in range(queries)]
+        names = [c.cname.upper() for c in picks]
+        rows.append({
+            "size": n,
+            "search_for_us": per_query_us(book.search_for, names),
+            "prefix_us": per_query_us(lambda q: book.search_prefix(q[:-3], limit=20), names),
+            "phone_us": per_query_us(book.find_by_phone, [c.phone.replace(" ", "-") for c in picks]),
+            "email_us": per_query_us(book.find_by_email, [c.email for c in picks]),
+            "linear_scan_us": per_query_us(lambda q: linear_search(book, q), names[:max(1, queries // 20)], repeat=1),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ContactBook lookup cost by book size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    cols = ["size", "search_for_us", "prefix_us", "phone_us", "email_us", "linear_scan_us"]
+    print("".join(f"{c:>16}" for c in cols))
+    for row in run(args.sizes):
+        print(f"{row['size']:>16}" + "".join(f"{row[c]:>16.2f}" for c in cols[1:]))
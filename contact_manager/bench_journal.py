@@ -0,0 +1,80 @@
+"""
+Per-change persistence cost on a large book: full CSV rewrite (save_to_Panda) vs the
+snapshot + journal book, with batched and per-change fsync. Also: reopening (replay)
+and how long compact(wait=False) holds writers up.
+
+python bench_journal.py --size 100000 --changes 200
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from contact import Contact
+from contact_book import ContactBook
+from journal import JournaledContactBook
+
+
+def contacts(start: int, n: int):
+    return [Contact(cname=f"Person {i}", phone=f"0{700000000 + i}", email=f"p{i}@example.com")
+            for i in range(start, start + n)]
+
+
+def median_ms(fn, items) -> float:
+    times = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e3
+
+
+def run(size: int, changes: int) -> dict:
+    base = contacts(0, size)
+    result = {"size": size}
+    with tempfile.TemporaryDirectory() as d:
+        book = ContactBook()
+        for c in base:
+            book.add_contact(c)
+        csv_path = os.path.join(d, "contacts.csv")
+
+        def rewrite(c):
+            book.add_contact(c)
+            book.save_to_Panda(csv_path)
+        result["csv_rewrite_ms"] = median_ms(rewrite, contacts(size, min(changes, 20)))
+
+        for label, sync_every in (("journal_batched_ms", 64), ("journal_fsync_each_ms", 1)):
+            path = os.path.join(d, label)
+            jbook = JournaledContactBook(path, sync_every=sync_every, compact_after=None)
+            result[label] = median_ms(jbook.add_contact, contacts(size, changes))
+            jbook.close()
+
+        # a book whose whole history is in the journal, then the same after compaction
+        path = os.path.join(d, "replay")
+        jbook = JournaledContactBook(path, compact_after=None)
+        for c in base:
+            jbook.add_contact(c)
+        jbook.close()
+        t0 = time.perf_counter()
+        jbook = JournaledContactBook(path, compact_after=None)
+        result["reopen_journal_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        jbook.compact(wait=False)
+        result["compact_pause_ms"] = (time.perf_counter() - t0) * 1e3
+        jbook._compactor.join()
+        result["compact_total_s"] = time.perf_counter() - t0
+        jbook.close()
+        t0 = time.perf_counter()
+        JournaledContactBook(path, compact_after=None).close()
+        result["reopen_snapshot_s"] = time.perf_counter() - t0
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Journal vs full rewrite per change")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=200)
+    args = parser.parse_args()
+    for k, v in run(args.size, args.changes).items():
+        print(f"{k:<24}{v:.3f}" if isinstance(v, float) else f"{k:<24}{v}")
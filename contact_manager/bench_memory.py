@@ -0,0 +1,88 @@
+"""
+Memory per contact: slotted Contact vs the old __dict__ dataclass, and a whole
+ContactBook (contacts + indexes) loaded from CSV.
+
+"record" = the Contact object plus its own strings and UUID (what N contacts cost
+on their own); "book" = everything load_csv() keeps alive, indexes included.
+
+python bench_memory.py --size 1000000
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from contact import Contact
+from contact_book import ContactBook
+
+
+@dataclass
+class DictContact: # Contact as it was before slots=True (validation skipped, it doesn't change the layout)
+    cname: str
+    phone: str
+    email: str
+    cid: uuid.UUID = field(default_factory=uuid.uuid4)
+
+
+def make_rows(n: int):
+    return [(f"Person {i}", f"0{700000000 + i}", f"p{i}@example.com") for i in range(n)]
+
+
+def measure(fn):
+    """(result, bytes allocated and still alive, seconds) - time taken without tracemalloc running."""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    size, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, seconds
+
+
+def build(cls, rows):
+    # copies of the strings, so each record owns its fields like after a real load
+    return [cls("".join(n), "".join(p), "".join(e)) for n, p, e in rows]
+
+
+def run(size: int) -> dict:
+    rows = make_rows(size)
+    _, dict_bytes, dict_s = measure(lambda: build(DictContact, rows))
+    _, slot_bytes, slot_s = measure(lambda: build(Contact, rows))
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "contacts.csv")
+        pd.DataFrame(rows, columns=["cname", "phone", "email"]).assign(
+            cid=[str(uuid.uuid4()) for _ in rows]).to_csv(path, index=False)
+        del rows
+        def load():
+            book = ContactBook()
+            book.load_csv(path)
+            return book
+        _, book_bytes, load_s = measure(load)
+    return {
+        "size": size,
+        "record_dict_B": dict_bytes / size,
+        "record_slots_B": slot_bytes / size,
+        "build_dict_s": dict_s,
+        "build_slots_s": slot_s,
+        "book_B": book_bytes / size,
+        "load_csv_s": load_s,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bytes per contact, slotted vs __dict__ Contact")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    args = parser.parse_args()
+    for k, v in run(args.size).items():
+        print(f"{k:<16}{v:.1f}" if isinstance(v, float) else f"{k:<16}{v}")
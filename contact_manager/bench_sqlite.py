@@ -0,0 +1,79 @@
+"""
+Cost of persisting changes to a large book: ContactBook rewrites the whole CSV on
+every save_to_Panda, SQLiteContactBook writes the changed row (one WAL commit).
+
+python bench_sqlite.py --size 100000 --changes 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from contact import Contact
+from contact_book import ContactBook
+from sqlite_book import SQLiteContactBook
+
+
+def contacts(start: int, n: int):
+    return [Contact(cname=f"Person {i}", phone=f"0{700000000 + i}", email=f"p{i}@example.com")
+            for i in range(start, start + n)]
+
+
+def per_call_ms(fn, items) -> float:
+    times = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1e3
+
+
+def run(size: int, changes: int = 50) -> dict:
+    base = contacts(0, size)
+    with tempfile.TemporaryDirectory() as d:
+        csv_path, db_path = os.path.join(d, "contacts.csv"), os.path.join(d, "contacts.db")
+        book = ContactBook()
+        for c in base:
+            book.add_contact(c)
+        book.save_to_Panda(csv_path)
+
+        def csv_add(c):
+            book.add_contact(c)
+            book.save_to_Panda(csv_path)
+
+        db = SQLiteContactBook(db_path)
+        t0 = time.perf_counter()
+        db.add_many(base)
+        bulk_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db.load_csv(csv_path)
+        import_s = time.perf_counter() - t0
+
+        new = contacts(size, changes)
+        result = {
+            "size": size,
+            "csv_add_save_ms": per_call_ms(csv_add, new),
+            "sqlite_add_ms": per_call_ms(db.add_contact, new),
+            "sqlite_update_ms": per_call_ms(lambda c: db.update_contacts(c.cid, phone="0123"), new),
+            "sqlite_add_many_s": bulk_s,
+            "sqlite_load_csv_s": import_s,
+        }
+        t0 = time.perf_counter()
+        for _ in db:
+            pass
+        result["sqlite_iterate_s"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db.find_by_phone(f"0{700000000 + size // 2}")
+        result["sqlite_lookup_ms"] = (time.perf_counter() - t0) * 1e3
+        db.close()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental saves: CSV rewrite vs SQLite")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=50)
+    args = parser.parse_args()
+    for k, v in run(args.size, args.changes).items():
+        print(f"{k:<20}{v:.3f}" if isinstance(v, float) else f"{k:<20}{v}")
@@ -0,0 +1,141 @@
+"""
+Parquet and Arrow IPC (Feather v2) export/import for ContactBook and SQLiteContactBook.
+
+Columnar files are typed (no CSV parsing), compressed per column and much smaller.
+Files are written with the book's atomic temp-file-then-os.replace write and always with
+schema(); reading checks a file's schema before loading anything. Reads are memory-mapped,
+and iter_frames() streams a file in record batches so a huge file never has to be in
+memory at once (load_columnar(..., batch_size=...)).
+
+The format comes from the extension: .parquet, or .feather / .arrow for Arrow IPC.
+Needs pyarrow (pip install pyarrow); the rest of the contact manager doesn't. Without it
+every public function here raises ImportError saying so.
+"""
+import os
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from contact_book import CSV_COLUMNS, LoadReport
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError: # optional dependency
+    pa = None
+
+PARQUET, ARROW = "parquet", "arrow"
+_EXTENSIONS = {".parquet": PARQUET, ".feather": ARROW, ".arrow": ARROW}
+# zstd: best size for Parquet; lz4: fastest to decode. Arrow IPC is only read zero-copy
+# from a memory map when uncompressed, so pass compression="uncompressed" for that.
+DEFAULT_COMPRESSION = {PARQUET: "zstd", ARROW: "lz4"}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet/Arrow support needs pyarrow: pip install pyarrow")
+
+
+def schema() -> "pa.Schema":
+    """cid is the 36-char UUID text, as in the CSV files."""
+    _require_pyarrow()
+    return pa.schema([pa.field(name, pa.string(), nullable=False) for name in CSV_COLUMNS])
+
+
+def file_format(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in _EXTENSIONS:
+        raise ValueError(f"unknown columnar format {ext!r}, expected one of {', '.join(_EXTENSIONS)}")
+    return _EXTENSIONS[ext]
+
+
+def check_schema(actual: "pa.Schema"):
+    """ValueError unless every column of schema() is there with type string (extra columns are ignored)."""
+    _require_pyarrow()
+    missing = [c for c in CSV_COLUMNS if c not in actual.names]
+    if missing:
+        raise ValueError(f"missing required column(s): {', '.join(missing)}")
+    wrong = [f"{c} is {actual.field(c).type}" for c in CSV_COLUMNS
+             if not (pa.types.is_string(actual.field(c).type) or pa.types.is_large_string(actual.field(c).type))]
+    if wrong:
+        raise ValueError(f"column(s) must be strings: {', '.join(wrong)}")
+
+
+def save_columnar(book, filename: str, compression: Optional[str] = None) -> int:
+    """Write all contacts to a Parquet/Arrow file (atomically). Returns the number saved."""
+    _require_pyarrow()
+    fmt = file_format(filename)
+    table = pa.Table.from_pandas(book.to_frame(), schema=schema(), preserve_index=False)
+    compression = compression or DEFAULT_COMPRESSION[fmt]
+    if fmt == PARQUET:
+        write = lambda tmp: pq.write_table(table, tmp, compression=compression)
+    else:
+        write = lambda tmp: feather.write_feather(table, tmp, compression=compression)
+    book._atomic_write(filename, write)
+    return table.num_rows
+
+
+def _read_schema(filename: str, fmt: str) -> "pa.Schema":
+    if fmt == PARQUET:
+        return pq.read_schema(filename, memory_map=True)
+    with pa.memory_map(filename) as source:
+        return pa.ipc.open_file(source).schema
+
+
+def iter_frames(filename: str, batch_size: int = 100_000) -> Iterator[pd.DataFrame]:
+    """
+    DataFrames of at most batch_size rows (CSV_COLUMNS only), read from a memory map.
+    The file and its schema are checked right away, not at the first next().
+    """
+    _require_pyarrow()
+    fmt = file_format(filename)
+    check_schema(_read_schema(filename, fmt))
+    return _iter_frames(filename, fmt, batch_size)
+
+
+def _iter_frames(filename: str, fmt: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    if fmt == PARQUET:
+        batches = pq.ParquetFile(filename, memory_map=True).iter_batches(batch_size=batch_size, columns=CSV_COLUMNS)
+        for batch in batches:
+            yield batch.to_pandas()
+        return
+    with pa.memory_map(filename) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)]).select(CSV_COLUMNS)
+            # IPC batches are as large as the writer made them: re-slice to batch_size
+            for start in range(0, table.num_rows, batch_size):
+                yield table.slice(start, batch_size).to_pandas()
+
+
+def read_frame(filename: str) -> pd.DataFrame:
+    """The whole file as one DataFrame (memory-mapped read)."""
+    _require_pyarrow()
+    fmt = file_format(filename)
+    check_schema(_read_schema(filename, fmt))
+    if fmt == PARQUET:
+        table = pq.read_table(filename, columns=CSV_COLUMNS, memory_map=True)
+    else:
+        table = feather.read_table(filename, columns=CSV_COLUMNS, memory_map=True)
+    return table.to_pandas()
+
+
+def load_columnar(book, filename: str, batch_size: Optional[int] = None) -> LoadReport:
+    """
+    Replace the book's contacts with the file's, validated like load_csv. With batch_size,
+    the file is streamed in chunks instead of read whole (for SQLiteContactBook this
+    keeps memory flat however big the file is). Error "row"s are 0-based record numbers.
+    """
+    _require_pyarrow()
+    if batch_size is None:
+        return book.load_frame(read_frame(filename), first_row=0)
+    report, offset = LoadReport(loaded=0), 0
+    for i, df in enumerate(iter_frames(filename, batch_size)):
+        part = book.load_frame(df, replace=(i == 0), first_row=offset)
+        report.loaded += part.loaded
+        offset += len(df)
+        report.errors.extend(part.errors)
+    if offset == 0: # empty file: still replace
+        report = book.load_frame(pd.DataFrame(columns=CSV_COLUMNS), first_row=0)
+    return report
@@ -0,0 +1,160 @@
+"""
+ContactBook that API threads can share.
+
+Writers take a lock; searches don't. A write bumps `_version` before and after it changes
+anything (odd = a write is in progress). A search runs without the lock, then checks the
+version: if no write started or finished meanwhile its result is consistent and it is
+returned, otherwise (or if the half-changed dicts made it raise) it is tried again, still
+without the lock; a search that sees a write in progress gives up the GIL first so the
+writer can finish. Only after `optimistic_tries` overlapped attempts does it run under the
+write lock. So searches practically never wait for writers (read_retries counts the ones
+that did), writers never wait for searches, and there is no per-book copy on write.
+
+This relies on contacts never being edited once they are in the book: update_contacts
+builds and validates a new Contact and swaps it in, so a failed update has nothing to
+roll back and a reader holding the old object never sees it half-updated. Contacts
+returned by searches are therefore snapshots; get_contact() again for current values.
+
+Writers keep the sorted name keys current (ContactBook defers that to the next
+search_prefix), so a search that finds keys pending mid-write just tries again; the
+trigram index is still built by the first fuzzy_search, under the lock.
+"""
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+import pandas as pd
+
+from contact import Contact
+from contact_book import ContactBook, LoadReport
+
+T = TypeVar("T")
+
+
+class _Overlapped(Exception):
+    """An unlocked search ran into a write in progress: _read tries it again."""
+
+
+class ConcurrentContactBook(ContactBook):
+    def __init__(self):
+        super().__init__()
+        self._write_lock = threading.RLock()
+        self._version = 0 # odd while a write is in progress
+        self.optimistic_tries = 4 # unlocked attempts of a search before it runs under the lock
+        self.read_retries = 0 # searches that overlapped writes every time and were re-run under the lock
+
+    @contextmanager
+    def _writing(self):
+        with self._write_lock:
+            self._version += 1
+            try:
+                yield
+                # keep the sorted name keys current here rather than lazily in search_prefix:
+                # a search that had to catch up would take the lock and hold up writers
+                super()._sorted_name_keys()
+            finally:
+                self._version += 1
+
+    def _sorted_name_keys(self) -> List[str]:
+        if not (self._keys_added or self._keys_removed):
+            return self._name_keys
+        if self._version & 1 and not self._write_lock._is_owned():
+            # a writer is between _index and the end of _writing: it brings the keys up to
+            # date itself, so don't queue on its lock, retry the search instead
+            raise _Overlapped
+        with self._writing(): # only if changed by hand: catching up is a write
+            return super()._sorted_name_keys()
+
+    def _trigram_index(self):
+        if self._trigrams is not None:
+            return self._trigrams
+        with self._writing():
+            return super()._trigram_index()
+
+    def _read(self, search: Callable[[], T], trigrams: bool = False) -> T:
+        if trigrams:
+            self._trigram_index() # built before the version is taken, so building it doesn't count as overlapping
+        for _ in range(self.optimistic_tries):
+            version = self._version
+            if version & 1: # a write is in progress: let it finish instead of queueing on its lock
+                time.sleep(0)
+                continue
+            try:
+                result = search()
+            except Exception: # e.g. "dictionary changed size during iteration" from a concurrent write
+                continue
+            if self._version == version:
+                return result
+        with self._write_lock: # overlapped a write: again, alone (and real errors raise from here)
+            self.read_retries += 1
+            return search()
+
+    # ---- reads ----
+    def get_contact(self, contact_id: uuid.UUID) -> Contact | None:
+        return self._read(lambda: super(ConcurrentContactBook, self).get_contact(contact_id))
+
+    def search_for(self, name: str):
+        return self._read(lambda: super(ConcurrentContactBook, self).search_for(name))
+
+    def search_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Contact]:
+        return self._read(lambda: super(ConcurrentContactBook, self).search_prefix(prefix, limit))
+
+    def fuzzy_search(self, name: str, threshold: float = 0.3, limit: Optional[int] = 10) -> List[Tuple[Contact, float]]:
+        return self._read(lambda: super(ConcurrentContactBook, self).fuzzy_search(name, threshold, limit), trigrams=True)
+
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        return self._read(lambda: super(ConcurrentContactBook, self).find_by_phone(phone))
+
+    def find_by_email(self, email: str) -> List[Contact]:
+        return self._read(lambda: super(ConcurrentContactBook, self).find_by_email(email))
+
+    def find_duplicates(self, contact: Contact) -> List[Contact]:
+        return self._read(lambda: super(ConcurrentContactBook, self).find_duplicates(contact))
+
+    def list_contacts(self):
+        return self._read(lambda: super(ConcurrentContactBook, self).list_contacts())
+
+    def to_frame(self) -> pd.DataFrame:
+        # save_to_Panda/save_columnar only need this consistent copy, not the lock while writing the file
+        return self._read(lambda: super(ConcurrentContactBook, self).to_frame())
+
+    # ---- writes ----
+    def add_contact(self, contact: Contact, reject_duplicates: bool = False):
+        with self._writing(): # duplicate check and insert together
+            if reject_duplicates:
+                dupes = super().find_duplicates(contact) # not self.find_duplicates(): we hold the lock already
+                if dupes:
+                    raise ValueError(f"duplicate of {dupes[0]} (same phone or email)")
+            super().add_contact(contact)
+
+    def remove_contact(self, contact: Contact):
+        with self._writing():
+            super().remove_contact(contact)
+
+    def update_contacts(self, contact_id: uuid.UUID, **kwargs):
+        """
+        Update fields of a contact. Allowed fields: cname, phone, email.
+        Returns True if updated, False if contact not found or the new values are invalid;
+        either way readers only ever see the old or the new contact, never a mix.
+        """
+        with self._writing():
+            old = self._contact.get(contact_id)
+            if not old:
+                return False
+            values = {f: getattr(old, f) for f in self.ALLOWED_UPDATE_FIELDS}
+            values.update({f: v for f, v in kwargs.items() if f in self.ALLOWED_UPDATE_FIELDS})
+            try:
+                new = Contact(cid=contact_id, **values) # __post_init__ strips and validates
+            except ValueError as e:
+                print(f"Update failed {e}")
+                return False
+            self._unindex(contact_id)
+            self._contact[contact_id] = new
+            self._index(new)
+            return True
+
+    def load_frame(self, df: pd.DataFrame, replace: bool = True, first_row: int = 2) -> LoadReport:
+        with self._writing():
+            return super().load_frame(df, replace, first_row)
@@ -1,9 +1,9 @@
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import ClassVar, Dict
 import re
 import uuid
 
-@dataclass
+@dataclass(slots=True) # no per-instance __dict__ (see bench_memory.py)
 class Contact:
     cname: str
     phone: str
@@ -15,6 +15,9 @@ class Contact:
     def __post_init__(self):
         """Runs after the dataclass generated __init__. 
         Use it for normalization and validation"""
+        for name in ("cname", "phone", "email"): # e.g. phone=5551234 from a form/JSON
+            if not isinstance(getattr(self, name), str):
+                raise ValueError(f"{name} must be a string")
         # normalize strings (strip whitespace)
         self.cname = self.cname.strip()
         self.phone = self.phone.strip()
@@ -30,8 +33,22 @@ class Contact:
         
     def to_Dict(self) -> Dict[str, str]:
         """Return a plain dict suitable for serializing (CSV, pandas, json)"""
-        return asdict(self)
+        # shallow on purpose: every field is a str or UUID, asdict() would deep-copy them for nothing
+        return {f.name: getattr(self, f.name) for f in fields(self)}
     
+    @classmethod
+    def from_valid(cls, cname: str, phone: str, email: str, cid: uuid.UUID) -> "Contact":
+        """
+        Build a contact from fields that were already normalized and validated in bulk
+        (ContactBook.load_csv checks whole columns at once), skipping __post_init__.
+        """
+        c = object.__new__(cls)
+        c.cname = cname
+        c.phone = phone
+        c.email = email
+        c.cid = cid
+        return c
+
     @classmethod
     def from_dict(cls, data: Dict[str, str]) -> "Contact" :
         """Create Contact from a dict produced by to_dict or read from CSV/pandas."""
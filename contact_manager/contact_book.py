@@ -1,32 +1,277 @@
 import os
+import re
 import tempfile
 import uuid
+from bisect import bisect_left, insort
 import pandas as pd
 from tabulate import tabulate
 from contact import Contact
-from typing import Dict
+from fuzzy_index import TrigramIndex
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+_NON_DIGITS = re.compile(r"\D")
+UUID_RE = r"[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}"
+CSV_COLUMNS = ["cname", "phone", "email", "cid"]
+KEY_COLUMNS = ["name_key", "phone_key", "email_key"]
+
+def _same(original: str, key: str) -> str:
+    return original if key == original else key # reuse the field's string when nothing changed (1M keys = 1M strings)
+
+def normalize_name(name: str) -> str:
+    return name.strip().casefold() # casefold: "Straße" matches "STRASSE"
+
+def normalize_phone(phone: str) -> str:
+    return _NON_DIGITS.sub("", phone) # "+1 (555) 010-99" -> "155501099"
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+Bucket = Union[uuid.UUID, Dict[uuid.UUID, None]]
+
+
+@dataclass
+class LoadReport:
+    """Result of a bulk load: how many contacts were loaded and which rows were rejected (and why)."""
+    loaded: int
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+def validate_frame(df: pd.DataFrame, first_row: int = 2) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Check every rule of Contact.__post_init__ on whole columns at once.
+    Returns (valid rows: stripped CSV_COLUMNS + normalized KEY_COLUMNS, one error dict per bad row).
+    An error's "row" is first_row + its position in df (default: the CSV line number).
+    Raises ValueError if a required column is missing.
+    """
+    missing = [c for c in CSV_COLUMNS if c not in df.columns]
+    if missing:
+       raise ValueError(f"missing required column(s): {', '.join(missing)}")
+
+    cols = {c: df[c].fillna("").astype(str).str.strip() for c in CSV_COLUMNS}
+    problems = {
+       "name must not be empty": cols["cname"].eq(""),
+       "phone must not be empty": cols["phone"].eq(""),
+       "email is invalid": ~cols["email"].str.fullmatch(Contact.EMAIL_RE.pattern),
+       "cid is not a UUID": ~cols["cid"].str.fullmatch(UUID_RE),
+    }
+    bad = pd.concat(problems, axis=1)
+    invalid = bad.any(axis=1)
+
+    errors = []
+    if invalid.any():
+       messages, flags = list(problems), bad.to_numpy()
+       for pos in invalid.to_numpy().nonzero()[0]:
+          errors.append({
+             "row": int(pos) + first_row,
+             "errors": [msg for msg, flagged in zip(messages, flags[pos]) if flagged],
+             **{c: df[c].iat[pos] for c in CSV_COLUMNS},
+          })
+
+    valid = pd.DataFrame({c: col[~invalid] for c, col in cols.items()})
+    # same rules as normalize_name/phone/email, for whole columns
+    valid["name_key"] = valid["cname"].str.casefold()
+    valid["phone_key"] = valid["phone"].str.replace(_NON_DIGITS.pattern, "", regex=True)
+    valid["email_key"] = valid["email"].str.lower()
+    return valid, errors
+
 
 class ContactBook:
+    """
+    Contacts by id, plus secondary indexes kept in step by add/remove/update:
+    name (case-folded), phone (digits only) and email (lower-case) -> ids, and a
+    sorted list of name keys for prefix search. Lookups cost O(matches), not O(book).
+    Change contacts through update_contacts(); editing fields directly skips the indexes.
+
+    An index entry holds the bare id while only one contact has that key and becomes
+    an ordered dict of ids from the second one on (a dict per key would be most of the
+    book's memory: nearly every phone and email is unique). Read them through _ids().
+    """
     ALLOWED_UPDATE_FIELDS = {"cname","phone", "email"} #whitelist
 
     def __init__(self):
         #Encapsulation is achieved by the single leading underscore _
         self._contact : Dict[uuid.UUID, Contact] = {}
+        # key -> id, or ids once shared (a dict keeps insertion order, unlike a set)
+        self._by_name: Dict[str, Bucket] = {}
+        self._by_phone: Dict[str, Bucket] = {}
+        self._by_email: Dict[str, Bucket] = {}
+        # sorted keys of _by_name for prefix search, brought up to date lazily by _sorted_name_keys()
+        # (an insort per add would make a bulk load O(n^2))
+        self._name_keys: List[str] = []
+        self._keys_added: Set[str] = set()
+        self._keys_removed: Set[str] = set()
+        self._keys: Dict[uuid.UUID, Tuple[str, str, str]] = {} # what each contact was indexed under
+        self._trigrams: Optional[TrigramIndex] = None # built by the first fuzzy_search()
+
+    # ---- index maintenance ----
+    @staticmethod
+    def _index_keys(contact: Contact) -> Tuple[str, str, str]:
+        return (_same(contact.cname, normalize_name(contact.cname)), _same(contact.phone, normalize_phone(contact.phone)),
+                _same(contact.email, normalize_email(contact.email)))
+
+    @staticmethod
+    def _ids(index: Dict[str, Bucket], key: str) -> Iterable[uuid.UUID]:
+        ids = index.get(key)
+        if ids is None:
+            return ()
+        return ids if isinstance(ids, dict) else (ids,)
+
+    @staticmethod
+    def _add_id(index: Dict[str, Bucket], key: str, cid: uuid.UUID):
+        ids = index.get(key)
+        if ids is None:
+            index[key] = cid
+        elif isinstance(ids, dict):
+            ids[cid] = None
+        elif ids != cid:
+            index[key] = {ids: None, cid: None}
+
+    @staticmethod
+    def _remove_id(index: Dict[str, Bucket], key: str, cid: uuid.UUID) -> bool:
+        """True if that was the last id for key (the key is gone)."""
+        ids = index.get(key)
+        if isinstance(ids, dict):
+            ids.pop(cid, None)
+            if len(ids) == 1:
+                index[key] = next(iter(ids))
+        elif ids is not None and ids == cid:
+            del index[key]
+            return True
+        return False
+
+    def _index(self, contact: Contact, keys: Optional[Tuple[str, str, str]] = None):
+        """keys: precomputed _index_keys(contact) (bulk loads normalize whole columns)."""
+        if keys is None:
+           keys = self._index_keys(contact)
+        name, phone, email = keys
+        if name not in self._by_name:
+            if name in self._keys_removed:
+                self._keys_removed.discard(name) # still in the sorted list
+            else:
+                self._keys_added.add(name)
+            if self._trigrams is not None:
+                self._trigrams.add(name)
+        self._add_id(self._by_name, name, contact.cid)
+        self._add_id(self._by_phone, phone, contact.cid)
+        self._add_id(self._by_email, email, contact.cid)
+        self._keys[contact.cid] = keys
+
+    def _unindex(self, cid: uuid.UUID):
+        keys = self._keys.pop(cid, None)
+        if keys is None:
+            return
+        name, phone, email = keys
+        for index, key in ((self._by_name, name), (self._by_phone, phone), (self._by_email, email)):
+            if self._remove_id(index, key, cid):
+                if index is self._by_name:
+                    if key in self._keys_added:
+                        self._keys_added.discard(key)
+                    else:
+                        self._keys_removed.add(key)
+                    if self._trigrams is not None:
+                        self._trigrams.remove(key)
+
+    def _sorted_name_keys(self) -> List[str]:
+        """Apply pending name key changes: one by one if few, else a single re-sort."""
+        pending = len(self._keys_added) + len(self._keys_removed)
+        if pending:
+            if pending > 64 + len(self._name_keys) // 64:
+                self._name_keys = sorted(self._by_name)
+            else:
+                for key in self._keys_removed:
+                    del self._name_keys[bisect_left(self._name_keys, key)]
+                for key in self._keys_added:
+                    insort(self._name_keys, key)
+            self._keys_added.clear()
+            self._keys_removed.clear()
+        return self._name_keys
 
-    def add_contact(self, contact:Contact):
-        """Add a new contact to the book."""
+    def _clear(self):
+        self._contact.clear()
+        for index in (self._by_name, self._by_phone, self._by_email, self._keys):
+            index.clear()
+        self._name_keys.clear()
+        self._keys_added.clear()
+        self._keys_removed.clear()
+        self._trigrams = None
+
+    def find_duplicates(self, contact: Contact) -> List[Contact]:
+        """Other contacts with the same (normalized) phone or email."""
+        _name, phone, email = self._index_keys(contact)
+        ids = dict.fromkeys([*self._ids(self._by_email, email), *self._ids(self._by_phone, phone)])
+        ids.pop(contact.cid, None)
+        return [self._contact[cid] for cid in ids]
+
+    def add_contact(self, contact:Contact, reject_duplicates: bool = False):
+        """
+        Add a new contact to the book (re-adding an id replaces that contact).
+        reject_duplicates=True raises ValueError if another contact has the same phone or email.
+        """
+        if reject_duplicates:
+            dupes = self.find_duplicates(contact)
+            if dupes:
+                raise ValueError(f"duplicate of {dupes[0]} (same phone or email)")
+        self._unindex(contact.cid)
         self._contact[contact.cid] = contact
+        self._index(contact)
 
     def remove_contact(self, contact:Contact):
         """Remove a contact by id."""
         if contact.cid in self._contact:
          del self._contact[contact.cid]
+         self._unindex(contact.cid)
 
     def get_contact(self, contact_id:uuid.UUID) -> Contact | None:
         return self._contact.get(contact_id)
     
     def search_for(self, name:str):
-        return [ c for c in self._contact.values() if c.cname.lower() == name.lower()]
+        """Contacts whose name matches, ignoring case."""
+        return [self._contact[cid] for cid in self._ids(self._by_name, normalize_name(name))]
+
+    def search_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Contact]:
+        """Contacts whose name starts with prefix (ignoring case), in name order."""
+        key = normalize_name(prefix)
+        results: List[Contact] = []
+        keys = self._sorted_name_keys()
+        i = bisect_left(keys, key)
+        while i < len(keys) and keys[i].startswith(key):
+            for cid in self._ids(self._by_name, keys[i]):
+                results.append(self._contact[cid])
+                if limit is not None and len(results) >= limit:
+                    return results
+            i += 1
+        return results
+
+    def _trigram_index(self) -> TrigramIndex:
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex()
+            for key in self._by_name:
+                self._trigrams.add(key)
+        return self._trigrams
+
+    def fuzzy_search(self, name: str, threshold: float = 0.3, limit: Optional[int] = 10) -> List[Tuple[Contact, float]]:
+        """
+        Typo-tolerant name search: (contact, similarity 0..1) pairs, best first.
+        Similarity is trigram overlap (see fuzzy_index); "Jonh Smiht" still finds "John Smith".
+        The trigram index is built on first use and kept up to date after that.
+        """
+        results: List[Tuple[Contact, float]] = []
+        # every key has at least one contact, so the top `limit` keys are enough
+        for key, score in self._trigram_index().search(normalize_name(name), threshold, limit):
+            for cid in self._ids(self._by_name, key):
+                results.append((self._contact[cid], score))
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        """Formatting is ignored: "555-0199" finds "(555) 0199"."""
+        return [self._contact[cid] for cid in self._ids(self._by_phone, normalize_phone(phone))]
+
+    def find_by_email(self, email: str) -> List[Contact]:
+        return [self._contact[cid] for cid in self._ids(self._by_email, normalize_email(email))]
     
     def list_contacts(self):
         return list(self._contact.values())
@@ -41,6 +286,7 @@ class ContactBook:
            return False
         
         original = {field: getattr(contact, field) for field in self.ALLOWED_UPDATE_FIELDS}
+        self._unindex(contact.cid) # re-indexed below with whichever values survive
 
         #update only valid attr
         for field_name, value in kwargs.items():
@@ -50,41 +296,34 @@ class ContactBook:
         # re-run validation (reuse __post_init__)
         try:
            contact.__post_init__()
-        except ValueError as e:
-           print(f"Update failed {e}")
-
+        except Exception as e: # any failure: put the old values back in the indexes before returning/raising
            for field, oldValue in original.items():
               setattr(contact, field, oldValue)
+           self._index(contact)
+           if not isinstance(e, ValueError):
+              raise
+           print(f"Update failed {e}")
            return False
+        self._index(contact)
         return True
     
-    def save_to_Panda(self, filename:str) -> int:
+    def _atomic_write(self, filename: str, write, prefix: str = "contacts_", suffix: str = "") -> None:
         """
-         Save contacts to CSV using pandas. Returns number of contacts saved.
-          Uses an atomic write (write to temp file then os.replace).
-         The CSV columns: cname, phone, email, cid
+        write(tmpname) into a temp file next to `filename`, then os.replace it over
+        the target (atomic on most OSes), so a crash never leaves a half-written file.
+        The temp file is named prefix + random + suffix.
         """
         # 1) Ensure the destination directory exists
         dirn= os.path.dirname(filename) or "."
         os.makedirs(dirn, exist_ok=True)
 
-        rows=[]
-        for c in self._contact.values():
-           d= c.to_Dict()
-           d["cid"]= str(d["cid"]) # UUID → str
-           rows.append(d) #add to the end of the list
-
-         # 3) Build DataFrame (stable column order even if rows = [])
-        df = pd.DataFrame(rows, columns=["cname","phone","email","cid"])
-
-         # 4) Create a temp file in the same dir (required for atomic replace)
-        fd, tmpname= tempfile.mkstemp(prefix="contacts_", dir=dirn, text=True)
+        # 2) Create a temp file in the same dir (required for atomic replace)
+        fd, tmpname= tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=dirn)
         os.close(fd)
 
         try:
-           df.to_csv(tmpname, index=False, encoding="UTF-8")
+           write(tmpname)
            os.replace(tmpname, filename) # atomic on most OSes
-           return len(df)
         except Exception:
            # cleanup temp file if something failed
            try:
@@ -93,48 +332,84 @@ class ContactBook:
             pass
            raise
 
-    def load_contact_pandas(self, filename:str, show_table:bool =True) -> int:
+    def to_frame(self) -> pd.DataFrame:
+        """All contacts as a DataFrame, built column by column (no per-contact dicts)."""
+        contacts = list(self._contact.values())
+        return pd.DataFrame({
+            "cname": [c.cname for c in contacts],
+            "phone": [c.phone for c in contacts],
+            "email": [c.email for c in contacts],
+            "cid": [str(c.cid) for c in contacts], # UUID → str
+        }, columns=CSV_COLUMNS)
+
+    def save_to_Panda(self, filename:str) -> int:
+        """
+         Save contacts to CSV using pandas. Returns number of contacts saved.
+          Uses an atomic write (write to temp file then os.replace).
+         The CSV columns: cname, phone, email, cid
+        """
+        df = self.to_frame()
+        self._atomic_write(filename, lambda tmp: df.to_csv(tmp, index=False, encoding="UTF-8"))
+        return len(df)
+
+    def load_frame(self, df: pd.DataFrame, replace: bool = True, first_row: int = 2) -> LoadReport:
+        """
+        Replace the book with the rows of `df` (columns cname, phone, email, cid, all str),
+        or add them to it with replace=False (loading a big file chunk by chunk).
+        Rows are validated in bulk (validate_frame); valid rows become contacts in one
+        pass, invalid ones are listed in the report instead of aborting the load.
+        """
+        valid, errors = validate_frame(df, first_row)
+        if replace:
+           self._clear()
+        seen = set() # cids of this frame: a repeated one is still one contact
+        for name, ph, em, cid, kn, kp, ke in zip(*(valid[c].tolist() for c in CSV_COLUMNS + KEY_COLUMNS)):
+           c = Contact.from_valid(name, ph, em, uuid.UUID(cid))
+           k = (_same(name, kn), _same(ph, kp), _same(em, ke))
+           if c.cid in self._contact: # same cid twice in the file: last row wins, like add_contact
+              self._unindex(c.cid)
+           self._contact[c.cid] = c
+           self._index(c, k)
+           seen.add(c.cid)
+        # contacts from this frame, not the book's size (which includes earlier chunks with replace=False)
+        return LoadReport(loaded=len(seen), errors=errors)
+
+    def load_csv(self, filename: str) -> LoadReport:
+        """Bulk CSV load (see load_frame). Everything is read as str, so phone "007" stays "007"."""
+        df = pd.read_csv(filename, dtype=str, keep_default_na=False, encoding="UTF-8")
+        return self.load_frame(df)
+
+    def save_columnar(self, filename: str, compression: Optional[str] = None) -> int:
+        """Save to .parquet or .feather/.arrow (see columnar.py, needs pyarrow). Atomic, like save_to_Panda."""
+        import columnar # imports this module
+        return columnar.save_columnar(self, filename, compression)
+
+    def load_columnar(self, filename: str, batch_size: Optional[int] = None) -> LoadReport:
+        """Load a .parquet or .feather/.arrow file, optionally streamed in batch_size chunks (see columnar.py)."""
+        import columnar
+        return columnar.load_columnar(self, filename, batch_size)
+
+    def load_contact_pandas(self, filename:str, show_table:bool =False) -> int:
         """
         Load contacts from CSV into the ContactBook using pandas.
-        Returns the number of contacts loaded.
+        Returns the number of contacts loaded (invalid rows are skipped and summarized).
         Optionally prints them in a tabulated format.
         """
         try:
-           df = pd.read_csv(filename, encoding="UTF-8")
-
-           # Ensure 'cid' exists in the CSV
-           if "cid" not in df.columns:
-            raise ValueError("CSV missing required 'cid' column")
-
-           # Clear old contacts and repopulate
-           self._contact.clear()
-
-           for _, row in df.iterrows():
-              c= Contact(
-                 cname=row["cname"],
-                 phone=str(row["phone"]),
-                 email=row["email"],
-              )
-              # If CSV had cid, keep it
-              if pd.notna(row["cid"]):
-                 c.cid = row["cid"]
-                 self._contact[c.cid] = c
-              else:
-                 raise ValueError("CSV missing required 'cid' column")
-                 
-
-            # Show table if requested
-              if show_table:
-               print(tabulate(df, headers="keys", tablefmt="orgtbl"))
-
-               return len(self._contact)
-
+           report = self.load_csv(filename)
         except FileNotFoundError:
          print(f"❌ File not found: {filename}")
          return 0
         except Exception as e:
                print(f"❌ Error loading contacts: {e}")
                return 0
+
+        if report.errors:
+           print(f"⚠️ Skipped {len(report.errors)} invalid row(s), first: {report.errors[0]}")
+        # Show table if requested (off by default: it is the slowest part for big files)
+        if show_table:
+           print(tabulate(self.to_frame(), headers="keys", tablefmt="orgtbl"))
+        return report.loaded
         
 contact_book =ContactBook()
 alice = Contact(cname="Alice", phone="123", email="alice@example.com")
@@ -145,4 +420,4 @@ contact_book.add_contact(bob)
 filename= "contact.csv"
 
 #count= contact_book.save_to_Panda(str(filename))
-count1 = contact_book.load_contact_pandas(str(filename))
+count1 = contact_book.load_contact_pandas(str(filename), show_table=True)
@@ -0,0 +1,284 @@
+"""
+ContactBook persisted as snapshot + append-only journal, instead of a full CSV rewrite per save.
+
+A book directory holds:
+
+    snapshot-000004.csv   every contact as of the start of journal 4 (atomic write + fsync)
+    journal-000004.log    changes since then, one line per add/update/remove
+    journal-000005.log    ...
+
+Each journal line is "<crc32 hex> <json>", e.g. 1f0c33a2 {"o":"r","i":"<cid hex>"}, so a
+change costs one short append however big the book is. Lines are fsync'ed in batches:
+every `sync_every` changes, and at most `sync_interval` seconds after a change by a
+background thread (sync_every=1: fsync per change). A crash loses at most the unsynced
+changes, never the files: a torn last line fails its checksum and replay stops there.
+
+Opening replays the newest snapshot, then the journals from its generation on; the first
+change after that starts a new journal (old journals are never appended to, so a torn
+line is always at the end of one, and opening without writing creates no file).
+compact() switches to a new journal and writes the snapshot in a background thread
+(writers only wait while the contacts' fields are copied); once the snapshot is in place
+the older snapshot and journals are deleted. It also runs by itself once `compact_after`
+changes are journaled but not snapshotted, counting the ones replayed at open, so
+short-lived processes don't pile up journals either.
+"""
+import gc
+import json
+import os
+import re
+import threading
+import uuid
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from contact import Contact
+from contact_book import CSV_COLUMNS, ContactBook, LoadReport
+
+_FILE_RE = re.compile(r"(snapshot|journal)-(\d{6})\.(csv|log)")
+# temp files of a snapshot write (mkstemp adds [a-z0-9_] characters between the two)
+_TMP_PREFIX, _TMP_SUFFIX = "snapshot-tmp-", ".tmp"
+_TMP_RE = re.compile(rf"{_TMP_PREFIX}[a-z0-9_]+{re.escape(_TMP_SUFFIX)}")
+
+
+def _fsync_dir(directory: str):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_synced(df: pd.DataFrame, path: str):
+    with open(path, "w", encoding="UTF-8", newline="") as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def encode(record: Dict[str, str]) -> bytes:
+    payload = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("UTF-8")
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def decode(line: bytes) -> Optional[Dict[str, str]]:
+    """The record, or None for a torn or corrupted line."""
+    if not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+class JournaledContactBook(ContactBook):
+    """ContactBook whose add/update/remove (and bulk loads) are persisted in `directory`."""
+
+    def __init__(self, directory: str, sync_every: int = 64, sync_interval: float = 0.05,
+                 compact_after: Optional[int] = 100_000):
+        super().__init__()
+        self.directory = directory
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_after = compact_after
+        self.replayed = 0 # journal records applied at startup
+        self.torn = 0 # journals that ended in a torn/corrupt line
+        self.compaction_error: Optional[BaseException] = None # last background failure (files left intact)
+        self._lock = threading.RLock() # book + journal file
+        self._pending = 0 # written, not fsync'ed yet
+        self._records = 0 # journaled since the last snapshot
+        self._compactor: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+        os.makedirs(directory, exist_ok=True)
+        self._replaying = True
+        base, last = self._recover()
+        self._replaying = False
+        self._records = self.replayed
+        self._gen = max(base, last) + 1 # of the next journal, opened by the first change
+        self._log = None
+        self._flusher = None
+        if sync_every > 1:
+            self._flusher = threading.Thread(target=self._flush_loop, name="journal-fsync", daemon=True)
+            self._flusher.start()
+        if self.compact_after is not None and self._records >= self.compact_after:
+            self.compact(wait=False)
+
+    # ---- files ----
+    def _path(self, kind: str, gen: int) -> str:
+        return os.path.join(self.directory, f"{kind}-{gen:06d}.{'csv' if kind == 'snapshot' else 'log'}")
+
+    def _generations(self, kind: str):
+        return sorted(int(m.group(2)) for m in map(_FILE_RE.fullmatch, os.listdir(self.directory))
+                      if m and m.group(1) == kind)
+
+    def _recover(self):
+        for name in os.listdir(self.directory): # temp files of an interrupted snapshot write
+            if _TMP_RE.fullmatch(name):
+                os.remove(os.path.join(self.directory, name))
+        snapshots = self._generations("snapshot")
+        base = snapshots[-1] if snapshots else 0
+        if base:
+            self.load_csv(self._path("snapshot", base))
+        journals = [g for g in self._generations("journal") if g >= base]
+        for gen in journals:
+            self._replay(self._path("journal", gen))
+        return base, journals[-1] if journals else 0
+
+    def _replay(self, path: str):
+        with open(path, "rb") as f:
+            for line in f:
+                record = decode(line)
+                if record is None: # only ever the tail: a journal isn't appended to after a restart
+                    self.torn += 1
+                    return
+                self._apply(record)
+                self.replayed += 1
+
+    def _apply(self, record: Dict[str, str]):
+        op, cid = record["o"], uuid.UUID(record["i"])
+        if op == "a":
+            super().add_contact(Contact.from_valid(record["n"], record["p"], record["e"], cid))
+        elif op == "u":
+            super().update_contacts(cid, **{f: record[k] for f, k in (("cname", "n"), ("phone", "p"), ("email", "e")) if k in record})
+        elif op == "r":
+            contact = self.get_contact(cid)
+            if contact:
+                super().remove_contact(contact)
+
+    # ---- journal writes ----
+    def _append(self, record: Dict[str, str]):
+        if self._log is None:
+            self._log = open(self._path("journal", self._gen), "ab")
+            _fsync_dir(self.directory)
+        self._log.write(encode(record))
+        self._pending += 1
+        self._records += 1
+        if self._pending >= self.sync_every:
+            self._sync()
+        if self.compact_after is not None and self._records >= self.compact_after and not self._compacting():
+            self.compact(wait=False)
+
+    def _sync(self):
+        if self._pending:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._pending = 0
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.sync_interval):
+            with self._lock:
+                self._sync()
+
+    def flush(self):
+        """fsync every journaled change now."""
+        with self._lock:
+            self._sync()
+
+    # ---- ContactBook changes, journaled ----
+    def add_contact(self, contact: Contact, reject_duplicates: bool = False):
+        with self._lock:
+            super().add_contact(contact, reject_duplicates)
+            if not self._replaying:
+                self._append({"o": "a", "i": contact.cid.hex, "n": contact.cname, "p": contact.phone, "e": contact.email})
+
+    def remove_contact(self, contact: Contact):
+        with self._lock:
+            present = contact.cid in self._contact
+            super().remove_contact(contact)
+            if present and not self._replaying:
+                self._append({"o": "r", "i": contact.cid.hex})
+
+    def update_contacts(self, contact_id: uuid.UUID, **kwargs):
+        with self._lock:
+            if not super().update_contacts(contact_id, **kwargs):
+                return False
+            if not self._replaying:
+                contact = self.get_contact(contact_id)
+                record = {"o": "u", "i": contact_id.hex}
+                for field, key in (("cname", "n"), ("phone", "p"), ("email", "e")):
+                    if field in kwargs:
+                        record[key] = getattr(contact, field) # stored (stripped) value
+                self._append(record)
+            return True
+
+    def load_frame(self, df: pd.DataFrame, replace: bool = True, first_row: int = 2) -> LoadReport:
+        """Bulk loads aren't journaled row by row: the result is compacted straight into a snapshot."""
+        with self._lock:
+            report = super().load_frame(df, replace, first_row)
+        if not self._replaying:
+            self.compact(wait=True)
+        return report
+
+    # ---- compaction ----
+    def _compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def compact(self, wait: bool = True):
+        """
+        Fold the journals into a new snapshot. Writers are only held up while the
+        contacts are copied; the snapshot is written by a background thread
+        (wait=True: in this thread, and errors are raised instead of recorded).
+        """
+        if self._compactor is not None:
+            self._compactor.join() # one at a time
+        with self._lock:
+            self._sync()
+            # field values only: contacts are updated in place, and str(cid)/the DataFrame can wait.
+            # gc off meanwhile: 100k new tuples would trigger full collections (4x the copy itself)
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                rows = [(c.cname, c.phone, c.email, c.cid) for c in self._contact.values()]
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+            if self._log is not None: # changes after this go to the next journal
+                self._log.close()
+                self._log = None
+                self._gen += 1
+            gen = self._gen # snapshot-<gen> holds everything in the journals before <gen>
+            self._records = 0
+        if wait:
+            self._write_snapshot(rows, gen)
+        else:
+            self._compactor = threading.Thread(target=self._write_snapshot_logged, args=(rows, gen),
+                                               name="journal-compact", daemon=True)
+            self._compactor.start()
+
+    def _write_snapshot(self, rows: List[Tuple[str, str, str, uuid.UUID]], gen: int):
+        frame = pd.DataFrame([(n, p, e, str(cid)) for n, p, e, cid in rows], columns=CSV_COLUMNS)
+        self._atomic_write(self._path("snapshot", gen), lambda tmp: _write_synced(frame, tmp), _TMP_PREFIX, _TMP_SUFFIX)
+        _fsync_dir(self.directory) # the rename (and the new journal) are durable
+        for kind in ("snapshot", "journal"):
+            for old in self._generations(kind):
+                if old < gen:
+                    os.remove(self._path(kind, old))
+
+    def _write_snapshot_logged(self, rows: List[Tuple[str, str, str, uuid.UUID]], gen: int):
+        try:
+            self._write_snapshot(rows, gen)
+        except Exception as e: # older snapshot + journals are still there, nothing is lost
+            self.compaction_error = e
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.join()
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            if self._log is not None:
+                self._sync()
+                self._log.close()
+                self._log = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,258 @@
+"""
+ContactBook stored in SQLite instead of a dict that is saved by rewriting the whole CSV.
+
+SQLiteContactBook has the same public methods as ContactBook (add_contact, update_contacts,
+search_for, search_prefix, find_by_phone, ...), so either can be used behind the same
+code. Every change writes only its own row, in place, so a save no longer costs O(book).
+
+- WAL journal + synchronous=NORMAL: a commit is one append to the WAL, readers don't block
+  the writer. Each method call commits on its own; wrap several in `with book.transaction():`
+  to commit them together (and roll them all back on an exception).
+- name/phone/email are stored next to their normalized keys (same rules as ContactBook),
+  each key column has an index; cid is stored as uuid.bytes (16 bytes).
+- SQL strings are constants, so sqlite3's statement cache prepares each one once; bulk
+  writes (add_many, load_csv) go through executemany in a single transaction.
+- Iterating the book streams rows from a cursor in batches instead of building a list.
+"""
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from contact import Contact
+from contact_book import CSV_COLUMNS, KEY_COLUMNS, ContactBook, LoadReport, normalize_email, normalize_name, normalize_phone, validate_frame
+from fuzzy_index import TrigramIndex
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    seq       INTEGER PRIMARY KEY, -- insertion order, like ContactBook's dict
+    cid       BLOB NOT NULL UNIQUE,
+    cname     TEXT NOT NULL,
+    phone     TEXT NOT NULL,
+    email     TEXT NOT NULL,
+    name_key  TEXT NOT NULL,
+    phone_key TEXT NOT NULL,
+    email_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contacts_name_key ON contacts(name_key);
+CREATE INDEX IF NOT EXISTS contacts_phone_key ON contacts(phone_key);
+CREATE INDEX IF NOT EXISTS contacts_email_key ON contacts(email_key);
+"""
+_SELECT = "SELECT cname, phone, email, cid FROM contacts"
+# re-adding an id updates the row in place (keeps its seq, like re-setting a dict key)
+_UPSERT = ("INSERT INTO contacts (cname, phone, email, cid, name_key, phone_key, email_key) VALUES (?, ?, ?, ?, ?, ?, ?) "
+           "ON CONFLICT(cid) DO UPDATE SET cname = excluded.cname, phone = excluded.phone, email = excluded.email, "
+           "name_key = excluded.name_key, phone_key = excluded.phone_key, email_key = excluded.email_key")
+_PREFIX_END = "\U0010ffff" # sorts after every other character (and its UTF-8 bytes after every other)
+
+
+def _row(contact: Contact) -> Tuple:
+    return (contact.cname, contact.phone, contact.email, contact.cid.bytes,
+            normalize_name(contact.cname), normalize_phone(contact.phone), normalize_email(contact.email))
+
+
+def _contact(row: Tuple) -> Contact:
+    cname, phone, email, cid = row
+    return Contact.from_valid(cname, phone, email, uuid.UUID(bytes=cid))
+
+
+class SQLiteContactBook:
+    ALLOWED_UPDATE_FIELDS = ContactBook.ALLOWED_UPDATE_FIELDS
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 1000):
+        # isolation_level=None: no implicit transactions, we issue BEGIN/COMMIT ourselves
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL") # durable at checkpoints, never corrupt (WAL)
+        self._db.executescript(_SCHEMA)
+        self.batch_size = batch_size # rows per fetch when iterating
+        self._depth = 0 # nesting of transaction()
+        self._trigrams: Optional[TrigramIndex] = None # built by the first fuzzy_search()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Commit everything inside as one transaction (nested blocks join the outer one)."""
+        if self._depth == 0:
+            self._db.execute("BEGIN")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self._db.execute("ROLLBACK")
+                self._trigrams = None # may hold keys from the rolled back writes
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self._db.execute("COMMIT")
+
+    # ---- reads ----
+    def _query(self, sql: str, params: Iterable = ()) -> List[Contact]:
+        return [_contact(row) for row in self._db.execute(sql, tuple(params))]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM contacts").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Contact]:
+        """Contacts in insertion order, fetched batch_size rows at a time."""
+        cur = self._db.execute(f"{_SELECT} ORDER BY seq")
+        while True:
+            rows = cur.fetchmany(self.batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield _contact(row)
+
+    def list_contacts(self):
+        return list(self)
+
+    def get_contact(self, contact_id: uuid.UUID) -> Contact | None:
+        found = self._query(f"{_SELECT} WHERE cid = ?", (contact_id.bytes,))
+        return found[0] if found else None
+
+    def search_for(self, name: str):
+        """Contacts whose name matches, ignoring case."""
+        return self._query(f"{_SELECT} WHERE name_key = ? ORDER BY seq", (normalize_name(name),))
+
+    def search_prefix(self, prefix: str, limit: Optional[int] = None) -> List[Contact]:
+        """Contacts whose name starts with prefix (ignoring case), in name order."""
+        key = normalize_name(prefix)
+        return self._query(f"{_SELECT} WHERE name_key >= ? AND name_key < ? ORDER BY name_key, seq LIMIT ?",
+                           (key, key + _PREFIX_END, -1 if limit is None else limit))
+
+    def find_by_phone(self, phone: str) -> List[Contact]:
+        """Formatting is ignored: "555-0199" finds "(555) 0199"."""
+        return self._query(f"{_SELECT} WHERE phone_key = ? ORDER BY seq", (normalize_phone(phone),))
+
+    def find_by_email(self, email: str) -> List[Contact]:
+        return self._query(f"{_SELECT} WHERE email_key = ? ORDER BY seq", (normalize_email(email),))
+
+    def find_duplicates(self, contact: Contact) -> List[Contact]:
+        """Other contacts with the same (normalized) phone or email."""
+        return self._query(f"{_SELECT} WHERE (email_key = ? OR phone_key = ?) AND cid != ? ORDER BY seq",
+                           (normalize_email(contact.email), normalize_phone(contact.phone), contact.cid.bytes))
+
+    def fuzzy_search(self, name: str, threshold: float = 0.3, limit: Optional[int] = 10) -> List[Tuple[Contact, float]]:
+        """
+        Typo-tolerant name search: (contact, similarity 0..1) pairs, best first (see
+        ContactBook.fuzzy_search). The trigram index lives in memory, built from the
+        distinct name keys on first use.
+        """
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex()
+            for (key,) in self._db.execute("SELECT DISTINCT name_key FROM contacts"):
+                self._trigrams.add(key)
+        results: List[Tuple[Contact, float]] = []
+        for key, score in self._trigrams.search(normalize_name(name), threshold, limit):
+            for contact in self._query(f"{_SELECT} WHERE name_key = ? ORDER BY seq", (key,)):
+                results.append((contact, score))
+                if limit is not None and len(results) >= limit:
+                    return results
+        return results
+
+    # ---- writes ----
+    def _name_key_of(self, cid: uuid.UUID) -> Optional[str]:
+        row = self._db.execute("SELECT name_key FROM contacts WHERE cid = ?", (cid.bytes,)).fetchone()
+        return row[0] if row else None
+
+    def _drop_name_key(self, key: Optional[str]):
+        """Take key out of the trigram index if no contact has it any more."""
+        if self._trigrams is not None and key is not None and \
+                self._db.execute("SELECT 1 FROM contacts WHERE name_key = ? LIMIT 1", (key,)).fetchone() is None:
+            self._trigrams.remove(key)
+
+    def add_contact(self, contact: Contact, reject_duplicates: bool = False):
+        """
+        Add a new contact to the book (re-adding an id replaces that contact).
+        reject_duplicates=True raises ValueError if another contact has the same phone or email.
+        """
+        with self.transaction():
+            if reject_duplicates:
+                dupes = self.find_duplicates(contact)
+                if dupes:
+                    raise ValueError(f"duplicate of {dupes[0]} (same phone or email)")
+            old_key = self._name_key_of(contact.cid)
+            row = _row(contact)
+            self._db.execute(_UPSERT, row)
+            if self._trigrams is not None:
+                self._trigrams.add(row[4])
+                if old_key != row[4]:
+                    self._drop_name_key(old_key)
+
+    def add_many(self, contacts: Iterable[Contact]) -> int:
+        """Add contacts with one executemany in one transaction. Returns how many were written."""
+        rows = [_row(c) for c in contacts]
+        with self.transaction():
+            self._db.executemany(_UPSERT, rows)
+        self._trigrams = None # rebuilt by the next fuzzy_search
+        return len(rows)
+
+    def remove_contact(self, contact: Contact):
+        """Remove a contact by id."""
+        with self.transaction():
+            old_key = self._name_key_of(contact.cid)
+            self._db.execute("DELETE FROM contacts WHERE cid = ?", (contact.cid.bytes,))
+            self._drop_name_key(old_key)
+
+    def update_contacts(self, contact_id: uuid.UUID, **kwargs):
+        """
+        Update fields of a contact. Allowed fields: cname, phone, email.
+        Returns True if updated, False if contact not found (or the new values are invalid).
+        """
+        contact = self.get_contact(contact_id)
+        if not contact:
+            return False
+        for field_name, value in kwargs.items():
+            if field_name in self.ALLOWED_UPDATE_FIELDS:
+                setattr(contact, field_name, value.strip() if isinstance(value, str) else value)
+        try:
+            contact.__post_init__()
+        except ValueError as e:
+            print(f"Update failed {e}")
+            return False # nothing was written
+        self.add_contact(contact) # upsert of the same cid
+        return True
+
+    # ---- bulk CSV ----
+    def load_frame(self, df: pd.DataFrame, replace: bool = True, first_row: int = 2) -> LoadReport:
+        """
+        Replace the book with the valid rows of `df` (or add them, replace=False),
+        in one transaction (see validate_frame).
+        """
+        valid, errors = validate_frame(df, first_row)
+        valid["cid"] = [uuid.UUID(cid).bytes for cid in valid["cid"]]
+        with self.transaction():
+            if replace:
+                self._db.execute("DELETE FROM contacts")
+            self._db.executemany(_UPSERT, valid[CSV_COLUMNS + KEY_COLUMNS].itertuples(index=False, name=None))
+        self._trigrams = None
+        return LoadReport(loaded=valid["cid"].nunique(), errors=errors) # this frame's contacts, not len(self)
+
+    def load_csv(self, filename: str) -> LoadReport:
+        """Bulk CSV import (see load_frame). Everything is read as str, so phone "007" stays "007"."""
+        df = pd.read_csv(filename, dtype=str, keep_default_na=False, encoding="UTF-8")
+        return self.load_frame(df)
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.read_sql_query(f"{_SELECT} ORDER BY seq", self._db)
+        df["cid"] = [str(uuid.UUID(bytes=cid)) for cid in df["cid"]]
+        return df[CSV_COLUMNS]
+
+    # file export / import: same as ContactBook's (they only use to_frame/load_frame/load_csv)
+    _atomic_write = ContactBook._atomic_write
+    save_to_Panda = ContactBook.save_to_Panda
+    load_contact_pandas = ContactBook.load_contact_pandas
+    save_columnar = ContactBook.save_columnar
+    load_columnar = ContactBook.load_columnar
@@ -0,0 +1,79 @@
+import uuid
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+from contact import Contact
+from contact_book import ContactBook
+from sqlite_book import SQLiteContactBook
+import columnar
+
+def make_book(n=5):
+    book = ContactBook()
+    for i in range(n):
+        book.add_contact(Contact(cname=f"Person {i}", phone=f"00{i}", email=f"p{i}@example.com"))
+    return book
+
+def snapshot(book):
+    return [(c.cid, c.cname, c.phone, c.email) for c in book.list_contacts()]
+
+@pytest.mark.parametrize("name", ["c.parquet", "c.feather", "c.arrow"])
+def test_round_trip(tmp_path, name):
+    book = make_book()
+    path = str(tmp_path / name)
+    assert book.save_columnar(path) == 5
+    other = ContactBook()
+    report = other.load_columnar(path)
+    assert report.loaded == 5 and report.errors == []
+    assert snapshot(other) == snapshot(book) # phone "000" keeps its zeros
+    assert list(tmp_path.iterdir()) == [tmp_path / name] # no temp file left behind
+
+def test_written_with_schema_and_compression(tmp_path):
+    path = str(tmp_path / "c.parquet")
+    make_book().save_columnar(path)
+    meta = pq.ParquetFile(path).metadata
+    assert meta.row_group(0).column(0).compression == "ZSTD"
+    assert pq.read_schema(path).equals(columnar.schema())
+
+def test_schema_is_enforced_on_read(tmp_path):
+    path = str(tmp_path / "bad.parquet")
+    pq.write_table(pa.table({"cname": ["A"], "phone": [123], "email": ["a@example.com"], "cid": [str(uuid.uuid4())]}), path)
+    with pytest.raises(ValueError, match="phone is int64"):
+        ContactBook().load_columnar(path)
+    pq.write_table(pa.table({"cname": ["A"]}), path)
+    with pytest.raises(ValueError, match="missing required column"):
+        ContactBook().load_columnar(path)
+    with pytest.raises(ValueError, match="unknown columnar format"):
+        ContactBook().load_columnar(str(tmp_path / "c.xlsx"))
+
+@pytest.mark.parametrize("name", ["c.parquet", "c.feather"])
+def test_streamed_load_matches_whole_load(tmp_path, name):
+    book = make_book(23)
+    path = str(tmp_path / name)
+    book.save_columnar(path, compression="uncompressed" if name.endswith("feather") else None)
+    assert [len(df) for df in columnar.iter_frames(path, batch_size=10)] == [10, 10, 3]
+    with SQLiteContactBook() as db:
+        db.add_contact(Contact(cname="Stale", phone="1", email="s@example.com"))
+        report = db.load_columnar(path, batch_size=10)
+        assert report.loaded == 23 and db.search_for("stale") == []
+        assert snapshot(db) == snapshot(book)
+
+def test_invalid_records_reported_by_position(tmp_path):
+    path = str(tmp_path / "c.parquet")
+    ids = [str(uuid.uuid4()) for _ in range(4)]
+    pq.write_table(pa.table({"cname": ["A", "", "C", "D"], "phone": ["1", "2", "3", "4"],
+                             "email": ["a@example.com", "b@example.com", "c@example.com", "bad"], "cid": ids}), path)
+    for batch_size in (None, 2):
+        report = ContactBook().load_columnar(path, batch_size=batch_size)
+        assert report.loaded == 2
+        assert [e["row"] for e in report.errors] == [1, 3]
+
+def test_clear_error_without_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setattr(columnar, "pa", None)
+    for call in (lambda: make_book().save_columnar(str(tmp_path / "c.parquet")),
+                 lambda: ContactBook().load_columnar(str(tmp_path / "c.parquet")),
+                 lambda: ContactBook().load_columnar(str(tmp_path / "c.parquet"), batch_size=10),
+                 lambda: columnar.iter_frames(str(tmp_path / "c.feather")),
+                 lambda: columnar.schema()):
+        with pytest.raises(ImportError, match="needs pyarrow"):
+            call()
@@ -0,0 +1,39 @@
+import uuid
+import pytest
+from contact import Contact
+
+def test_contact_has_no_instance_dict():
+    c = Contact(cname="Alice", phone="1", email="alice@example.com")
+    assert not hasattr(c, "__dict__")
+    with pytest.raises(AttributeError):
+        c.nickname = "Al" # slots: typos in field names fail loudly now
+
+def test_to_dict_and_from_valid_unchanged():
+    cid = uuid.uuid4()
+    c = Contact.from_valid("Alice", "1", "alice@example.com", cid)
+    assert c.to_Dict() == {"cname": "Alice", "phone": "1", "email": "alice@example.com", "cid": cid}
+    assert c == Contact(cname=" Alice ", phone="1", email="alice@example.com", cid=cid)
+
+def test_shared_keys_grow_and_shrink_buckets():
+    from contact_book import ContactBook
+    book = ContactBook()
+    a = Contact(cname="A", phone="555", email="a@example.com")
+    b = Contact(cname="B", phone="5-5-5", email="b@example.com")
+    book.add_contact(a)
+    assert book._by_phone["555"] == a.cid # single id stored bare
+    book.add_contact(b)
+    assert book.find_by_phone("555") == [a, b]
+    assert book.find_duplicates(Contact(cname="C", phone="555", email="c@example.com")) == [a, b]
+    book.remove_contact(a)
+    assert book._by_phone["555"] == b.cid
+    assert book.find_by_phone("555") == [b]
+    book.remove_contact(b)
+    assert "555" not in book._by_phone and book.search_prefix("") == []
+
+def test_unchanged_keys_share_field_strings():
+    from contact_book import ContactBook
+    book = ContactBook()
+    c = Contact(cname="x", phone="0123", email="x@example.com")
+    book.add_contact(c)
+    name, phone, email = book._keys[c.cid]
+    assert name is c.cname and phone is c.phone and email is c.email
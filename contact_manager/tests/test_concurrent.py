@@ -0,0 +1,129 @@
+import random
+import threading
+import pytest
+from contact import Contact
+from contact_book import ContactBook
+from concurrent_book import ConcurrentContactBook, _Overlapped
+
+def assert_consistent(book):
+    """Every contact is indexed under its current keys and nothing else is indexed."""
+    expected = {"name": {}, "phone": {}, "email": {}}
+    for cid, c in book._contact.items():
+        for kind, key in zip(expected, ContactBook._index_keys(c)):
+            expected[kind].setdefault(key, set()).add(cid)
+    for kind, index in (("name", book._by_name), ("phone", book._by_phone), ("email", book._by_email)):
+        assert {k: set(book._ids(index, k)) for k in index} == expected[kind]
+    assert book._sorted_name_keys() == sorted(book._by_name)
+
+def test_search_overlapping_a_write_is_retried_without_the_lock():
+    book = ConcurrentContactBook()
+    book.add_contact(Contact(cname="Alice", phone="1", email="alice@example.com"))
+    calls = []
+    def search():
+        calls.append(book._write_lock._is_owned())
+        if len(calls) == 1: # a writer gets in during the unlocked attempt
+            book.add_contact(Contact(cname="Bob", phone="2", email="bob@example.com"))
+        return [c.cname for c in ContactBook.list_contacts(book)]
+    assert book._read(search) == ["Alice", "Bob"]
+    assert calls == [False, False] and book.read_retries == 0
+
+def test_search_that_keeps_overlapping_writes_runs_under_the_lock():
+    book = ConcurrentContactBook()
+    calls = []
+    def search():
+        calls.append(book._write_lock._is_owned())
+        if len(calls) <= book.optimistic_tries:
+            book.add_contact(Contact(cname=f"P{len(calls)}", phone="1", email="p@example.com"))
+        return len(ContactBook.list_contacts(book))
+    assert book._read(search) == book.optimistic_tries
+    assert calls == [False] * book.optimistic_tries + [True] and book.read_retries == 1
+    assert book.search_for("p1")[0].cname == "P1" and book.read_retries == 1
+
+def test_search_prefix_mid_write_does_not_wait_for_the_writer():
+    book = ConcurrentContactBook()
+    inside, go = threading.Event(), threading.Event()
+    def writer():
+        with book._writing(): # stopped between _index and the end of the write: keys are pending
+            ContactBook.add_contact(book, Contact(cname="Alice", phone="1", email="alice@example.com"))
+            inside.set()
+            go.wait(5)
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        assert inside.wait(5)
+        outcome = []
+        def probe():
+            try:
+                book._sorted_name_keys()
+            except _Overlapped:
+                outcome.append("retry")
+        p = threading.Thread(target=probe)
+        p.start()
+        p.join(1.0)
+        assert outcome == ["retry"] # not blocked on the writer's lock
+    finally:
+        go.set()
+        t.join()
+    assert [c.cname for c in book.search_prefix("al")] == ["Alice"]
+
+def test_update_swaps_contact_atomically():
+    book = ConcurrentContactBook()
+    c = Contact(cname="Alice", phone="1", email="alice@example.com")
+    book.add_contact(c)
+    assert not book.update_contacts(c.cid, cname="Bob", email="broken")
+    assert book.get_contact(c.cid) is c and c.cname == "Alice" # never touched
+    assert book.update_contacts(c.cid, cname=" Bob ")
+    new = book.get_contact(c.cid)
+    assert new is not c and new.cname == "Bob" and c.cname == "Alice"
+    assert book.search_for("bob") == [new] and book.search_for("alice") == []
+    assert not book._keys_added and not book._keys_removed # kept current by the writer, searches never write
+    with pytest.raises(ValueError):
+        book.add_contact(Contact(cname="X", phone="1", email="x@example.com"), reject_duplicates=True)
+
+def test_stress_readers_and_writers():
+    book = ConcurrentContactBook()
+    for i in range(200):
+        book.add_contact(Contact(cname=f"Person {i}", phone=str(i), email=f"p{i}@example.com"))
+    errors, stop = [], threading.Event()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        try:
+            for n in range(300):
+                ids = list(book._contact) # racy view of ids is fine: every op tolerates a missing id
+                cid = rng.choice(ids)
+                op = rng.random()
+                if op < 0.4:
+                    book.update_contacts(cid, cname=f"Person {rng.randrange(400)}", phone=str(rng.randrange(400)))
+                elif op < 0.7:
+                    book.add_contact(Contact(cname=f"New {seed} {n}", phone=str(rng.randrange(400)), email=f"n{seed}.{n}@example.com"))
+                else:
+                    c = book.get_contact(cid)
+                    if c:
+                        book.remove_contact(c)
+        except Exception as e:
+            errors.append(e)
+
+    def reader(seed):
+        rng = random.Random(seed)
+        try:
+            while not stop.is_set():
+                name = f"person {rng.randrange(400)}"
+                for c in book.search_for(name):
+                    assert c.cname.casefold() == name # never a half-updated contact
+                for c in book.search_prefix("new", limit=5):
+                    assert c.cname.startswith("New")
+                book.find_by_phone(str(rng.randrange(400)))
+                book.fuzzy_search("Persn 12", limit=3)
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=writer, args=(s,)) for s in range(4)]
+    readers = [threading.Thread(target=reader, args=(100 + s,)) for s in range(6)]
+    for t in readers + writers: t.start()
+    for t in writers: t.join()
+    stop.set()
+    for t in readers: t.join()
+    assert errors == []
+    assert_consistent(book)
+    assert len(book._trigrams) == len(book._by_name) and all(k in book._trigrams for k in book._by_name)
@@ -0,0 +1,90 @@
+import uuid
+import pandas as pd
+import pytest
+from contact_book import ContactBook, Contact
+
+GOOD_ID = "2f1c9a8e-5b7d-4c1e-9a3f-6d2b8e4f0a11"
+
+def write_csv(path, rows):
+    pd.DataFrame(rows, columns=["cname", "phone", "email", "cid"]).to_csv(path, index=False)
+    return str(path)
+
+def test_round_trip_keeps_ids_and_fields(tmp_path):
+    book = ContactBook()
+    book.add_contact(Contact(cname="Alice", phone="0712 345", email="alice@example.com"))
+    book.add_contact(Contact(cname="Bob", phone="007", email="bob@example.com"))
+    path = str(tmp_path / "c.csv")
+    assert book.save_to_Panda(path) == 2
+    other = ContactBook()
+    report = other.load_csv(path)
+    assert report.loaded == 2 and report.errors == []
+    assert {c.cid: (c.cname, c.phone, c.email) for c in other.list_contacts()} == \
+           {c.cid: (c.cname, c.phone, c.email) for c in book.list_contacts()}
+    assert all(isinstance(c.cid, uuid.UUID) for c in other.list_contacts())
+    assert other.find_by_phone("007")[0].phone == "007" # leading zeros survive (read as str)
+
+def test_invalid_rows_are_reported_not_fatal(tmp_path):
+    path = write_csv(tmp_path / "c.csv", [
+        ["  Alice ", " 123 ", "alice@example.com", GOOD_ID],
+        ["", "456", "nobody@example.com", str(uuid.uuid4())],
+        ["Carol", "789", "not-an-email", "xyz"],
+    ])
+    book = ContactBook()
+    report = book.load_csv(path)
+    assert report.loaded == 1
+    assert [c.cname for c in book.list_contacts()] == ["Alice"] # stripped like __post_init__
+    assert book.list_contacts()[0].phone == "123"
+    assert [e["row"] for e in report.errors] == [3, 4]
+    assert report.errors[0]["errors"] == ["name must not be empty"]
+    assert report.errors[1]["errors"] == ["email is invalid", "cid is not a UUID"]
+    assert report.errors[1]["cname"] == "Carol"
+
+def test_repeated_cid_last_row_wins(tmp_path):
+    path = write_csv(tmp_path / "c.csv", [
+        ["Old", "1", "old@example.com", GOOD_ID],
+        ["New", "2", "new@example.com", GOOD_ID],
+    ])
+    book = ContactBook()
+    assert book.load_csv(path).loaded == 1
+    assert book.search_for("old") == []
+    assert [c.cname for c in book.find_by_phone("2")] == ["New"]
+
+def test_missing_column(tmp_path):
+    path = tmp_path / "c.csv"
+    pd.DataFrame({"cname": ["A"], "phone": ["1"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="email, cid"):
+        ContactBook().load_csv(str(path))
+    assert ContactBook().load_contact_pandas(str(path)) == 0
+
+def test_load_contact_pandas_summary_and_table(tmp_path, capsys):
+    path = write_csv(tmp_path / "c.csv", [
+        ["Alice", "123", "alice@example.com", GOOD_ID],
+        ["Bad", "", "bad@example.com", str(uuid.uuid4())],
+    ])
+    book = ContactBook()
+    assert book.load_contact_pandas(path) == 1
+    out = capsys.readouterr().out
+    assert "Skipped 1 invalid row" in out and "Alice" not in out
+    book.load_contact_pandas(path, show_table=True)
+    assert "Alice" in capsys.readouterr().out
+    assert book.load_contact_pandas(str(tmp_path / "missing.csv")) == 0
+
+def test_save_is_atomic_on_failure(tmp_path, monkeypatch):
+    path = tmp_path / "c.csv"
+    path.write_text("original")
+    book = ContactBook()
+    book.add_contact(Contact(cname="A", phone="1", email="a@example.com"))
+    def boom(self, *args, **kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(pd.DataFrame, "to_csv", boom)
+    with pytest.raises(OSError):
+        book.save_to_Panda(str(path))
+    assert path.read_text() == "original"
+    assert list(tmp_path.iterdir()) == [path] # temp file cleaned up
+
+def test_report_counts_the_file_not_the_book(tmp_path):
+    path = write_csv(tmp_path / "c.csv", [["Alice", "1", "alice@example.com", GOOD_ID]])
+    book = ContactBook()
+    book.add_contact(Contact(cname="Bob", phone="2", email="bob@example.com"))
+    report = book.load_frame(pd.read_csv(path, dtype=str), replace=False)
+    assert report.loaded == 1 and len(book.list_contacts()) == 2
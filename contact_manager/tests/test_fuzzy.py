@@ -0,0 +1,74 @@
+from contact_book import ContactBook, Contact
+from fuzzy_index import TrigramIndex, trigrams
+
+def make_book(*names):
+    book = ContactBook()
+    for i, n in enumerate(names):
+        book.add_contact(Contact(cname=n, phone=str(100 + i), email=f"u{i}@example.com"))
+    return book
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+    assert trigrams("a b") == {"  a", " a ", "  b", " b "}
+
+def test_index_ranks_by_similarity():
+    idx = TrigramIndex()
+    for k in ("john smith", "jon smith", "joan smyth", "mary jones"):
+        idx.add(k)
+    hits = idx.search("john smiht", threshold=0.3)
+    assert hits[0][0] == "john smith"
+    assert [k for k, _ in hits] == sorted((k for k, _ in hits), key=lambda k: -dict(hits)[k])
+    assert all(0.3 <= score <= 1 for _, score in hits)
+    assert "mary jones" not in dict(hits)
+    assert idx.search("john smith")[0] == ("john smith", 1.0)
+
+def test_threshold_and_limit():
+    idx = TrigramIndex()
+    for i in range(50):
+        idx.add(f"alice {i:03d}")
+    assert len(idx.search("alice 001", threshold=0.1, limit=5)) == 5
+    assert idx.search("zzzzzz", threshold=0.3) == []
+    strict = idx.search("alice 001", threshold=0.99, limit=None)
+    assert strict == [("alice 001", 1.0)]
+
+def test_remove_and_revive():
+    idx = TrigramIndex()
+    idx.add("grace hopper")
+    idx.remove("grace hopper")
+    assert "grace hopper" not in idx and len(idx) == 0
+    assert idx.search("grace hopper") == []
+    idx.add("grace hopper")
+    assert idx.search("grase hopper")[0][0] == "grace hopper"
+
+def test_churn_does_not_grow_postings():
+    idx = TrigramIndex()
+    idx.add("keeper")
+    for i in range(5000): # e.g. a contact renamed over and over
+        idx.add(f"name {i}")
+        idx.remove(f"name {i}")
+    assert len(idx) == 1 and len(idx._keys) < 2000
+    assert sum(n for _, n in idx._postings.values()) < 2000 * 8
+    assert idx.search("keper")[0][0] == "keeper" and idx.search("name 4999") == []
+    idx.add("name 4999")
+    assert idx.search("name 4999")[0] == ("name 4999", 1.0)
+
+def test_book_fuzzy_search_returns_contacts():
+    book = make_book("John Smith", "Jon Smyth", "Mary Jones", "john smith")
+    hits = book.fuzzy_search("John Smiht")
+    names = [c.cname for c, _ in hits]
+    assert names[:2] == ["John Smith", "john smith"] # same key, same score
+    assert hits[0][1] == hits[1][1]
+    assert "Mary Jones" not in names
+    assert len(book.fuzzy_search("John Smiht", limit=1)) == 1
+
+def test_book_fuzzy_index_follows_changes():
+    book = make_book("Ada Lovelace", "Alan Turing")
+    assert book.fuzzy_search("Ada Lovlace")[0][0].cname == "Ada Lovelace" # index built here
+    ada = book.search_for("ada lovelace")[0]
+    book.update_contacts(ada.cid, cname="Grace Hopper")
+    assert book.fuzzy_search("Ada Lovlace", threshold=0.5) == []
+    assert book.fuzzy_search("Grace Hoper")[0][0] is ada
+    book.remove_contact(ada)
+    assert book.fuzzy_search("Grace Hoper", threshold=0.5) == []
+    book.add_contact(Contact(cname="Edsger Dijkstra", phone="9", email="ed@example.com"))
+    assert book.fuzzy_search("Edsgar Dijkstra")[0][0].cname == "Edsger Dijkstra"
@@ -0,0 +1,81 @@
+import pytest
+from contact_book import ContactBook, Contact
+
+@pytest.fixture
+def book():
+    b = ContactBook()
+    b.add_contact(Contact(cname="Alice Smith", phone="+1 (555) 010-1", email="Alice@Example.com"))
+    b.add_contact(Contact(cname="alice smith", phone="555 0102", email="alice2@example.com"))
+    b.add_contact(Contact(cname="Alan Turing", phone="555 0103", email="alan@example.com"))
+    b.add_contact(Contact(cname="Bob", phone="555 0104", email="bob@example.com"))
+    return b
+
+def test_lookup_by_phone_and_email_ignores_formatting(book):
+    assert [c.cname for c in book.find_by_phone("15550101")] == ["Alice Smith"]
+    assert [c.cname for c in book.find_by_email(" ALICE@example.COM ")] == ["Alice Smith"]
+    assert book.find_by_phone("999") == []
+
+def test_search_prefix_in_name_order(book):
+    assert [c.cname for c in book.search_prefix("al")] == ["Alan Turing", "Alice Smith", "alice smith"]
+    assert [c.cname for c in book.search_prefix("ALI", limit=1)] == ["Alice Smith"]
+    assert book.search_prefix("z") == []
+
+def test_indexes_follow_remove(book):
+    bob = book.search_for("bob")[0]
+    book.remove_contact(bob)
+    assert book.search_for("Bob") == []
+    assert book.find_by_email("bob@example.com") == []
+    assert book.search_prefix("b") == []
+    assert "bob" not in book._sorted_name_keys()
+
+def test_indexes_follow_update_and_rollback(book):
+    alan = book.search_for("alan turing")[0]
+    assert book.update_contacts(alan.cid, cname="Ada Lovelace", phone="555 0200")
+    assert book.search_for("alan turing") == []
+    assert book.search_for("ADA LOVELACE") == [alan]
+    assert book.find_by_phone("5550200") == [alan]
+    assert book.find_by_phone("5550103") == []
+    # invalid email -> rolled back, old keys still indexed
+    assert not book.update_contacts(alan.cid, cname="Nobody", email="broken")
+    assert book.search_for("Ada Lovelace") == [alan]
+    assert book.search_for("Nobody") == []
+
+def test_update_with_non_string_keeps_contact_indexed(book, capsys):
+    alice = book.find_by_email("alice@example.com")[0]
+    assert not book.update_contacts(alice.cid, phone=5551234)
+    assert "phone must be a string" in capsys.readouterr().out
+    assert alice.phone == "+1 (555) 010-1"
+    assert alice in book.search_for("alice smith") and book.find_by_email("alice@example.com") == [alice]
+
+def test_update_rolls_back_on_any_error(book, monkeypatch):
+    bob = book.search_for("bob")[0]
+    def boom(self):
+        raise RuntimeError("validator crashed")
+    monkeypatch.setattr(Contact, "__post_init__", boom)
+    with pytest.raises(RuntimeError):
+        book.update_contacts(bob.cid, cname="Robert")
+    assert bob.cname == "Bob" and book.search_for("bob") == [bob] and book.find_by_phone("5550104") == [bob]
+
+def test_duplicate_detection(book):
+    dupe = Contact(cname="Someone Else", phone="555-0104", email="new@example.com")
+    assert [c.cname for c in book.find_duplicates(dupe)] == ["Bob"]
+    with pytest.raises(ValueError):
+        book.add_contact(dupe, reject_duplicates=True)
+    assert book.search_for("Someone Else") == []
+    book.add_contact(dupe) # allowed by default, like before
+    assert len(book.find_by_phone("5550104")) == 2
+
+def test_readding_same_id_replaces_index_entries(book):
+    bob = book.search_for("bob")[0]
+    book.add_contact(bob)
+    assert book.search_for("bob") == [bob]
+    assert len(book.list_contacts()) == 4
+
+def test_load_goes_through_indexes(book, tmp_path):
+    path = tmp_path / "contacts.csv"
+    book.save_to_Panda(str(path))
+    other = ContactBook()
+    other.add_contact(Contact(cname="Stale", phone="1", email="stale@example.com"))
+    other.load_contact_pandas(str(path), show_table=False)
+    assert other.search_for("Stale") == []
+    assert [c.cname for c in other.find_by_email("bob@example.com")] == ["Bob"]
@@ -0,0 +1,118 @@
+import os
+import pandas as pd
+import pytest
+import journal
+from contact import Contact
+from journal import JournaledContactBook, decode, encode
+
+def state(book):
+    return [(c.cid, c.cname, c.phone, c.email) for c in book.list_contacts()]
+
+def files(path):
+    return sorted(os.listdir(path))
+
+def test_changes_survive_reopen(tmp_path):
+    with JournaledContactBook(str(tmp_path)) as book:
+        a = Contact(cname="Alice", phone="1", email="alice@example.com")
+        b = Contact(cname="Bob", phone="2", email="bob@example.com")
+        book.add_contact(a)
+        book.add_contact(b)
+        assert book.update_contacts(a.cid, phone=" 555 ")
+        assert not book.update_contacts(a.cid, email="broken") # not journaled
+        book.remove_contact(b)
+        expected = state(book)
+    with JournaledContactBook(str(tmp_path)) as again:
+        assert state(again) == expected == [(a.cid, "Alice", "555", "alice@example.com")]
+        assert again.replayed == 4 and again.torn == 0
+        assert again.find_by_phone("555") == again.list_contacts()
+
+def test_torn_tail_is_ignored(tmp_path):
+    with JournaledContactBook(str(tmp_path)) as book:
+        book.add_contact(Contact(cname="Alice", phone="1", email="alice@example.com"))
+        log = book._log.name
+    with open(log, "ab") as f:
+        f.write(encode({"o": "a", "i": "0" * 32, "n": "Half", "p": "2", "e": "h@example.com"})[:20])
+    with JournaledContactBook(str(tmp_path)) as again:
+        assert [c.cname for c in again.list_contacts()] == ["Alice"]
+        assert again.torn == 1
+        again.add_contact(Contact(cname="Bob", phone="2", email="bob@example.com"))
+    with JournaledContactBook(str(tmp_path)) as third: # written to a new journal, after the torn one
+        assert [c.cname for c in third.list_contacts()] == ["Alice", "Bob"]
+
+def test_records_are_checksummed():
+    line = encode({"o": "r", "i": "ab"})
+    assert decode(line) == {"o": "r", "i": "ab"}
+    assert decode(line.replace(b"ab", b"ac")) is None
+    assert decode(line[:-1]) is None
+
+def test_compaction_replaces_journals_with_snapshot(tmp_path):
+    with JournaledContactBook(str(tmp_path), compact_after=None) as book:
+        for i in range(10):
+            book.add_contact(Contact(cname=f"P{i}", phone=str(i), email=f"p{i}@example.com"))
+        book.compact(wait=True)
+        assert files(tmp_path) == ["snapshot-000002.csv"]
+        book.remove_contact(book.search_for("p3")[0]) # goes to the new journal
+        assert files(tmp_path) == ["journal-000002.log", "snapshot-000002.csv"]
+        expected = state(book)
+    with JournaledContactBook(str(tmp_path)) as again:
+        assert state(again) == expected
+        assert again.replayed == 1
+
+def test_background_compaction_after_threshold(tmp_path):
+    with JournaledContactBook(str(tmp_path), compact_after=5) as book:
+        for i in range(12):
+            book.add_contact(Contact(cname=f"P{i}", phone=str(i), email=f"p{i}@example.com"))
+        book._compactor.join()
+        assert book.compaction_error is None
+        expected = state(book)
+    assert len([f for f in files(tmp_path) if f.startswith("snapshot")]) == 1
+    with JournaledContactBook(str(tmp_path)) as again:
+        assert state(again) == expected
+
+def test_fsync_is_batched(tmp_path, monkeypatch):
+    with JournaledContactBook(str(tmp_path), sync_every=3, sync_interval=60) as book:
+        calls = []
+        for i in range(7):
+            book.add_contact(Contact(cname=f"P{i}", phone=str(i), email=f"p{i}@example.com"))
+            if i == 0: # after the journal file (and its directory entry fsync) exists
+                monkeypatch.setattr(journal.os, "fsync", lambda fd: calls.append(fd))
+        assert len(calls) == 2 and book._pending == 1
+        book.flush()
+        assert len(calls) == 3 and book._pending == 0
+
+def test_bulk_load_is_snapshotted(tmp_path):
+    csv = tmp_path / "in.csv"
+    src = JournaledContactBook(str(tmp_path / "a"))
+    src.add_contact(Contact(cname="Alice", phone="1", email="alice@example.com"))
+    src.save_to_Panda(str(csv))
+    src.close()
+    with JournaledContactBook(str(tmp_path / "b")) as book:
+        book.add_contact(Contact(cname="Stale", phone="9", email="s@example.com"))
+        assert book.load_csv(str(csv)).loaded == 1
+    with JournaledContactBook(str(tmp_path / "b")) as again:
+        assert [c.cname for c in again.list_contacts()] == ["Alice"] and again.replayed == 0
+
+def test_background_fsync_after_interval(tmp_path):
+    import time
+    with JournaledContactBook(str(tmp_path), sync_every=1000, sync_interval=0.01) as book:
+        book.add_contact(Contact(cname="Alice", phone="1", email="alice@example.com"))
+        deadline = time.time() + 5
+        while book._pending and time.time() < deadline:
+            time.sleep(0.01)
+        assert book._pending == 0
+
+def test_only_own_temp_files_are_cleaned_up(tmp_path):
+    (tmp_path / "contacts_backup.csv").write_text("keep me")
+    (tmp_path / "snapshot-tmp-abc123_x.tmp").write_text("half a snapshot")
+    JournaledContactBook(str(tmp_path)).close()
+    assert files(tmp_path) == ["contacts_backup.csv"] # and no empty journal either
+
+def test_short_lived_processes_still_compact(tmp_path):
+    for i in range(20):
+        with JournaledContactBook(str(tmp_path), compact_after=5) as book:
+            book.add_contact(Contact(cname=f"P{i}", phone=str(i), email=f"p{i}@example.com"))
+    names = files(tmp_path)
+    assert len([f for f in names if f.startswith("journal")]) <= 5
+    assert len([f for f in names if f.startswith("snapshot")]) == 1
+    with JournaledContactBook(str(tmp_path), compact_after=5) as again:
+        assert len(again.list_contacts()) == 20 and again.replayed < 5
@@ -0,0 +1,95 @@
+import uuid
+import pandas as pd
+import pytest
+from contact import Contact
+from sqlite_book import SQLiteContactBook
+
+@pytest.fixture
+def book(tmp_path):
+    b = SQLiteContactBook(str(tmp_path / "contacts.db"))
+    b.add_contact(Contact(cname="Alice Smith", phone="+1 (555) 010-1", email="Alice@Example.com"))
+    b.add_contact(Contact(cname="alice smith", phone="555 0102", email="alice2@example.com"))
+    b.add_contact(Contact(cname="Alan Turing", phone="555 0103", email="alan@example.com"))
+    b.add_contact(Contact(cname="Bob", phone="555 0104", email="bob@example.com"))
+    yield b
+    b.close()
+
+def test_wal_and_persistence(book, tmp_path):
+    assert book._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    bob = book.search_for("bob")[0]
+    with SQLiteContactBook(str(tmp_path / "contacts.db")) as again:
+        assert len(again) == 4
+        assert again.get_contact(bob.cid) == bob
+        assert isinstance(again.get_contact(bob.cid).cid, uuid.UUID)
+
+def test_same_lookups_as_contact_book(book):
+    assert [c.cname for c in book.search_for("ALICE SMITH")] == ["Alice Smith", "alice smith"]
+    assert [c.cname for c in book.search_prefix("al")] == ["Alan Turing", "Alice Smith", "alice smith"]
+    assert [c.cname for c in book.search_prefix("al", limit=1)] == ["Alan Turing"]
+    assert [c.cname for c in book.find_by_phone("15550101")] == ["Alice Smith"]
+    assert [c.cname for c in book.find_by_email(" ALICE@example.COM ")] == ["Alice Smith"]
+    dupe = Contact(cname="Someone", phone="555-0104", email="new@example.com")
+    assert [c.cname for c in book.find_duplicates(dupe)] == ["Bob"]
+    with pytest.raises(ValueError):
+        book.add_contact(dupe, reject_duplicates=True)
+    assert len(book) == 4
+
+def test_update_remove_and_readd(book):
+    alan = book.search_for("alan turing")[0]
+    assert book.update_contacts(alan.cid, cname="Ada Lovelace", phone="555 0200")
+    assert book.search_for("alan turing") == []
+    assert book.find_by_phone("5550200")[0].cid == alan.cid
+    assert not book.update_contacts(alan.cid, email="broken") # invalid -> nothing written
+    assert book.get_contact(alan.cid).email == "alan@example.com"
+    assert not book.update_contacts(uuid.uuid4(), cname="x")
+    order = [c.cid for c in book]
+    book.add_contact(book.get_contact(alan.cid)) # re-add keeps its place
+    assert [c.cid for c in book] == order
+    book.remove_contact(book.get_contact(alan.cid))
+    assert book.get_contact(alan.cid) is None and len(book) == 3
+
+def test_transaction_rolls_back_everything(book):
+    with pytest.raises(RuntimeError):
+        with book.transaction():
+            book.add_contact(Contact(cname="Temp", phone="1", email="t@example.com"))
+            with book.transaction(): # joins the outer one
+                book.remove_contact(book.search_for("bob")[0])
+            raise RuntimeError("boom")
+    assert book.search_for("temp") == [] and len(book.search_for("bob")) == 1
+
+def test_lazy_iteration_in_batches(tmp_path):
+    with SQLiteContactBook(str(tmp_path / "b.db"), batch_size=7) as book:
+        assert book.add_many(Contact(cname=f"P{i}", phone=str(i), email=f"p{i}@example.com") for i in range(50)) == 50
+        it = iter(book)
+        assert next(it).cname == "P0"
+        assert [c.cname for c in it] == [f"P{i}" for i in range(1, 50)]
+        assert len(book.list_contacts()) == 50
+
+def test_csv_round_trip_and_report(book, tmp_path):
+    path = str(tmp_path / "c.csv")
+    assert book.save_to_Panda(path) == 4
+    df = pd.read_csv(path, dtype=str)
+    df.loc[len(df)] = ["", "1", "x@example.com", str(uuid.uuid4())]
+    df.to_csv(path, index=False)
+    with SQLiteContactBook() as other:
+        other.add_contact(Contact(cname="Stale", phone="9", email="stale@example.com"))
+        report = other.load_csv(path)
+        assert report.loaded == 4 and [e["row"] for e in report.errors] == [6]
+        assert other.search_for("stale") == []
+        assert [(c.cid, c.cname) for c in other] == [(c.cid, c.cname) for c in book]
+        assert other.load_contact_pandas(str(tmp_path / "missing.csv")) == 0
+
+def test_fuzzy_search_follows_changes(book):
+    assert book.fuzzy_search("Alan Turnig")[0][0].cname == "Alan Turing"
+    alan = book.search_for("alan turing")[0]
+    book.update_contacts(alan.cid, cname="Grace Hopper")
+    assert book.fuzzy_search("Alan Turnig", threshold=0.5) == []
+    assert book.fuzzy_search("Grace Hoper")[0][0].cid == alan.cid
+    alice = book.search_for("alice smith")[0]
+    book.remove_contact(alice) # "alice smith" key still has another contact
+    assert [c.cname for c, _ in book.fuzzy_search("Alice Smyth")] == ["alice smith"]
+
+def test_appending_load_reports_the_frame(book):
+    df = pd.DataFrame([["Eve", "5", "eve@example.com", str(uuid.uuid4())]] * 2, columns=["cname", "phone", "email", "cid"])
+    report = book.load_frame(df, replace=False)
+    assert report.loaded == 1 and len(book) == 5 # same cid twice: one contact
@@ -1,23 +1,150 @@
 import asyncio
+import functools
 
-async def handle_echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+IDLE_TIMEOUT = 30.0 # seconds without data before a client is disconnected
+MIN_BUFFER = 16 * 1024
+MAX_BUFFER = 1024 * 1024
+HIGH_WATER = 256 * 1024 # pause reading a client once this much echo is waiting to be sent
+LOW_WATER = 64 * 1024 # ...and resume once it drains below this
+
+async def handle_echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float = IDLE_TIMEOUT,
+                      stats=None):
+    # stats: optional mapping with "connections", "bytes" and "paused" counters (see multicore.py)
+    if stats is not None:
+        stats["connections"] += 1
     try:
         while True:
             try:
-             data = await asyncio.wait_for(reader.read(4096), timeout=30.0)
+             data = await asyncio.wait_for(reader.read(4096), timeout=timeout)
             except asyncio.TimeoutError:
              print("Inactivity timeout") 
              break  # disconnect idle client
             if not data:
                 break
+            if stats is not None:
+                stats["bytes"] += len(data)
             writer.write(data)
             await writer.drain() #waits until the buffer is sufficiently empty (flushed into the OS).
     finally:
         writer.close()
         await writer.wait_closed() #is the async equivalent of thread.join() for sockets
 
-async def run_server(host="127.0.0.1", port=0):
-    server = await asyncio.start_server(handle_echo, host, port) #Binding = locking the socket to a network address so clients know where to connect.
+
+class _EchoProtocolBase:
+    """
+    Shared plumbing for the protocol engines:
+    - one idle timer per connection. Reads only record a timestamp; when the
+      timer fires it either closes the connection or re-arms itself for the
+      remaining time, so there is no timer/task per read like wait_for().
+    - flow control: when the transport's write buffer passes the high water mark
+      (client not reading its echoes) we stop reading until it drains below low.
+    """
+    def __init__(self, timeout: float = IDLE_TIMEOUT, stats=None,
+                 high_water: int = HIGH_WATER, low_water: int = LOW_WATER):
+        self._timeout = timeout
+        self._stats = stats
+        self._high_water = high_water
+        self._low_water = low_water
+        self._transport = None
+        self._timer = None
+        self._last_activity = 0.0
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self._loop = asyncio.get_running_loop()
+        transport.set_write_buffer_limits(high=self._high_water, low=self._low_water)
+        if self._stats is not None:
+            self._stats["connections"] += 1
+        self._last_activity = self._loop.time()
+        self._timer = self._loop.call_later(self._timeout, self._check_idle)
+
+    def _check_idle(self):
+        idle = self._loop.time() - self._last_activity
+        if idle >= self._timeout:
+            print("Inactivity timeout")
+            self._transport.close()
+        else:
+            self._timer = self._loop.call_later(self._timeout - idle, self._check_idle)
+
+    def _echo(self, data):
+        self._last_activity = self._loop.time()
+        if self._stats is not None:
+            self._stats["bytes"] += len(data)
+        self._transport.write(data)
+
+    def pause_writing(self):
+        self._transport.pause_reading() # client isn't reading its echoes, stop reading from it
+        if self._stats is not None:
+            self._stats["paused"] += 1
+
+    def resume_writing(self):
+        self._last_activity = self._loop.time()
+        self._transport.resume_reading()
+
+    def eof_received(self):
+        return False # close the transport
+
+    def connection_lost(self, exc):
+        if self._timer is not None:
+            self._timer.cancel()
+
+
+class EchoProtocol(_EchoProtocolBase, asyncio.Protocol):
+    """data_received writes straight back to the transport, no streams or tasks involved."""
+    def data_received(self, data):
+        self._echo(data)
+
+
+class BufferedEchoProtocol(_EchoProtocolBase, asyncio.BufferedProtocol):
+    """
+    recv_into-style echo: the event loop reads straight into our preallocated
+    bytearray (get_buffer) and we write a memoryview slice of it back.
+    If the transport couldn't send everything immediately it may still reference
+    that memory, so we switch to a fresh buffer instead of overwriting it.
+    """
+    def __init__(self, timeout: float = IDLE_TIMEOUT, stats=None, **kwargs):
+        super().__init__(timeout, stats, **kwargs)
+        self._size = MIN_BUFFER
+        self._view = memoryview(bytearray(self._size))
+
+    def get_buffer(self, sizehint):
+        return self._view
+
+    def buffer_updated(self, nbytes):
+        self._echo(self._view[:nbytes])
+        if self._transport.get_write_buffer_size():
+            self._view = memoryview(bytearray(self._size)) # old one may still be queued for sending
+        elif nbytes == self._size and self._size < MAX_BUFFER:
+            self._size *= 2 # a full read means more is waiting, read bigger chunks
+            self._view = memoryview(bytearray(self._size))
+
+
+PROTOCOLS = {"protocol": EchoProtocol, "buffered": BufferedEchoProtocol}
+
+async def run_server(host="127.0.0.1", port=0, engine="streams", timeout: float = IDLE_TIMEOUT,
+                     reuse_port: bool = False, stats=None, ssl=None, ssl_handshake_timeout: float = 5.0):
+    """
+    engine="streams": StreamReader/StreamWriter handler (handle_echo)
+    engine="protocol": EchoProtocol, echo from data_received with water-mark flow control
+    engine="buffered": BufferedEchoProtocol, no per-read allocation
+    reuse_port: set SO_REUSEPORT so several processes can listen on the same port
+    ssl: server-side SSLContext (see tls.server_context) to serve TLS on every engine
+    """
+    tls = {}
+    if ssl is not None:
+        tls = {"ssl": ssl, "ssl_handshake_timeout": ssl_handshake_timeout}
+    loop = asyncio.get_running_loop()
+    if engine == "streams":
+        handler = handle_echo
+        if timeout != IDLE_TIMEOUT or stats is not None:
+            handler = functools.partial(handle_echo, timeout=timeout, stats=stats)
+        server = await asyncio.start_server(handler, host, port, reuse_port=reuse_port or None, **tls) #Binding = locking the socket to a network address so clients know where to connect.
+    elif engine in PROTOCOLS:
+        protocol = PROTOCOLS[engine]
+        server = await loop.create_server(lambda: protocol(timeout, stats), host, port,
+                                          reuse_port=reuse_port or None, **tls)
+    else:
+        raise ValueError(f"unknown engine: {engine!r}")
     sockets = server.sockets
     if not sockets: #it makes sure the server really did create at least one listening socket.
         raise RuntimeError("No sockets bound")
@@ -26,4 +153,4 @@ async def run_server(host="127.0.0.1", port=0):
 
 #Transport buffer = staging area in Python before handing to the OS.
 
-#OS flushing = moving staged data into the kernel socket buffer, then onto the network.
\ No newline at end of file
+#OS flushing = moving staged data into the kernel socket buffer, then onto the network.
@@ -0,0 +1,108 @@
+"""
+Throughput benchmark (MB/s) for the echo handlers.
+
+One client streams `--megabytes` of data in `--chunk` sized writes from a sender
+thread while the main thread reads the echo back with recv_into. Each handler
+is measured the same way:
+
+threaded-copy      EchoServer.handleClient (recv + sendall)
+threaded-recv_into EchoServer.handleClientBuffered
+threaded-splice    EchoServer.handleClientSplice (Linux)
+async-streams      async_echo.handle_echo
+async-protocol     async_echo.EchoProtocol
+async-buffered     async_echo.BufferedEchoProtocol
+
+Usage:
+python3 bench_echo.py --megabytes 256 --chunk 65536
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+
+from async_echo import run_server
+from server import EchoServer
+
+logging.getLogger("server").setLevel(logging.WARNING) # keep start/stop lines out of the table
+
+
+def measure(host: str, port: int, total: int, chunk: int) -> float:
+    """Returns MB/s for streaming `total` bytes through the echo server."""
+    payload = os.urandom(chunk)
+    with socket.create_connection((host, port)) as s:
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def sender():
+            sent = 0
+            while sent < total:
+                n = min(chunk, total - sent)
+                s.sendall(payload[:n])
+                sent += n
+
+        buf = memoryview(bytearray(1 << 20))
+        t = threading.Thread(target=sender, daemon=True)
+        start = time.perf_counter()
+        t.start()
+        received = 0
+        while received < total:
+            n = s.recv_into(buf)
+            if n == 0:
+                raise RuntimeError("server closed the connection early")
+            received += n
+        elapsed = time.perf_counter() - start
+        t.join()
+    return total / elapsed / 1e6
+
+
+def bench_threaded(mode: str, total: int, chunk: int) -> float:
+    srv = EchoServer(echo_mode=mode)
+    srv.start()
+    try:
+        return measure(srv.host, srv.port, total, chunk)
+    finally:
+        srv.stop()
+
+
+def bench_async(engine: str, total: int, chunk: int) -> float:
+    loop = asyncio.new_event_loop()
+    server, (host, port) = loop.run_until_complete(run_server(engine=engine))
+    t = threading.Thread(target=loop.run_forever, daemon=True)
+    t.start()
+    try:
+        return measure(host, port, total, chunk)
+    finally:
+        async def shutdown():
+            server.close()
+            await server.wait_closed()
+            await asyncio.sleep(0.1) # let the handler see the client's EOF and finish
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        t.join()
+        loop.close()
+
+
+def run_all(megabytes: int = 64, chunk: int = 64 * 1024) -> dict:
+    total = megabytes * 1024 * 1024
+    results = {}
+    modes = ["copy", "recv_into"] + (["splice"] if hasattr(os, "splice") else [])
+    for mode in modes:
+        results[f"threaded-{mode}"] = bench_threaded(mode, total, chunk)
+    for engine in ("streams", "protocol", "buffered"):
+        results[f"async-{engine}"] = bench_async(engine, total, chunk)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Echo handler throughput in MB/s")
+    parser.add_argument("--megabytes", type=int, default=64)
+    parser.add_argument("--chunk", type=int, default=64 * 1024, help="client write size in bytes")
+    args = parser.parse_args()
+
+    results = run_all(args.megabytes, args.chunk)
+    baseline = results["threaded-copy"]
+    print(f"{'handler':<22}{'MB/s':>10}{'vs copy':>10}")
+    for name, mbps in results.items():
+        print(f"{name:<22}{mbps:>10.1f}{mbps / baseline:>9.2f}x")
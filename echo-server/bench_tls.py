@@ -0,0 +1,86 @@
+"""
+TLS handshake cost: full vs resumed.
+
+For each round a new TCP connection is opened to a TLS EchoServer, the
+handshake is timed and one echo round trip is done (TLS 1.3 tickets arrive
+with the first read). "full" never offers a session, "resumed" offers the
+session from the previous connection.
+
+Usage:
+python3 bench_tls.py --rounds 200
+python3 bench_tls.py --cert ../PKI_TLS/cert.pem --key ../PKI_TLS/private.pem
+python3 bench_tls.py --tls12 --ciphers ECDHE-ECDSA-AES128-GCM-SHA256
+"""
+import argparse
+import logging
+import socket
+import ssl
+import statistics
+import tempfile
+import time
+from typing import Optional
+
+from server import EchoServer
+from tls import client_context, make_self_signed, server_context
+
+logging.getLogger("server").setLevel(logging.WARNING)
+
+
+def handshake_times(host: str, port: int, ctx: ssl.SSLContext, rounds: int, resume: bool) -> dict:
+    times = []
+    reused = 0
+    session: Optional[ssl.SSLSession] = None
+    for _ in range(rounds):
+        raw = socket.create_connection((host, port), timeout=5)
+        start = time.perf_counter()
+        s = ctx.wrap_socket(raw, server_hostname="localhost", session=session if resume else None)
+        times.append(time.perf_counter() - start)
+        with s:
+            s.sendall(b"ping")
+            s.recv(16)
+            reused += s.session_reused
+            session = s.session
+    times.sort()
+    return {
+        "rounds": rounds,
+        "reused": reused,
+        "mean_ms": statistics.fmean(times) * 1e3,
+        "p50_ms": times[len(times) // 2] * 1e3,
+        "p99_ms": times[min(len(times) - 1, int(len(times) * 0.99))] * 1e3,
+    }
+
+
+def run(rounds: int = 200, cert: Optional[str] = None, key: Optional[str] = None,
+        tls12: bool = False, ciphers: Optional[str] = None) -> dict:
+    with tempfile.TemporaryDirectory() as d:
+        if cert is None:
+            cert, key = make_self_signed(d)
+        sctx = server_context(cert, key, ciphers=ciphers)
+        cctx = client_context(cafile=cert, ciphers=ciphers)
+        if tls12:
+            cctx.maximum_version = ssl.TLSVersion.TLSv1_2
+        srv = EchoServer(ssl_context=sctx, backlog=64)
+        srv.start()
+        try:
+            return {
+                "full": handshake_times(srv.host, srv.port, cctx, rounds, resume=False),
+                "resumed": handshake_times(srv.host, srv.port, cctx, rounds, resume=True),
+            }
+        finally:
+            srv.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Full vs resumed TLS handshake latency")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--cert", help="PEM certificate (default: generate a self-signed one)")
+    parser.add_argument("--key", help="PEM private key")
+    parser.add_argument("--tls12", action="store_true", help="cap the client at TLS 1.2")
+    parser.add_argument("--ciphers", help="OpenSSL cipher string (TLS 1.2)")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.cert, args.key, args.tls12, args.ciphers)
+    print(f"{'handshake':<10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'reused':>10}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['mean_ms']:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['reused']:>10}")
+    print(f"resumed / full: {results['resumed']['mean_ms'] / results['full']['mean_ms']:.2f}x")
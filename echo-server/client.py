@@ -1,4 +1,12 @@
+import asyncio
+import itertools
+import queue
+import select
 import socket
+import ssl
+import struct
+import threading
+from typing import Dict, List, Optional
 
 def echo_client(host:str, port: int, message:bytes, recv_size:int= 4096, timeout:float= 2.0 ) -> bytes:
     with socket.create_connection((host, port), timeout=timeout) as s:
@@ -11,4 +19,326 @@ def echo_client(host:str, port: int, message:bytes, recv_size:int= 4096, timeout
             if not chunk:
                 break
             received.extend(chunk) #Appends the newly received bytes into the buffer.
-        return bytes(received) #when echo_client() returns, the socket is already closed by Python.(with)
\ No newline at end of file
+        return bytes(received) #when echo_client() returns, the socket is already closed by Python.(with)
+
+# -------------------- pooled, pipelined client --------------------
+# Frames are length-prefixed: !I payload length, !I request id, then the payload.
+# The server echoes the bytes untouched, so every response is the same frame and
+# the id tells us which request it answers.
+
+FRAME_HEADER = struct.Struct("!II")
+MAX_FRAME = 16 * 1024 * 1024
+SEND_CHUNK = 256 * 1024 # bytes per send() while pipelining
+_WOULD_BLOCK = (BlockingIOError, ssl.SSLWantReadError, ssl.SSLWantWriteError)
+
+
+class EchoConnection:
+    """
+    One keep-alive connection speaking the framed protocol.
+    With ssl_context the socket is wrapped in TLS; passing a `session` from an
+    earlier connection to the same server asks for an abbreviated (resumed) handshake.
+    """
+    def __init__(self, host: str, port: int, timeout: float = 2.0,
+                 ssl_context: Optional[ssl.SSLContext] = None, server_hostname: Optional[str] = None,
+                 session: Optional[ssl.SSLSession] = None):
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if ssl_context is not None:
+            try:
+                sock = ssl_context.wrap_socket(sock, server_hostname=server_hostname or host, session=session)
+            except (ssl.SSLError, OSError):
+                sock.close()
+                raise
+        self._sock = sock
+        self._sock.settimeout(timeout)
+        self._ids = itertools.count(1)
+        self._buf = bytearray()
+        self.broken = False
+
+    def _take_frames(self, responses: Dict[int, bytes]):
+        """Move every complete frame in the receive buffer into responses."""
+        buf, pos = self._buf, 0
+        while len(buf) - pos >= FRAME_HEADER.size:
+            length, req_id = FRAME_HEADER.unpack_from(buf, pos)
+            if length > MAX_FRAME:
+                raise ValueError("frame too large")
+            end = pos + FRAME_HEADER.size + length
+            if end > len(buf):
+                break
+            responses[req_id] = bytes(buf[pos + FRAME_HEADER.size:end])
+            pos = end
+        del buf[:pos]
+
+    def pipeline(self, messages: List[bytes]) -> List[bytes]:
+        """
+        Send every message and collect the responses (matched by id). Writes and reads
+        are interleaved with select(): the server echoes while we are still sending, so
+        a batch bigger than both socket buffers would otherwise block both sides on send.
+        The timeout applies to each wait for progress, like a blocking socket's.
+        """
+        ids = []
+        out = bytearray()
+        for m in messages:
+            req_id = next(self._ids) & 0xFFFFFFFF
+            ids.append(req_id)
+            out += FRAME_HEADER.pack(len(m), req_id)
+            out += m
+        view, sent = memoryview(out), 0
+        responses: Dict[int, bytes] = {}
+        timeout = self._sock.gettimeout()
+        self._sock.setblocking(False)
+        try:
+            while len(responses) < len(ids):
+                sending = sent < len(view)
+                if getattr(self._sock, "pending", None) and self._sock.pending():
+                    readable, writable = True, False # decrypted bytes already buffered by TLS
+                else:
+                    r, w, _ = select.select([self._sock], [self._sock] if sending else [], [], timeout)
+                    if not r and not w:
+                        raise socket.timeout("timed out")
+                    readable, writable = bool(r), bool(w)
+                if writable:
+                    try:
+                        sent += self._sock.send(view[sent:sent + SEND_CHUNK])
+                    except _WOULD_BLOCK:
+                        pass
+                if readable:
+                    try:
+                        chunk = self._sock.recv(SEND_CHUNK)
+                    except _WOULD_BLOCK:
+                        continue
+                    if not chunk:
+                        raise ConnectionError("server closed the connection")
+                    self._buf.extend(chunk)
+                    self._take_frames(responses)
+        except (OSError, ValueError):
+            self.broken = True
+            raise
+        finally:
+            view.release()
+            if not self.broken:
+                self._sock.settimeout(timeout)
+        return [responses[i] for i in ids]
+
+    def request(self, message: bytes) -> bytes:
+        return self.pipeline([message])[0]
+
+    @property
+    def session(self) -> Optional[ssl.SSLSession]:
+        """TLS session to resume from (TLS 1.3 tickets arrive after the handshake, so read once first)."""
+        return getattr(self._sock, "session", None)
+
+    @property
+    def session_reused(self) -> bool:
+        return bool(getattr(self._sock, "session_reused", False))
+
+    def close(self):
+        self._sock.close()
+
+
+class EchoClientPool:
+    """
+    Thread-safe pool of keep-alive connections. Connections are created lazily
+    up to `size`; callers beyond that wait for one to be released.
+    With ssl_context, the latest TLS session is kept and offered on every new
+    connection, so only the first one pays for a full handshake.
+    """
+    def __init__(self, host: str, port: int, size: int = 4, timeout: float = 2.0,
+                 ssl_context: Optional[ssl.SSLContext] = None, server_hostname: Optional[str] = None):
+        self._host = host
+        self._port = port
+        self._size = size
+        self._timeout = timeout
+        self._ssl_context = ssl_context
+        self._server_hostname = server_hostname
+        self._session: Optional[ssl.SSLSession] = None
+        self._idle: "queue.LifoQueue[EchoConnection]" = queue.LifoQueue() # LIFO keeps hot sockets hot
+        self._created = 0
+        self._lock = threading.Lock()
+        self.connects = 0 # connections ever opened, handy to check reuse
+        self.resumed = 0 # TLS connections that resumed a session instead of a full handshake
+
+    def _acquire(self) -> EchoConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self._size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                conn = EchoConnection(self._host, self._port, self._timeout, self._ssl_context,
+                                      self._server_hostname, self._session)
+            except OSError: # ssl.SSLError is an OSError too
+                with self._lock:
+                    self._created -= 1
+                raise
+            self.connects += 1
+            if conn.session_reused:
+                self.resumed += 1
+            return conn
+        return self._idle.get(timeout=self._timeout)
+
+    def _release(self, conn: EchoConnection):
+        if self._ssl_context is not None and not conn.broken:
+            # a fresh ticket each time; keeps working after the old one expires
+            self._session = conn.session or self._session
+        if conn.broken:
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        else:
+            self._idle.put(conn)
+
+    def pipeline(self, messages: List[bytes]) -> List[bytes]:
+        conn = self._acquire()
+        try:
+            return conn.pipeline(messages)
+        finally:
+            self._release(conn)
+
+    def request(self, message: bytes) -> bytes:
+        return self.pipeline([message])[0]
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncEchoConnection:
+    """
+    Multiplexed connection: any number of coroutines can have requests in flight,
+    a single reader task resolves their futures as frames come back.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @classmethod
+    async def open(cls, host: str, port: int, ssl_context: Optional[ssl.SSLContext] = None,
+                   server_hostname: Optional[str] = None) -> "AsyncEchoConnection":
+        kwargs = {}
+        if ssl_context is not None:
+            kwargs = {"ssl": ssl_context, "server_hostname": server_hostname or host}
+        reader, writer = await asyncio.open_connection(host, port, **kwargs)
+        return cls(reader, writer)
+
+    @property
+    def closed(self) -> bool:
+        return self._reader_task.done()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def _read_loop(self):
+        exc: Exception = ConnectionError("connection closed")
+        try:
+            while True:
+                header = await self._reader.readexactly(FRAME_HEADER.size)
+                length, req_id = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME:
+                    raise ValueError("frame too large")
+                payload = await self._reader.readexactly(length)
+                fut = self._pending.pop(req_id, None)
+                if fut is not None and not fut.done():
+                    fut.set_result(payload)
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            exc = e if not isinstance(e, asyncio.IncompleteReadError) else ConnectionError("server closed the connection")
+        finally:
+            for fut in self._pending.values():
+                if not fut.done():
+                    fut.set_exception(exc)
+            self._pending.clear()
+
+    async def request(self, message: bytes, timeout: Optional[float] = 2.0) -> bytes:
+        if self.closed:
+            raise ConnectionError("connection closed")
+        req_id = next(self._ids) & 0xFFFFFFFF
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        self._writer.write(FRAME_HEADER.pack(len(message), req_id) + message)
+        await self._writer.drain()
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def pipeline(self, messages: List[bytes], timeout: Optional[float] = 2.0) -> List[bytes]:
+        return list(await asyncio.gather(*(self.request(m, timeout) for m in messages)))
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class AsyncEchoClientPool:
+    """
+    asyncio pool: requests go to the open connection with the fewest in flight.
+    ssl_context: client SSLContext. asyncio doesn't expose SSLSession, so there is no explicit
+    resumption here; the multiplexed connections are long-lived, which is the cheaper reuse anyway.
+    """
+    def __init__(self, host: str, port: int, size: int = 4, ssl_context: Optional[ssl.SSLContext] = None,
+                 server_hostname: Optional[str] = None):
+        self._host = host
+        self._port = port
+        self._size = size
+        self._ssl_context = ssl_context
+        self._server_hostname = server_hostname
+        self._conns: List[AsyncEchoConnection] = []
+        self._lock = asyncio.Lock()
+        self.connects = 0
+
+    async def _pick(self) -> AsyncEchoConnection:
+        self._conns = [c for c in self._conns if not c.closed] # drop dead ones, they get replaced
+        idle = [c for c in self._conns if c.in_flight == 0]
+        if idle:
+            return idle[0]
+        async with self._lock:
+            if len(self._conns) < self._size:
+                conn = await AsyncEchoConnection.open(self._host, self._port, self._ssl_context, self._server_hostname)
+                self.connects += 1
+                self._conns.append(conn)
+                return conn
+        return min(self._conns, key=lambda c: c.in_flight)
+
+    async def request(self, message: bytes, timeout: Optional[float] = 2.0) -> bytes:
+        conn = await self._pick()
+        return await conn.request(message, timeout)
+
+    async def pipeline(self, messages: List[bytes], timeout: Optional[float] = 2.0) -> List[bytes]:
+        conn = await self._pick()
+        return await conn.pipeline(messages, timeout)
+
+    async def close(self):
+        conns, self._conns = self._conns, []
+        for c in conns:
+            await c.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,248 @@
+"""
+Load generator and latency benchmark for the echo servers.
+
+Opens many concurrent asyncio connections, keeps `depth` messages in flight on
+each one (pipelining) for `duration` seconds and records every round trip in
+an HDR-style log-linear histogram. Reports throughput and p50/p99/p99.9.
+
+The server runs in its own process so it doesn't share a GIL with the load:
+
+python3 loadgen.py --engine threaded --connections 200 --size 64 --depth 4 --duration 10
+python3 loadgen.py --engine selector ...
+python3 loadgen.py --engine protocol ...     (streams / protocol / buffered = async_echo engines)
+python3 loadgen.py --host 127.0.0.1 --port 9000 ...   (already running server)
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import multiprocessing as mp
+import os
+import time
+from typing import List, Optional
+
+SYNC_ENGINES = ("threaded", "selector")
+ASYNC_ENGINES = ("streams", "protocol", "buffered")
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram in the spirit of HdrHistogram: values below 2**bits
+    are exact, above that each power of two is split into 2**(bits-1) buckets,
+    so every value is stored with ~1/2**(bits-1) relative precision
+    (bits=7 -> better than 1.6%) in a few KB regardless of the range.
+    Values are integers (we record nanoseconds).
+    """
+    def __init__(self, significant_bits: int = 7):
+        self._bits = significant_bits
+        self._sub = 1 << significant_bits
+        self._half = self._sub >> 1
+        self._counts: List[int] = []
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self._sub:
+            return value
+        shift = value.bit_length() - self._bits
+        return self._sub + (shift - 1) * self._half + ((value >> shift) - self._half)
+
+    def _highest_value(self, index: int) -> int:
+        """Largest value that lands in bucket `index`."""
+        if index < self._sub:
+            return index
+        k = index - self._sub
+        shift = k // self._half + 1
+        mantissa = k % self._half + self._half
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int):
+        value = max(0, int(value))
+        idx = self._index(value)
+        if idx >= len(self._counts):
+            self._counts.extend([0] * (idx + 1 - len(self._counts)))
+        self._counts[idx] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other._bits != self._bits:
+            raise ValueError("histograms use different precision")
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for i, c in enumerate(other._counts):
+            self._counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, q: float) -> int:
+        """Value at percentile q (0-100), reported as the bucket's upper bound (capped at max)."""
+        if not self.count:
+            return 0
+        target = max(1, int(round(q / 100.0 * self.count + 0.4999999)))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            seen += c
+            if seen >= target:
+                return min(self._highest_value(idx), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+async def _connection(host, port, size, depth, deadline, hist, stats, connect_sem):
+    payload = os.urandom(size)
+    async with connect_sem: # don't SYN-flood a small accept backlog
+        for attempt in range(5):
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+                break
+            except OSError:
+                stats["connect_errors"] += 1
+                await asyncio.sleep(0.05 * (attempt + 1))
+        else:
+            return
+    clock = time.perf_counter_ns
+    in_flight = []
+    try:
+        for _ in range(depth):
+            in_flight.append(clock())
+            writer.write(payload)
+        while in_flight:
+            await writer.drain()
+            # the echo preserves order, so responses come back FIFO
+            await reader.readexactly(size)
+            hist.record(clock() - in_flight.pop(0))
+            stats["messages"] += 1
+            if time.monotonic() < deadline:
+                in_flight.append(clock())
+                writer.write(payload)
+    except (OSError, asyncio.IncompleteReadError):
+        stats["errors"] += 1
+    finally:
+        writer.close()
+        with contextlib.suppress(OSError):
+            await writer.wait_closed()
+
+
+async def run_load(host: str, port: int, connections: int = 100, size: int = 64, depth: int = 1,
+                   duration: float = 5.0, connect_concurrency: int = 256) -> dict:
+    hist = LatencyHistogram()
+    stats = {"messages": 0, "errors": 0, "connect_errors": 0}
+    connect_sem = asyncio.Semaphore(connect_concurrency)
+    start = time.monotonic()
+    deadline = start + duration
+    await asyncio.gather(*(_connection(host, port, size, depth, deadline, hist, stats, connect_sem)
+                           for _ in range(connections)))
+    elapsed = time.monotonic() - start
+    return {
+        "connections": connections,
+        "message_size": size,
+        "depth": depth,
+        "seconds": elapsed,
+        "messages": stats["messages"],
+        "errors": stats["errors"],
+        "connect_errors": stats["connect_errors"],
+        "msgs_per_sec": stats["messages"] / elapsed if elapsed else 0.0,
+        "mb_per_sec": stats["messages"] * size * 2 / elapsed / 1e6 if elapsed else 0.0, # both directions
+        "latency_us": {
+            "mean": hist.mean() / 1e3,
+            "p50": hist.percentile(50) / 1e3,
+            "p99": hist.percentile(99) / 1e3,
+            "p999": hist.percentile(99.9) / 1e3,
+            "max": hist.max / 1e3,
+        },
+    }
+
+
+def _serve_engine(engine: str, ready, stop):
+    """Runs in a child process."""
+    import logging
+    logging.getLogger("server").setLevel(logging.WARNING)
+    if engine in SYNC_ENGINES:
+        from server import make_server
+        srv = make_server(engine, backlog=4096)
+        srv.start()
+        ready.put(srv.port)
+        stop.wait()
+        srv.stop()
+        return
+
+    from async_echo import run_server
+
+    async def main():
+        server, addr = await run_server(engine=engine)
+        ready.put(addr[1])
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, stop.wait)
+        server.close()
+        await server.wait_closed()
+        # let handlers of already closed clients finish instead of being cancelled
+        current = asyncio.current_task()
+        for _ in range(40):
+            if not [t for t in asyncio.all_tasks() if t is not current]:
+                break
+            await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+
+
+@contextlib.contextmanager
+def local_server(engine: str):
+    """Start an echo server engine in a separate process, yield its port."""
+    if engine not in SYNC_ENGINES + ASYNC_ENGINES:
+        raise ValueError(f"unknown engine: {engine!r}")
+    ctx = mp.get_context("spawn")
+    ready, stop = ctx.Queue(), ctx.Event()
+    proc = ctx.Process(target=_serve_engine, args=(engine, ready, stop), daemon=True)
+    proc.start()
+    try:
+        yield ready.get(timeout=10)
+    finally:
+        stop.set()
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+
+
+def _print_report(name: str, r: dict):
+    lat = r["latency_us"]
+    print(f"{name:<10} {r['msgs_per_sec']:>12.0f} msg/s {r['mb_per_sec']:>8.1f} MB/s   "
+          f"p50 {lat['p50']:>8.0f}us  p99 {lat['p99']:>8.0f}us  p99.9 {lat['p999']:>8.0f}us  "
+          f"errors {r['errors'] + r['connect_errors']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Echo server load generator")
+    parser.add_argument("--engine", action="append", choices=SYNC_ENGINES + ASYNC_ENGINES,
+                        help="start this engine locally (repeat to compare several)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target an already running server")
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--size", type=int, default=64, help="message size in bytes")
+    parser.add_argument("--depth", type=int, default=1, help="messages in flight per connection")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--json", action="store_true", help="print raw JSON results")
+    args = parser.parse_args()
+
+    load = dict(connections=args.connections, size=args.size, depth=args.depth, duration=args.duration)
+    results = {}
+    if args.port:
+        results[f"{args.host}:{args.port}"] = asyncio.run(run_load(args.host, args.port, **load))
+    for engine in args.engine or ([] if args.port else ["threaded"]):
+        with local_server(engine) as port:
+            results[engine] = asyncio.run(run_load("127.0.0.1", port, **load))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, r in results.items():
+            _print_report(name, r)
@@ -0,0 +1,177 @@
+"""
+Multi-core launcher for the asyncio echo server.
+
+Starts N worker processes, each running its own event loop with run_server()
+on the same port via SO_REUSEPORT; the kernel spreads incoming connections
+across them. Each worker publishes its connection/byte counters into shared
+memory, so the parent can report per-worker stats at any time.
+
+Usage:
+python3 multicore.py --workers 4 --port 9000 [--uvloop]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+
+from async_echo import IDLE_TIMEOUT, run_server
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("connections", "bytes", "paused") # paused: times a slow reader hit the high water mark
+
+
+class SharedCounters:
+    """
+    Dict-style view over one worker's slots in a shared Array (what handle_echo expects).
+    Each worker only writes its own slots, so no lock is needed.
+    """
+    def __init__(self, array, index: int):
+        self._array = array
+        self._base = index * len(_FIELDS)
+
+    def __getitem__(self, key):
+        return self._array[self._base + _FIELDS.index(key)]
+
+    def __setitem__(self, key, value):
+        self._array[self._base + _FIELDS.index(key)] = value
+
+
+def _install_uvloop() -> bool:
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop not installed, using the default asyncio loop")
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+async def _serve(index, host, port, engine, timeout, counters, ready, stop, grace):
+    stats = SharedCounters(counters, index)
+    server, _addr = await run_server(host, port, engine=engine, timeout=timeout, reuse_port=True, stats=stats)
+    ready.put(os.getpid())
+    while not stop.is_set():
+        await asyncio.sleep(0.1)
+
+    # graceful: stop accepting, give open connections `grace` seconds to finish
+    server.close()
+    await server.wait_closed()
+    current = asyncio.current_task()
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline:
+        if not [t for t in asyncio.all_tasks() if t is not current]:
+            break
+        await asyncio.sleep(0.05)
+
+
+def _worker_main(index, host, port, engine, timeout, use_uvloop, counters, ready, stop, grace):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # the parent coordinates shutdown
+    if use_uvloop:
+        _install_uvloop()
+    asyncio.run(_serve(index, host, port, engine, timeout, counters, ready, stop, grace))
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class WorkerPool:
+    def __init__(self, workers: Optional[int] = None, host: str = "127.0.0.1", port: int = 0,
+                 engine: str = "streams", timeout: float = IDLE_TIMEOUT,
+                 use_uvloop: bool = False, grace: float = 5.0):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+        self.workers = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.engine = engine
+        self.timeout = timeout
+        self.use_uvloop = use_uvloop
+        self.grace = grace
+        self._ctx = mp.get_context("spawn") # no forked copies of parent threads / event loops
+        self._counters = self._ctx.Array("q", self.workers * len(_FIELDS), lock=False)
+        self._stop = self._ctx.Event()
+        self._procs: List[mp.process.BaseProcess] = []
+        self.pids: List[int] = []
+
+    def start(self, ready_timeout: float = 10.0):
+        placeholder = None
+        if self.port == 0:
+            # reserve a port everyone can share: bound with SO_REUSEPORT but never listening,
+            # so it takes no connections itself
+            placeholder = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            placeholder.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            placeholder.bind((self.host, 0))
+            self.port = placeholder.getsockname()[1]
+        ready = self._ctx.Queue()
+        try:
+            for i in range(self.workers):
+                p = self._ctx.Process(target=_worker_main, name=f"echo-worker-{i}", daemon=True,
+                                      args=(i, self.host, self.port, self.engine, self.timeout, self.use_uvloop,
+                                            self._counters, ready, self._stop, self.grace))
+                p.start()
+                self._procs.append(p)
+            for _ in range(self.workers):
+                self.pids.append(ready.get(timeout=ready_timeout))
+        except Exception:
+            self.stop()
+            raise
+        finally:
+            if placeholder is not None:
+                placeholder.close()
+        logger.info("Started %d echo workers on %s:%d", self.workers, self.host, self.port)
+        return self.host, self.port
+
+    def stats(self) -> Dict[str, object]:
+        per_worker = []
+        for i in range(self.workers):
+            c = SharedCounters(self._counters, i)
+            per_worker.append({"worker": i, **{f: c[f] for f in _FIELDS}})
+        return {"workers": per_worker, **{f: sum(w[f] for w in per_worker) for f in _FIELDS}}
+
+    def stop(self):
+        self._stop.set()
+        for p in self._procs:
+            p.join(timeout=self.grace + 2.0)
+            if p.is_alive():
+                p.terminate()
+                p.join(timeout=1.0)
+        self._procs = []
+        logger.info("Echo workers stopped")
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the asyncio echo server on several cores")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--engine", choices=("streams", "protocol", "buffered"), default="streams")
+    parser.add_argument("--uvloop", action="store_true")
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers, args.host, args.port, engine=args.engine, use_uvloop=args.uvloop)
+    pool.start()
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    try:
+        while True:
+            time.sleep(10)
+            logger.info("stats: %s", pool.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+        logger.info("final stats: %s", pool.stats())
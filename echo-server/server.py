@@ -1,13 +1,49 @@
+import os
 import socket
+import queue
+import select
+import selectors
+import ssl
 import threading
 import logging
-from typing import List
+from typing import Dict, List, Optional, Set
 
 logging.basicConfig(level=logging.INFO) #Configures the logger to show messages at INFO level and above.
 logger = logging.getLogger(__name__) #Configures the logger to show messages at INFO level and above.
 
+ECHO_MODES = ("copy", "recv_into", "splice")
+MIN_BUFFER = 16 * 1024 # starting recv_into buffer per connection
+MAX_BUFFER = 1024 * 1024 # adaptive growth stops here
+PIPE_SIZE = 64 * 1024 # default Linux pipe capacity, max bytes per splice()
+HANDSHAKE_TIMEOUT = 5.0 # TLS: drop clients that connect but never finish the handshake
+
 class EchoServer:
-    def __init__(self, host: str="127.0.0.1", port: int = 0, backlog: int = 5):
+    """
+    Threaded engine.
+    - max_workers=None: one thread per client (finished handler threads are removed as they exit)
+    - max_workers=N: N pool threads serve clients from a bounded accept queue. When the queue is
+      full, admission="reject" closes the new connection straight away, admission="delay" waits up
+      to admission_timeout seconds for a free slot before rejecting.
+    - echo_mode: "copy" (recv/sendall), "recv_into" (reused buffer, no per-read allocation)
+      or "splice" (Linux, kernel-side socket -> pipe -> socket)
+    - ssl_context: server-side SSLContext (see tls.server_context) to terminate TLS. The handshake
+      runs in the handler thread, not the accept loop. splice can't see the plaintext, so under
+      TLS it falls back to recv_into.
+    """
+    def __init__(self, host: str="127.0.0.1", port: int = 0, backlog: int = 5,
+                 max_workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 admission: str = "reject", admission_timeout: float = 1.0,
+                 echo_mode: str = "copy", ssl_context: Optional[ssl.SSLContext] = None):
+        if admission not in ("reject", "delay"):
+            raise ValueError(f"unknown admission policy: {admission!r}")
+        if echo_mode not in ECHO_MODES:
+            raise ValueError(f"unknown echo mode: {echo_mode!r}")
+        if echo_mode == "splice" and not hasattr(os, "splice"):
+            echo_mode = "recv_into" # os.splice is Linux only (Python 3.10+)
+        if echo_mode == "splice" and ssl_context is not None:
+            echo_mode = "recv_into" # the kernel only has ciphertext
+        self._echo_mode = echo_mode
+        self._ssl_context = ssl_context
         self._host = host
         self._port = port
         self._backlog = backlog
@@ -18,7 +54,23 @@ class EchoServer:
         self._sock.listen(self._backlog) #mark this socket as a listening socket (ready to accept connections).The backlog value controls the size of this completed connection queue.
         self._running = threading.Event() # a thread-safe flag (on/off) that lets threads check whether server should keep running. You call .set() or .clear() to change it.
         self._accept_thread = None #will hold the background thread that accepts incoming connections.
-        self._handler_threads : List[threading.Thread] = [] #list to track per-client handler threads so we can join (wait for) them when stopping.
+        self._handler_threads : Set[threading.Thread] = set() #live per-client handler threads, each one removes itself when it finishes.
+        self._max_workers = max_workers
+        self._admission = admission
+        self._admission_timeout = admission_timeout
+        # pool mode: accepted sockets wait here until a worker is free
+        self._accept_queue: Optional[queue.Queue] = None
+        if max_workers is not None:
+            self._accept_queue = queue.Queue(maxsize=queue_size if queue_size is not None else max_workers)
+        self._workers: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self._active = 0
+        self._accepted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._tls_handshakes = 0
+        self._tls_resumed = 0
+        self._tls_failed = 0
 
     @property
     def host(self) -> str:
@@ -27,9 +79,29 @@ class EchoServer:
     @property
     def port(self) ->int:
        return self._port
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of connection counters."""
+        with self._stats_lock:
+            return {
+                "active": self._active,
+                "queued": self._accept_queue.qsize() if self._accept_queue is not None else 0,
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "completed": self._completed,
+                "handler_threads": len(self._handler_threads),
+                "tls_handshakes": self._tls_handshakes,
+                "tls_resumed": self._tls_resumed,
+                "tls_failed": self._tls_failed,
+            }
     
     def start(self):
         self._running.set()
+        if self._accept_queue is not None:
+            for i in range(self._max_workers):
+                w = threading.Thread(target=self._worker_loop, name=f"echo-worker-{i}", daemon=True)
+                w.start()
+                self._workers.append(w)
         self._accept_thread = threading.Thread(target=self._accept_loop, daemon=True)
         self._accept_thread.start()
         logger.info("EchoServer started on %r:%d", self._host, self._port)
@@ -42,14 +114,83 @@ class EchoServer:
                 except OSError:
                  #SOCKET CLOSED
                  break
-                t = threading.Thread(target=self.handleClient, args=(client_sock,), daemon=True) #For each new client → spins up a client handler thread.
+                with self._stats_lock:
+                    self._accepted += 1
+                if self._accept_queue is not None:
+                    self._admit(client_sock)
+                    continue
+                t = threading.Thread(target=self._run_handler, args=(client_sock,), daemon=True) #For each new client → spins up a client handler thread.
+                with self._stats_lock:
+                    self._handler_threads.add(t)
                 t.start()
-                self._handler_threads.append(t)
         finally: # This will only run when your _accept_loop exits (e.g. when you stop the server or it crashes)
             try:
              self._sock.close()
             except Exception as e:
                logger.warning("Error closing socket: %r", e)
+
+    def _admit(self, client_sock: socket.socket):
+        """Pool mode admission control: queue the client or turn it away."""
+        try:
+            if self._admission == "delay":
+                self._accept_queue.put(client_sock, timeout=self._admission_timeout)
+            else:
+                self._accept_queue.put_nowait(client_sock)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            client_sock.close() # client sees the connection closed without an echo
+
+    def _worker_loop(self):
+        while self._running.is_set():
+            try:
+                client_sock = self._accept_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._serve(client_sock)
+
+    def _run_handler(self, client_sock: socket.socket):
+        try:
+            self._serve(client_sock)
+        finally:
+            with self._stats_lock:
+                self._handler_threads.discard(threading.current_thread())
+
+    def _wrap_tls(self, client_sock: socket.socket) -> Optional[ssl.SSLSocket]:
+        """Server-side handshake; returns None (socket closed) if it fails."""
+        try:
+            client_sock.settimeout(HANDSHAKE_TIMEOUT)
+            tls_sock = self._ssl_context.wrap_socket(client_sock, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            logger.debug("TLS handshake failed: %r", e)
+            with self._stats_lock:
+                self._tls_failed += 1
+            client_sock.close()
+            return None
+        with self._stats_lock:
+            self._tls_handshakes += 1
+            if tls_sock.session_reused:
+                self._tls_resumed += 1
+        return tls_sock
+
+    def _serve(self, client_sock: socket.socket):
+        with self._stats_lock:
+            self._active += 1
+        try:
+            if self._ssl_context is not None:
+                client_sock = self._wrap_tls(client_sock)
+                if client_sock is None:
+                    return
+            if self._echo_mode == "recv_into":
+                self.handleClientBuffered(client_sock)
+            elif self._echo_mode == "splice":
+                self.handleClientSplice(client_sock)
+            else:
+                self.handleClient(client_sock)
+        finally:
+            with self._stats_lock:
+                self._active -= 1
+                self._completed += 1
     
     def handleClient(self, client_sock: socket.socket):
        with client_sock:
@@ -60,7 +201,9 @@ class EchoServer:
                #The rest stays in the socket buffer, waiting for you to call .recv() again.
                #So you’d typically loop and keep calling .recv() until you’ve read everything.
             except socket.timeout:
-               #If no data arrives within 1 second, just loop and try again.
+               #If no data arrives within 1 second, loop and try again (unless the server is stopping).
+               if not self._running.is_set():
+                  break
                continue
             except OSError: # 5. Socket broke (closed/reset/etc). Exit the loop.
                break
@@ -73,6 +216,79 @@ class EchoServer:
 
         # ← only when you exit this (with) block, client_sock.close() is called
 
+    def handleClientBuffered(self, client_sock: socket.socket):
+       """
+       Same loop as handleClient, but without a new bytes object per read: recv_into a
+       per-connection bytearray and sendall a memoryview slice of it. The buffer doubles
+       (up to MAX_BUFFER) whenever a read fills it, since that means more data is queued.
+       """
+       size = MIN_BUFFER
+       view = memoryview(bytearray(size))
+       with client_sock:
+          client_sock.settimeout(1.0)
+          while True:
+            try:
+               n = client_sock.recv_into(view)
+            except socket.timeout:
+               if not self._running.is_set():
+                  break
+               continue
+            except OSError:
+               break
+            if n == 0:
+               break
+            try:
+               client_sock.sendall(view[:n])
+            except OSError:
+               break
+            if n == size and size < MAX_BUFFER:
+               size *= 2
+               view = memoryview(bytearray(size))
+
+    def handleClientSplice(self, client_sock: socket.socket):
+       """
+       Linux: bytes never enter Python. splice() moves them socket -> pipe -> socket
+       inside the kernel; we only wait for readability/writability and count bytes.
+       The socket is non-blocking: a client that stops reading for 1s is dropped, like
+       handleClient's sendall timeout, instead of pinning this thread in splice().
+       """
+       pipe_r, pipe_w = os.pipe()
+       try:
+          with client_sock:
+             client_sock.setblocking(False)
+             fd = client_sock.fileno()
+             readable, writable = select.poll(), select.poll()
+             readable.register(fd, select.POLLIN)
+             writable.register(fd, select.POLLOUT)
+             while True:
+                if not readable.poll(1000): # same 1s wakeup as handleClient so stop() is noticed
+                   if not self._running.is_set():
+                      break
+                   continue
+                try:
+                   n = os.splice(fd, pipe_w, PIPE_SIZE, flags=os.SPLICE_F_MOVE)
+                except BlockingIOError: # woken up but nothing to read after all
+                   continue
+                except OSError:
+                   break
+                if n == 0 or not self._splice_out(pipe_r, fd, n, writable):
+                   break
+       finally:
+          os.close(pipe_r)
+          os.close(pipe_w)
+
+    def _splice_out(self, pipe_r: int, fd: int, n: int, writable: "select.poll") -> bool:
+       """Move n bytes from the pipe to the socket. False if the client broke or didn't read for 1s."""
+       while n:
+          try:
+             n -= os.splice(pipe_r, fd, n, flags=os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK)
+          except BlockingIOError: # socket buffer full: wait for the client, but not forever
+             if not writable.poll(1000) or not self._running.is_set():
+                return False
+          except OSError:
+             return False
+       return True
+
     def stop(self):
        self._running.clear()
        try:
@@ -82,12 +298,196 @@ class EchoServer:
         logger.warning("Error shutting down: %r", e)
        try:
           self._sock.close()
-       except Exception:
+       except Exception as e:
         logger.warning("Error closing socket: %r", e)
        
        if self._accept_thread:
           self._accept_thread.join(timeout=1.0)
-       for t in self._handler_threads:
+       with self._stats_lock:
+          handlers = list(self._handler_threads)
+       for t in handlers + self._workers:
           t.join(timeout=0.1)
+       if self._accept_queue is not None:
+          # close clients that never got a worker
+          while True:
+             try:
+                self._accept_queue.get_nowait().close()
+             except queue.Empty:
+                break
        logger.info("EchoServer stopped")
-       
\ No newline at end of file
+
+
+class _Connection:
+   """Per-client state for the selector engine."""
+   __slots__ = ("sock", "outbuf", "closing", "events")
+
+   def __init__(self, sock: socket.socket):
+      self.sock = sock
+      self.outbuf = bytearray() # bytes we still owe the client
+      self.closing = False # client sent EOF, close once outbuf is flushed
+      self.events = selectors.EVENT_READ
+
+
+class SelectorEchoServer:
+    """
+    Event-loop engine: one thread, one selector (epoll on Linux) and non-blocking sockets.
+    Same start/stop/host/port API as EchoServer, but the number of clients is limited by
+    file descriptors instead of threads.
+    """
+    RECV_SIZE = 65536
+    MAX_PENDING = 1 << 20 # stop reading from a client that isn't draining its echoes
+
+    def __init__(self, host: str="127.0.0.1", port: int = 0, backlog: int = 1024):
+        self._host = host
+        self._port = port
+        self._backlog = backlog
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self._host, self._port))
+        self._host, self._port = self._sock.getsockname()
+        self._sock.listen(self._backlog)
+        self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._running = threading.Event()
+        self._loop_thread = None
+        self._conns: Dict[int, _Connection] = {} # fd -> connection
+        # writing a byte here wakes the loop up from select() so stop() is immediate
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+
+    @property
+    def host(self) -> str:
+       return self._host
+
+    @property
+    def port(self) -> int:
+       return self._port
+
+    @property
+    def connection_count(self) -> int:
+       return len(self._conns)
+
+    def start(self):
+        self._running.set()
+        self._selector.register(self._sock, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._loop_thread = threading.Thread(target=self._event_loop, daemon=True)
+        self._loop_thread.start()
+        logger.info("SelectorEchoServer started on %r:%d", self._host, self._port)
+
+    def _event_loop(self):
+        try:
+            while self._running.is_set():
+                for key, mask in self._selector.select():
+                    if key.data == "accept":
+                        self._accept()
+                    elif key.data == "wake":
+                        return
+                    else:
+                        self._service(key.data, mask)
+        finally:
+            for conn in list(self._conns.values()):
+                self._close(conn)
+            try:
+                self._selector.close()
+                self._sock.close()
+            except Exception as e:
+                logger.warning("Error closing socket: %r", e)
+
+    def _accept(self):
+        # drain the whole accept queue in one wakeup
+        while True:
+            try:
+                client_sock, _addr = self._sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return # listening socket closed
+            client_sock.setblocking(False)
+            conn = _Connection(client_sock)
+            self._conns[client_sock.fileno()] = conn
+            self._selector.register(client_sock, selectors.EVENT_READ, conn)
+
+    def _service(self, conn: _Connection, mask: int):
+        if mask & selectors.EVENT_READ:
+            try:
+                data = conn.sock.recv(self.RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                data = None
+            except OSError:
+                self._close(conn)
+                return
+            if data == b"":
+                conn.closing = True
+            elif data:
+                self._send(conn, data)
+                if conn.sock.fileno() == -1:
+                    return
+        if mask & selectors.EVENT_WRITE and conn.outbuf:
+            self._send(conn, b"")
+            if conn.sock.fileno() == -1:
+                return
+        if conn.closing and not conn.outbuf:
+            self._close(conn)
+            return
+        self._update_interest(conn)
+
+    def _send(self, conn: _Connection, data: bytes):
+        if data:
+            conn.outbuf += data
+        try:
+            sent = conn.sock.send(conn.outbuf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close(conn)
+            return
+        del conn.outbuf[:sent]
+
+    def _update_interest(self, conn: _Connection):
+        events = 0
+        if not conn.closing and len(conn.outbuf) < self.MAX_PENDING:
+            events |= selectors.EVENT_READ
+        if conn.outbuf:
+            events |= selectors.EVENT_WRITE
+        if events != conn.events:
+            self._selector.modify(conn.sock, events, conn)
+            conn.events = events
+
+    def _close(self, conn: _Connection):
+        fd = conn.sock.fileno()
+        if fd == -1:
+            return
+        self._conns.pop(fd, None)
+        try:
+            self._selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+
+    def stop(self):
+       self._running.clear()
+       try:
+          self._wake_w.send(b"\0")
+       except OSError:
+          pass
+       if self._loop_thread:
+          self._loop_thread.join(timeout=1.0)
+       else: # never started, the loop didn't get a chance to clean up
+          self._selector.close()
+          self._sock.close()
+       self._wake_r.close()
+       self._wake_w.close()
+       logger.info("SelectorEchoServer stopped")
+
+
+ENGINES = {"threaded": EchoServer, "selector": SelectorEchoServer}
+
+def make_server(engine: str = "threaded", **kwargs):
+    """Build an echo server by engine name (see ENGINES)."""
+    try:
+        cls = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"unknown engine: {engine!r}")
+    return cls(**kwargs)
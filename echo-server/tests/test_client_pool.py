@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+from client import AsyncEchoClientPool, EchoClientPool
+from server import EchoServer
+
+@pytest.fixture
+def echo_server():
+    srv = EchoServer()
+    srv.start()
+    yield srv
+    srv.stop()
+
+def test_pool_reuses_connections(echo_server):
+    with EchoClientPool(echo_server.host, echo_server.port, size=2) as pool:
+        for i in range(50):
+            assert pool.request(f"msg-{i}".encode()) == f"msg-{i}".encode()
+        assert pool.connects == 1
+    assert echo_server.metrics()["accepted"] == 1
+
+def test_pipeline_matches_responses(echo_server):
+    with EchoClientPool(echo_server.host, echo_server.port) as pool:
+        messages = [f"m{i}".encode() * (i + 1) for i in range(100)] + [b""]
+        assert pool.pipeline(messages) == messages
+
+def test_pipeline_bigger_than_socket_buffers(echo_server):
+    # ~20 MB in one batch: sending it all before reading would block client and server on send
+    messages = [bytes([i % 256]) * 4096 for i in range(5000)]
+    with EchoClientPool(echo_server.host, echo_server.port, timeout=5.0) as pool:
+        assert pool.pipeline(messages) == messages
+        assert pool.request(b"still usable") == b"still usable"
+
+def test_pool_shared_between_threads(echo_server):
+    results = {}
+    with EchoClientPool(echo_server.host, echo_server.port, size=3) as pool:
+        def worker(idx):
+            results[idx] = [pool.request(f"{idx}-{j}".encode()) for j in range(20)]
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5.0)
+        assert pool.connects <= 3
+    assert all(results[i] == [f"{i}-{j}".encode() for j in range(20)] for i in range(6))
+
+def test_broken_connection_is_replaced(echo_server):
+    with EchoClientPool(echo_server.host, echo_server.port, size=1) as pool:
+        assert pool.request(b"a") == b"a"
+        conn = pool._idle.get_nowait()
+        conn._sock.close() # simulate a dropped connection
+        conn.broken = True
+        pool._release(conn)
+        assert pool.request(b"b") == b"b"
+        assert pool.connects == 2
+
+@pytest.mark.asyncio
+async def test_async_pool_multiplexes_requests(echo_server):
+    async with AsyncEchoClientPool(echo_server.host, echo_server.port, size=2) as pool:
+        messages = [f"async-{i}".encode() for i in range(200)]
+        results = await asyncio.gather(*(pool.request(m) for m in messages))
+        assert results == messages
+        assert await pool.pipeline([b"x", b"yy", b"zzz"]) == [b"x", b"yy", b"zzz"]
+        assert pool.connects <= 2
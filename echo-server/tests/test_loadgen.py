@@ -0,0 +1,48 @@
+import asyncio
+import random
+
+import pytest
+from loadgen import LatencyHistogram, run_load
+from server import SelectorEchoServer
+
+def test_histogram_exact_for_small_values():
+    h = LatencyHistogram()
+    for v in range(1, 101):
+        h.record(v)
+    assert h.count == 100
+    assert h.percentile(50) == 50
+    assert h.percentile(99) == 99
+    assert h.percentile(100) == 100
+    assert h.mean() == 50.5
+
+def test_histogram_relative_precision():
+    rng = random.Random(1)
+    values = sorted(rng.randrange(1_000, 50_000_000) for _ in range(10000))
+    h = LatencyHistogram()
+    for v in values:
+        h.record(v)
+    for q in (50, 90, 99, 99.9):
+        exact = values[int(q / 100 * len(values)) - 1]
+        assert abs(h.percentile(q) - exact) / exact < 0.02
+
+def test_histogram_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for v in range(1000):
+        (a if v % 2 else b).record(v * 1000)
+    a.merge(b)
+    assert a.count == 1000
+    assert a.min == 0
+    assert a.max == 999000
+
+@pytest.mark.asyncio
+async def test_run_load_against_selector_server():
+    srv = SelectorEchoServer()
+    srv.start()
+    try:
+        result = await run_load(srv.host, srv.port, connections=50, size=128, depth=4, duration=0.3)
+    finally:
+        srv.stop()
+    assert result["errors"] == 0
+    assert result["messages"] >= 50 * 4
+    lat = result["latency_us"]
+    assert 0 < lat["p50"] <= lat["p99"] <= lat["p999"] <= lat["max"]
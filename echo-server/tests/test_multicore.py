@@ -0,0 +1,37 @@
+import socket
+
+import pytest
+from multicore import WorkerPool
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="needs SO_REUSEPORT")
+
+def echo_once(host, port, message):
+    with socket.create_connection((host, port), timeout=2.0) as s:
+        s.sendall(message)
+        received = b""
+        while len(received) < len(message):
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            received += chunk
+        return received
+
+def test_connections_spread_across_workers():
+    with WorkerPool(workers=4) as pool:
+        for i in range(64):
+            assert echo_once(pool.host, pool.port, f"msg-{i}".encode()) == f"msg-{i}".encode()
+        stats = pool.stats()
+
+    assert len(set(pool.pids)) == 4
+    assert stats["connections"] == 64
+    assert stats["bytes"] == sum(len(f"msg-{i}") for i in range(64))
+    busy = [w for w in stats["workers"] if w["connections"] > 0]
+    assert len(busy) >= 2 # the kernel hashes connections over every listener
+
+def test_stop_shuts_every_worker_down():
+    pool = WorkerPool(workers=2)
+    host, port = pool.start()
+    assert echo_once(host, port, b"ping") == b"ping"
+    pool.stop()
+    with pytest.raises(OSError):
+        socket.create_connection((host, port), timeout=0.5)
@@ -0,0 +1,89 @@
+import socket
+import time
+
+import pytest
+from server import EchoServer
+from client import echo_client
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+def test_pool_mode_echoes():
+    srv = EchoServer(max_workers=4)
+    srv.start()
+    try:
+        for i in range(20):
+            assert echo_client(srv.host, srv.port, f"msg-{i}".encode()) == f"msg-{i}".encode()
+        assert wait_for(lambda: srv.metrics()["completed"] == 20)
+        assert srv.metrics()["rejected"] == 0
+    finally:
+        srv.stop()
+
+def test_pool_rejects_when_saturated():
+    srv = EchoServer(max_workers=1, queue_size=1, admission="reject")
+    srv.start()
+    socks = []
+    try:
+        # first client occupies the only worker, second waits in the queue
+        busy = socket.create_connection((srv.host, srv.port))
+        socks.append(busy)
+        busy.sendall(b"x")
+        assert busy.recv(1) == b"x"
+        socks.append(socket.create_connection((srv.host, srv.port)))
+        assert wait_for(lambda: srv.metrics()["queued"] == 1)
+
+        # third one gets turned away
+        rejected = socket.create_connection((srv.host, srv.port))
+        socks.append(rejected)
+        rejected.settimeout(2.0)
+        assert rejected.recv(1) == b""
+        m = srv.metrics()
+        assert m["rejected"] == 1
+        assert m["active"] == 1
+    finally:
+        for s in socks:
+            s.close()
+        srv.stop()
+
+def test_pool_delay_admits_once_a_worker_frees_up():
+    srv = EchoServer(max_workers=1, queue_size=1, admission="delay", admission_timeout=3.0)
+    srv.start()
+    try:
+        first = socket.create_connection((srv.host, srv.port))
+        first.sendall(b"1")
+        assert first.recv(1) == b"1"
+        second = socket.create_connection((srv.host, srv.port))
+        assert wait_for(lambda: srv.metrics()["queued"] == 1)
+        third = socket.create_connection((srv.host, srv.port)) # accept loop now waits for room
+
+        first.close() # frees the worker -> second runs -> third gets queued
+        second.sendall(b"2")
+        assert second.recv(1) == b"2"
+        second.close()
+        third.settimeout(3.0)
+        third.sendall(b"3")
+        assert third.recv(1) == b"3"
+        third.close()
+        assert srv.metrics()["rejected"] == 0
+    finally:
+        srv.stop()
+
+def test_finished_handler_threads_are_reaped():
+    srv = EchoServer()
+    srv.start()
+    try:
+        for _ in range(30):
+            echo_client(srv.host, srv.port, b"ping")
+        assert wait_for(lambda: srv.metrics()["handler_threads"] == 0)
+        assert srv.metrics()["completed"] == 30
+    finally:
+        srv.stop()
+
+def test_unknown_admission_policy():
+    with pytest.raises(ValueError):
+        EchoServer(max_workers=1, admission="maybe")
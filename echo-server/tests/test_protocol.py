@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from async_echo import run_server
+
+@pytest.mark.asyncio
+async def test_echo_protocol():
+    server, (host, port) = await run_server(engine="protocol")
+    async with server:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"yooooh twin")
+        await writer.drain()
+        assert await reader.readexactly(11) == b"yooooh twin"
+        writer.close()
+        await writer.wait_closed()
+
+@pytest.mark.asyncio
+async def test_multiple_clients_concurrently():
+    server, (host, port) = await run_server(engine="protocol")
+    async with server:
+        async def client_task(msg: bytes):
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(msg)
+            await writer.drain()
+            data = await reader.readexactly(len(msg))
+            writer.close()
+            await writer.wait_closed()
+            return data
+
+        msgs = [b"hello", b"world", b"asyncio", b"rocks"]
+        assert await asyncio.gather(*(client_task(m) for m in msgs)) == msgs
+
+@pytest.mark.asyncio
+async def test_idle_timer_is_reset_by_activity():
+    server, (host, port) = await run_server(engine="protocol", timeout=0.3)
+    async with server:
+        reader, writer = await asyncio.open_connection(host, port)
+        # keep talking for longer than the timeout, the connection must stay up
+        for _ in range(6):
+            writer.write(b"x")
+            await writer.drain()
+            assert await reader.readexactly(1) == b"x"
+            await asyncio.sleep(0.1)
+        # then go quiet: server closes us
+        with pytest.raises(asyncio.IncompleteReadError):
+            await asyncio.wait_for(reader.readexactly(1), timeout=2.0)
+        writer.close()
+        await writer.wait_closed()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["protocol", "buffered"])
+async def test_flow_control_with_slow_reader(engine):
+    stats = {"connections": 0, "bytes": 0, "paused": 0}
+    server, (host, port) = await run_server(engine=engine, stats=stats)
+    async with server:
+        reader, writer = await asyncio.open_connection(host, port)
+        payload = b"z" * (32 * 1024 * 1024) # far more than the high water mark plus the socket buffers
+        writer.write(payload)
+        send = asyncio.create_task(writer.drain())
+        await asyncio.sleep(0.3) # don't read yet, server must pause instead of buffering it all
+        assert stats["paused"] >= 1
+        # paused: it stopped reading, so what it took in is bounded by buffers, not the payload
+        assert stats["bytes"] < len(payload) // 2
+        data = await reader.readexactly(len(payload))
+        await send
+        assert data == payload
+        writer.close()
+        await writer.wait_closed()
+
+@pytest.mark.asyncio
+async def test_unknown_engine():
+    with pytest.raises(ValueError):
+        await run_server(engine="carrier-pigeon")
@@ -0,0 +1,69 @@
+import socket
+import threading
+import time
+
+import pytest
+from server import SelectorEchoServer, make_server
+from client import echo_client
+
+@pytest.fixture
+def selector_server():
+    srv = SelectorEchoServer()
+    srv.start()
+    yield srv
+    srv.stop()
+
+def test_echo_basic(selector_server):
+    assert echo_client(selector_server.host, selector_server.port, b"hello") == b"hello"
+
+def test_large_message(selector_server):
+    message = b"A" * 500000
+    assert echo_client(selector_server.host, selector_server.port, message) == message
+
+def test_many_connections_single_thread(selector_server):
+    threads_before = threading.active_count()
+    socks = [socket.create_connection((selector_server.host, selector_server.port)) for _ in range(300)]
+    try:
+        for i, s in enumerate(socks):
+            s.sendall(f"msg-{i}".encode())
+        for i, s in enumerate(socks):
+            s.settimeout(2.0)
+            assert s.recv(64) == f"msg-{i}".encode()
+        # no thread per client
+        assert threading.active_count() == threads_before
+        assert selector_server.connection_count == 300
+    finally:
+        for s in socks:
+            s.close()
+
+def test_closed_clients_are_released(selector_server):
+    for _ in range(10):
+        with socket.create_connection((selector_server.host, selector_server.port)) as s:
+            s.sendall(b"bye")
+            s.recv(3)
+    deadline = time.time() + 1.0
+    while selector_server.connection_count and time.time() < deadline:
+        time.sleep(0.01)
+    assert selector_server.connection_count == 0
+
+def test_timeout_behaviour(selector_server):
+    soc = socket.create_connection((selector_server.host, selector_server.port))
+    soc.settimeout(0.2)
+    with pytest.raises(TimeoutError):
+        soc.recv(1024)
+    soc.close()
+
+def test_stop_closes_listener():
+    srv = SelectorEchoServer()
+    srv.start()
+    host, port = srv.host, srv.port
+    srv.stop()
+    with pytest.raises(OSError):
+        socket.create_connection((host, port), timeout=0.5)
+
+def test_make_server_engines():
+    srv = make_server("selector")
+    assert isinstance(srv, SelectorEchoServer)
+    srv.stop()
+    with pytest.raises(ValueError):
+        make_server("nope")
@@ -0,0 +1,97 @@
+import asyncio
+import socket
+import ssl
+import time
+
+import pytest
+pytest.importorskip("cryptography")
+
+from async_echo import run_server
+from client import AsyncEchoClientPool, EchoClientPool
+from server import EchoServer
+from tls import client_context, make_self_signed, server_context
+
+@pytest.fixture(scope="module")
+def certs(tmp_path_factory):
+    return make_self_signed(str(tmp_path_factory.mktemp("tls")))
+
+@pytest.fixture
+def tls_server(certs):
+    srv = EchoServer(ssl_context=server_context(*certs), echo_mode="splice")
+    srv.start()
+    yield srv
+    srv.stop()
+
+def test_threaded_server_echoes_over_tls(tls_server, certs):
+    ctx = client_context(cafile=certs[0])
+    with socket.create_connection((tls_server.host, tls_server.port), timeout=2) as raw:
+        with ctx.wrap_socket(raw, server_hostname="localhost") as s:
+            s.sendall(b"secret")
+            assert s.recv(64) == b"secret"
+
+def test_large_pipeline_over_tls(tls_server, certs):
+    messages = [bytes([i % 256]) * 4096 for i in range(5000)] # ~20 MB
+    with EchoClientPool(tls_server.host, tls_server.port, timeout=5.0, ssl_context=client_context(cafile=certs[0])) as pool:
+        assert pool.pipeline(messages) == messages
+
+def test_plaintext_client_is_dropped(tls_server):
+    with socket.create_connection((tls_server.host, tls_server.port), timeout=2) as s:
+        s.sendall(b"GET / HTTP/1.0\r\n\r\n")
+        try:
+            assert b"GET" not in s.recv(64) # an alert or EOF, never an echo
+        except ConnectionResetError:
+            pass
+    for _ in range(50):
+        if tls_server.metrics()["tls_failed"]:
+            break
+        time.sleep(0.02)
+    assert tls_server.metrics()["tls_failed"] == 1
+    assert tls_server.metrics()["tls_handshakes"] == 0
+
+def test_untrusted_cert_is_rejected(tls_server):
+    ctx = client_context() # system CAs only, the self-signed cert isn't trusted
+    with socket.create_connection((tls_server.host, tls_server.port), timeout=2) as raw:
+        with pytest.raises(ssl.SSLCertVerificationError):
+            ctx.wrap_socket(raw, server_hostname="localhost")
+
+@pytest.mark.parametrize("tls12", [False, True])
+def test_pool_resumes_sessions(tls_server, certs, tls12):
+    ctx = client_context(cafile=certs[0])
+    if tls12:
+        ctx.maximum_version = ssl.TLSVersion.TLSv1_2
+    with EchoClientPool(tls_server.host, tls_server.port, size=1, ssl_context=ctx) as pool:
+        assert pool.request(b"first") == b"first"
+        # force new connections: each one should offer the stored session
+        for i in range(3):
+            conn = pool._acquire()
+            conn.broken = True
+            pool._release(conn)
+            assert pool.request(f"again-{i}".encode()) == f"again-{i}".encode()
+        assert pool.connects == 4
+        assert pool.resumed == 3
+    assert tls_server.metrics()["tls_resumed"] == 3
+
+def test_custom_ciphers(certs):
+    cipher = "ECDHE-ECDSA-AES256-GCM-SHA384"
+    srv = EchoServer(ssl_context=server_context(*certs, ciphers=cipher))
+    srv.start()
+    try:
+        ctx = client_context(cafile=certs[0])
+        ctx.maximum_version = ssl.TLSVersion.TLSv1_2
+        with socket.create_connection((srv.host, srv.port), timeout=2) as raw:
+            with ctx.wrap_socket(raw, server_hostname="localhost") as s:
+                assert s.cipher()[0] == cipher
+                s.sendall(b"x")
+                assert s.recv(8) == b"x"
+    finally:
+        srv.stop()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", ["streams", "protocol", "buffered"])
+async def test_async_engines_over_tls(certs, engine):
+    server, (host, port) = await run_server(engine=engine, ssl=server_context(*certs))
+    async with server:
+        async with AsyncEchoClientPool(host, port, size=2, ssl_context=client_context(cafile=certs[0])) as pool:
+            msgs = [f"msg-{i}".encode() * 100 for i in range(20)]
+            assert await pool.pipeline(msgs) == msgs
+        await asyncio.sleep(0.05)
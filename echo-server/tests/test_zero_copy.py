@@ -0,0 +1,71 @@
+import asyncio
+import os
+import socket
+
+import pytest
+from async_echo import run_server
+from server import EchoServer
+from client import echo_client
+
+@pytest.mark.parametrize("mode", ["recv_into", "splice"])
+def test_threaded_modes_echo_large_message(mode):
+    if mode == "splice" and not hasattr(os, "splice"):
+        pytest.skip("os.splice is Linux only")
+    srv = EchoServer(echo_mode=mode)
+    srv.start()
+    try:
+        message = os.urandom(2 * 1024 * 1024)
+        assert echo_client(srv.host, srv.port, message, recv_size=65536, timeout=5.0) == message
+        assert echo_client(srv.host, srv.port, b"") == b""
+    finally:
+        srv.stop()
+
+def test_unknown_echo_mode():
+    with pytest.raises(ValueError):
+        EchoServer(echo_mode="teleport")
+
+@pytest.mark.asyncio
+async def test_buffered_engine_echo():
+    server, (host, port) = await run_server(engine="buffered")
+    async with server:
+        reader, writer = await asyncio.open_connection(host, port)
+        message = os.urandom(1024 * 1024)
+        writer.write(message)
+        await writer.drain()
+        data = await reader.readexactly(len(message))
+        assert data == message
+        writer.close()
+        await writer.wait_closed()
+
+@pytest.mark.asyncio
+async def test_buffered_engine_idle_timeout():
+    server, (host, port) = await run_server(engine="buffered", timeout=0.2)
+    async with server:
+        reader, writer = await asyncio.open_connection(host, port)
+        with pytest.raises(asyncio.IncompleteReadError):
+            await asyncio.wait_for(reader.readexactly(1), timeout=2.0)
+        writer.close()
+        await writer.wait_closed()
+
+@pytest.mark.parametrize("mode", ["copy", "splice"])
+def test_client_that_never_reads_is_dropped(mode):
+    if mode == "splice" and not hasattr(os, "splice"):
+        pytest.skip("os.splice is Linux only")
+    srv = EchoServer(echo_mode=mode, max_workers=1, queue_size=2)
+    srv.start()
+    try:
+        stuck = socket.socket()
+        stuck.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096) # small, or loopback autotuning swallows MBs of echo
+        stuck.connect((srv.host, srv.port))
+        stuck.setblocking(False)
+        chunk = b"x" * 65536
+        try:
+            while True: # fill our send buffer, the server's receive buffer and its echo path
+                stuck.send(chunk)
+        except BlockingIOError:
+            pass
+        # the only worker has to give up on the stuck client to serve this one
+        assert echo_client(srv.host, srv.port, b"next", timeout=5.0) == b"next"
+        stuck.close()
+    finally:
+        srv.stop()
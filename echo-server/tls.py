@@ -0,0 +1,94 @@
+"""
+TLS helpers for the echo servers and the pooled client.
+
+Certificates: generate an Ed25519 key and a self-signed cert with the PKI_TLS tooling
+
+    cd ../PKI_TLS
+    python sign_keypair.py gen-ed
+    python sign_keypair.py self-signed --cn localhost
+
+then pass cert.pem / private.pem to server_context() and cert.pem as the
+client's cafile.
+
+Resumption: TLS 1.3 session tickets are issued by the server (num_tickets);
+the sync client pool keeps the last session and offers it on new
+connections, which skips the certificate exchange and signature work.
+"""
+import os
+import ssl
+from typing import Optional, Tuple
+
+SESSION_TICKETS = 2 # TLS 1.3 tickets sent after each full handshake
+
+
+def server_context(certfile: str, keyfile: Optional[str] = None, ciphers: Optional[str] = None,
+                   session_tickets: int = SESSION_TICKETS,
+                   minimum_version: ssl.TLSVersion = ssl.TLSVersion.TLSv1_2) -> ssl.SSLContext:
+    """
+    `ciphers` is an OpenSSL cipher string and applies to TLS 1.2 (Python's ssl
+    module can't restrict the TLS 1.3 suites, those are always the AEAD ones).
+    """
+    ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ctx.minimum_version = minimum_version
+    ctx.load_cert_chain(certfile, keyfile)
+    if ciphers:
+        ctx.set_ciphers(ciphers)
+    ctx.options &= ~ssl.OP_NO_TICKET # TLS 1.2 session tickets
+    ctx.num_tickets = session_tickets # TLS 1.3 session tickets
+    return ctx
+
+
+def client_context(cafile: Optional[str] = None, ciphers: Optional[str] = None,
+                   verify: bool = True) -> ssl.SSLContext:
+    ctx = ssl.create_default_context(cafile=cafile)
+    if ciphers:
+        ctx.set_ciphers(ciphers)
+    if not verify: # self-signed cert without a cafile, local testing only
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+def make_self_signed(directory: str, common_name: str = "localhost") -> Tuple[str, str]:
+    """
+    Same cert as PKI_TLS/sign_keypair.py self-signed, written to `directory` with a fresh
+    key (handy for tests and benchmarks). Needs the `cryptography` package.
+    Returns (certfile, keyfile).
+    (Copied from self_signed_cert on purpose, the projects don't share packages; that one
+    reads private.pem from the cwd and prints, this one has to work in a temp dir.
+    Keep the two in sync.)
+    """
+    import datetime
+    import ipaddress
+    from cryptography import x509
+    from cryptography.x509.oid import NameOID
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+
+    key = ed25519.Ed25519PrivateKey.generate()
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([ # clients may dial 127.0.0.1 instead of the name
+            x509.DNSName(common_name),
+            x509.IPAddress(ipaddress.ip_address("127.0.0.1")),
+            x509.IPAddress(ipaddress.ip_address("::1")),
+        ]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, algorithm=None)
+    )
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "private.pem")
+    with open(certfile, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
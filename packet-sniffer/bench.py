@@ -0,0 +1,224 @@
+"""
+Throughput benchmark for the sniffer pipeline.
+
+1) generate a synthetic pcap (IP cardinality, packet rate, HTTP/non-HTTP mix and
+   requests split over two TCP segments are all configurable)
+2) replay it through the same stages the live sniffer uses:
+   dissect (scapy) -> parse_http_host -> AnomalyDetector
+3) report packets/sec, CPU time per stage and peak memory as JSON, so results
+   can be stored and compared between commits.
+
+Usage:
+python3 bench.py --packets 100000 --ips 5000 --output bench.json
+python3 bench.py --pcap capture.pcap
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from scapy.all import PcapReader, IP, Raw
+
+try:
+    import resource
+except ImportError: # Unix only: on Windows the report just has no max_rss_kib
+    resource = None
+
+from sniffer import AnomalyDetector, parse_http_host
+
+PCAP_GLOBAL_HEADER = struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1) # linktype 1 = Ethernet
+_REC_HDR = struct.Struct("<IIII")
+_ETH = b"\x02\x00\x00\x00\x00\x02" + b"\x02\x00\x00\x00\x00\x01" + b"\x08\x00"
+
+NON_HTTP_PAYLOADS = (
+    b"\x16\x03\x01\x02\x00\x01\x00\x01\xfc\x03\x03", # TLS client hello prefix
+    b"SSH-2.0-OpenSSH_9.6\r\n",
+    b"\x00" * 64,
+)
+HTTP_METHODS = ("GET", "GET", "GET", "POST", "HEAD")
+
+
+def _ip_checksum(header: bytes) -> int:
+    total = sum(struct.unpack("!10H", header))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _frame(src: bytes, dst: bytes, sport: int, dport: int, seq: int, payload: bytes) -> bytes:
+    tcp = struct.pack("!HHIIBBHHH", sport, dport, seq, 0, 5 << 4, 0x18, 65535, 0, 0)
+    total_len = 20 + len(tcp) + len(payload)
+    ip = struct.pack("!BBHHHBBH4s4s", 0x45, 0, total_len, seq & 0xFFFF, 0x4000, 64, 6, 0, src, dst)
+    ip = ip[:10] + struct.pack("!H", _ip_checksum(ip)) + ip[12:]
+    return _ETH + ip + tcp + payload
+
+
+def _http_request(rng: random.Random, host: str) -> bytes:
+    method = rng.choice(HTTP_METHODS)
+    path = "/" + "/".join(f"p{rng.randrange(100)}" for _ in range(rng.randrange(1, 4)))
+    return (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+            "User-Agent: bench/1.0\r\nAccept: */*\r\n\r\n").encode()
+
+
+def generate_pcap(path: str, packets: int = 10000, ips: int = 1000, rate: float = 1000.0,
+                  http_ratio: float = 0.7, fragment_ratio: float = 0.1,
+                  hosts_per_ip: int = 3, port: int = 80, seed: int = 0) -> dict:
+    """
+    Write a synthetic capture to `path`. The pcap is written with struct directly
+    (no scapy packet building) so large files generate quickly.
+    - rate: packets per second across all sources (timestamps are spaced accordingly)
+    - http_ratio: fraction of packets carrying an HTTP request
+    - fragment_ratio: fraction of HTTP requests split over two TCP segments
+    Returns the counts of what was generated.
+    """
+    rng = random.Random(seed)
+    dst = bytes([10, 255, 0, 1])
+    sources = [bytes([10, (i >> 16) & 0xFF, (i >> 8) & 0xFF, i & 0xFF]) for i in range(1, ips + 1)]
+    start = 1_700_000_000.0
+    counts = {"packets": 0, "http_requests": 0, "fragmented": 0, "non_http": 0}
+
+    with open(path, "wb") as f:
+        f.write(PCAP_GLOBAL_HEADER)
+
+        def write(ts, frame):
+            sec = int(ts)
+            f.write(_REC_HDR.pack(sec, int((ts - sec) * 1e6), len(frame), len(frame)))
+            f.write(frame)
+            counts["packets"] += 1
+
+        while counts["packets"] < packets:
+            ts = start + counts["packets"] / rate
+            idx = rng.randrange(ips)
+            src, sport = sources[idx], 1024 + rng.randrange(60000)
+            seq = rng.randrange(1 << 32)
+            if rng.random() < http_ratio:
+                host = f"host{idx % 997}-{rng.randrange(hosts_per_ip)}.test"
+                payload = _http_request(rng, host)
+                counts["http_requests"] += 1
+                if rng.random() < fragment_ratio and counts["packets"] + 2 <= packets:
+                    cut = rng.randrange(4, len(payload) - 4)
+                    write(ts, _frame(src, dst, sport, port, seq, payload[:cut]))
+                    write(ts + 0.5 / rate, _frame(src, dst, sport, port, seq + cut, payload[cut:]))
+                    counts["fragmented"] += 1
+                    continue
+            else:
+                payload = rng.choice(NON_HTTP_PAYLOADS)
+                counts["non_http"] += 1
+            write(ts, _frame(src, dst, sport, port, seq, payload))
+    return counts
+
+
+def replay(path: str, detector: AnomalyDetector | None = None) -> dict:
+    """
+    Push every packet in `path` through the sniffer pipeline.
+    CPU time (thread_time) is accumulated separately for each stage.
+    """
+    detector = detector if detector is not None else AnomalyDetector()
+    clock = time.thread_time_ns
+    stage_ns = {"dissect": 0, "parse": 0, "detect": 0}
+    stats = {"packets": 0, "with_payload": 0, "http": 0, "anomalies": 0}
+
+    wall_start = time.perf_counter()
+    with PcapReader(path) as reader:
+        it = iter(reader)
+        while True:
+            t0 = clock()
+            try:
+                pkt = next(it)
+            except StopIteration:
+                break
+            stats["packets"] += 1
+            if not (pkt.haslayer(IP) and pkt.haslayer(Raw)):
+                stage_ns["dissect"] += clock() - t0
+                continue
+            payload = bytes(pkt[Raw].load)
+            src = pkt[IP].src
+            ts = float(pkt.time)
+            t1 = clock()
+            stage_ns["dissect"] += t1 - t0
+            stats["with_payload"] += 1
+
+            host, _path, method = parse_http_host(payload)
+            t2 = clock()
+            stage_ns["parse"] += t2 - t1
+            if method is None:
+                continue
+            stats["http"] += 1
+
+            detector.add_request(src, host, timestamp=ts)
+            if detector.check_rate_anomaly(src) or detector.check_many_hosts(src):
+                stats["anomalies"] += 1
+            stage_ns["detect"] += clock() - t2
+    wall = time.perf_counter() - wall_start
+
+    stats["wall_seconds"] = wall
+    stats["packets_per_sec"] = stats["packets"] / wall if wall else 0.0
+    stats["stage_cpu_seconds"] = {k: v / 1e9 for k, v in stage_ns.items()}
+    stats["sources"] = len(detector.total_requests)
+    return stats
+
+
+def measure_peak_memory(path: str) -> int:
+    """Separate pass under tracemalloc (it slows everything down, so it isn't timed)."""
+    tracemalloc.start()
+    try:
+        replay(path)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmark(pcap: str | None = None, memory: bool = True, **gen_kwargs) -> dict:
+    result = {"python": sys.version.split()[0]}
+    tmpdir = None
+    if pcap is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="sniffer_bench_")
+        pcap = os.path.join(tmpdir.name, "synthetic.pcap")
+        t0 = time.perf_counter()
+        result["generated"] = generate_pcap(pcap, **gen_kwargs)
+        result["generate_seconds"] = time.perf_counter() - t0
+        result["config"] = gen_kwargs
+    try:
+        result["pcap_bytes"] = os.path.getsize(pcap)
+        result["replay"] = replay(pcap)
+        if memory:
+            result["peak_traced_bytes"] = measure_peak_memory(pcap)
+        if resource is not None:
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # KiB on Linux, bytes on macOS
+            result["max_rss_kib"] = max_rss // 1024 if sys.platform == "darwin" else max_rss
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sniffer pipeline on a synthetic or real pcap")
+    parser.add_argument("--pcap", help="replay an existing capture instead of generating one")
+    parser.add_argument("--packets", type=int, default=50000)
+    parser.add_argument("--ips", type=int, default=1000, help="number of distinct source IPs")
+    parser.add_argument("--rate", type=float, default=1000.0, help="packets per second in the capture timeline")
+    parser.add_argument("--http-ratio", type=float, default=0.7)
+    parser.add_argument("--fragment-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    gen = {} if args.pcap else dict(packets=args.packets, ips=args.ips, rate=args.rate,
+                                    http_ratio=args.http_ratio, fragment_ratio=args.fragment_ratio,
+                                    seed=args.seed)
+    result = run_benchmark(args.pcap, memory=not args.no_memory, **gen)
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
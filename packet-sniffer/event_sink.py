@@ -0,0 +1,301 @@
+"""
+Non-blocking anomaly event sink.
+
+The capture path only calls `emit()`, which does a couple of dict lookups and a
+`queue.put_nowait()`. A background writer thread drains the queue in batches and
+appends them as JSON Lines (optionally gzip-compressed), rotating the file by
+size and/or age. Repeated alerts for the same (src_ip, kind) are collapsed so a
+noisy source can't flood the disk.
+"""
+from __future__ import annotations
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+EVENT_QUEUE_SIZE = 10000 # events buffered before we start dropping
+EVENT_BATCH_SIZE = 256 # max events written per write() call
+EVENT_FLUSH_INTERVAL = 1.0 # seconds the writer waits before flushing a partial batch
+EVENT_MAX_BYTES = 5 * 1024 * 1024
+EVENT_BACKUP_COUNT = 3
+DEDUP_WINDOW_SECONDS = 60 # same (ip, kind) alert is written at most once per window
+MAX_EVENTS_PER_IP = 20 # any kind, per dedup window
+PRUNE_SLICE = 1024 # stale throttle keys dropped per hold of the lock emit() needs
+
+_STOP = object() # sentinel that tells the writer to flush and exit
+
+logger = logging.getLogger("http_sniffer")
+
+
+class AlertThrottle:
+    """
+    Decides whether an alert should be written.
+    - the same (src_ip, kind) is let through once per `window` seconds,
+      the next one that gets through carries a `suppressed` count
+    - a single src_ip can't emit more than `max_per_ip` alerts per window
+    """
+    def __init__(self, window=DEDUP_WINDOW_SECONDS, max_per_ip=MAX_EVENTS_PER_IP):
+        self.window = window
+        self.max_per_ip = max_per_ip
+        self._last_seen: Dict[Tuple[str, str], float] = {}
+        self._suppressed: Dict[Tuple[str, str], list] = {} # key -> [count, last_suppressed_at]
+        self._ip_budget: Dict[str, list] = {} # ip -> [window_start, count]
+
+    def _suppress(self, key: Tuple[str, str], now: float):
+        entry = self._suppressed.get(key)
+        if entry is None:
+            self._suppressed[key] = [1, now]
+        else:
+            entry[0] += 1
+            entry[1] = now
+
+    def allow(self, src_ip: str, kind: str, now: float) -> Tuple[bool, int]:
+        """Returns (allowed, suppressed_since_last_allowed)."""
+        key = (src_ip, kind)
+        last = self._last_seen.get(key)
+        if last is not None and now - last < self.window:
+            self._suppress(key, now)
+            return False, 0
+
+        budget = self._ip_budget.get(src_ip)
+        if budget is None or now - budget[0] >= self.window:
+            budget = self._ip_budget[src_ip] = [now, 0]
+        if budget[1] >= self.max_per_ip:
+            self._suppress(key, now)
+            return False, 0
+        budget[1] += 1
+
+        self._last_seen[key] = now
+        entry = self._suppressed.pop(key, None)
+        return True, entry[0] if entry else 0
+
+    def stale(self, now: float) -> List[Tuple[str, object]]:
+        """
+        (table, key) for every entry quiet for a full window. Only reads copies of the
+        dicts (list() of a dict view is one C call, allow() can't change it halfway), so
+        it doesn't need the lock allow() runs under; drop() re-checks each entry.
+        """
+        w = self.window
+        return ([("seen", k) for k, t in list(self._last_seen.items()) if now - t >= w] +
+                [("suppressed", k) for k, (_, t) in list(self._suppressed.items()) if now - t >= w] +
+                [("budget", ip) for ip, (start, _) in list(self._ip_budget.items()) if now - start >= w])
+
+    def drop(self, stale: List[Tuple[str, object]], now: float):
+        """Forget the entries from stale() that are still quiet (allow() may have used them since)."""
+        w = self.window
+        for table, key in stale:
+            if table == "seen":
+                t = self._last_seen.get(key)
+                if t is not None and now - t >= w:
+                    del self._last_seen[key]
+            elif table == "suppressed":
+                entry = self._suppressed.get(key)
+                if entry is not None and now - entry[1] >= w:
+                    del self._suppressed[key] # nothing let through for a window: the count is stale too
+            else:
+                budget = self._ip_budget.get(key)
+                if budget is not None and now - budget[0] >= w:
+                    del self._ip_budget[key]
+
+    def prune(self, now: float):
+        """Forget keys that have been quiet for a full window (keeps memory bounded)."""
+        self.drop(self.stale(now), now)
+
+
+class AnomalyEventSink:
+    def __init__(self, path: str, compress: bool = False,
+                 batch_size: int = EVENT_BATCH_SIZE,
+                 flush_interval: float = EVENT_FLUSH_INTERVAL,
+                 max_bytes: int = EVENT_MAX_BYTES,
+                 max_age: Optional[float] = None,
+                 backup_count: int = EVENT_BACKUP_COUNT,
+                 queue_size: int = EVENT_QUEUE_SIZE,
+                 throttle: Optional[AlertThrottle] = None):
+        if compress and not path.endswith(".gz"):
+            path += ".gz"
+        self.path = path
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes # 0 disables size rotation
+        self.max_age = max_age # seconds, None disables time rotation
+        self.backup_count = backup_count
+        self.throttle = throttle if throttle is not None else AlertThrottle()
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._throttle_lock = threading.Lock() # emit() may be called from several capture threads
+        self._writer: Optional[threading.Thread] = None
+        self._fh = None
+        self._opened_at = 0.0
+
+        # counters (read them any time, they are only ever incremented)
+        self.emitted = 0
+        self.suppressed = 0
+        self.dropped = 0
+        self.written = 0
+        self.write_failed = 0 # events lost to write errors (disk full, permissions...)
+        self.rotations = 0
+        self.last_error: Optional[BaseException] = None
+
+    # -------------------- capture side --------------------
+
+    def emit(self, kind: str, src_ip: str, timestamp: Optional[float] = None, **fields) -> bool:
+        """
+        Queue an anomaly record. Never blocks: if the writer has fallen behind
+        the event is counted in `dropped` and discarded.
+        Returns True if the event was queued.
+        """
+        now = time.time() if timestamp is None else timestamp
+        with self._throttle_lock:
+            allowed, suppressed = self.throttle.allow(src_ip, kind, now)
+        if not allowed:
+            self.suppressed += 1
+            return False
+
+        record = {"ts": now, "kind": kind, "src_ip": src_ip}
+        if suppressed:
+            record["suppressed"] = suppressed
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.emitted += 1
+        return True
+
+    # -------------------- lifecycle --------------------
+
+    def start(self):
+        if self._writer is not None:
+            return self
+        dirn = os.path.dirname(self.path) or "."
+        os.makedirs(dirn, exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="anomaly-sink", daemon=True)
+        self._writer.start()
+        return self
+
+    def close(self, timeout: float = 5.0):
+        """Flush everything still queued and stop the writer (waits at most ~2 x timeout)."""
+        if self._writer is None:
+            return
+        if self._writer.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout) # the writer frees a slot unless it's stuck
+            except queue.Full:
+                logger.warning("Event writer didn't drain the queue, closing without a final flush")
+            self._writer.join(timeout=timeout)
+        self._writer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------------------- writer side --------------------
+
+    def _write_loop(self):
+        try:
+            while True:
+                batch, stop = self._next_batch()
+                if batch:
+                    try:
+                        self._write_batch(batch)
+                    except OSError as e: # keep draining the queue; the next batch reopens the file
+                        self.write_failed += len(batch)
+                        self.last_error = e
+                        logger.error(f"Writing {len(batch)} anomaly events to {self.path} failed: {e!r}")
+                        self._close_file()
+                self._prune_throttle(time.time())
+                if stop:
+                    break
+        finally:
+            self._close_file()
+
+    def _close_file(self):
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError: # e.g. flushing a gzip trailer to a full disk
+                pass
+            self._fh = None
+
+    def _prune_throttle(self, now: float):
+        # the O(keys) scan runs without the lock; emit() only waits for one slice of deletes
+        stale = self.throttle.stale(now)
+        for i in range(0, len(stale), PRUNE_SLICE):
+            with self._throttle_lock:
+                self.throttle.drop(stale[i:i + PRUNE_SLICE], now)
+
+    def _next_batch(self):
+        """Wait up to flush_interval for the first event, then drain without blocking."""
+        batch = []
+        try:
+            item = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return batch, False
+        if item is _STOP:
+            return batch, True
+        batch.append(item)
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _write_batch(self, batch):
+        data = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in batch).encode("utf-8")
+        if self._should_rotate(len(data)):
+            self._rotate()
+        if self._fh is None:
+            self._open()
+        self._fh.write(data)
+        self._fh.flush()
+        self.written += len(batch)
+
+    def _open(self):
+        # appending a new gzip member to an existing .gz is still a valid gzip stream
+        self._fh = gzip.open(self.path, "ab") if self.compress else open(self.path, "ab")
+        self._opened_at = time.time()
+
+    def _current_size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._fh is None and not os.path.exists(self.path):
+            return False
+        if self.max_age is not None and self._fh is not None and time.time() - self._opened_at >= self.max_age:
+            return True
+        if self.max_bytes:
+            # for gzip this is the compressed size on disk, which is what we care about
+            size = self._current_size()
+            return size > 0 and size + incoming > self.max_bytes
+        return False
+
+    def _rotate(self):
+        """Same naming scheme as RotatingFileHandler: path -> path.1 -> path.2 ..."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src, dst = f"{self.path}.{i}", f"{self.path}.{i + 1}"
+                if os.path.exists(src):
+                    os.replace(src, dst)
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
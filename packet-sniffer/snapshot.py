@@ -0,0 +1,272 @@
+"""
+Compact binary snapshots of AnomalyDetector state.
+
+A redeploy used to reset every source's rate window. Snapshots let the sniffer
+restore where it left off, and snapshots from several sniffers can be merged
+into one global view.
+
+Layout (little-endian, columnar so each section is one array copy):
+
+    header   magic "ADSN", version u16, rate_window f64, created_at f64,
+             n_ips u32, n_hosts u32
+    strings  n_ips source IPs, then n_hosts distinct hostnames,
+             each as u16 length + utf-8 bytes
+    totals   u64[n_ips]            total_requests per ip
+    n_times  u32[n_ips]            length of each ip's rate window
+    times    f64[sum(n_times)]     request timestamps, ip after ip
+    n_hosts  u32[n_ips]            distinct hosts per ip
+    host_ids u32[sum(n_hosts)]     indexes into the hostname table
+"""
+from __future__ import annotations
+import argparse
+import heapq
+import logging
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Iterable, List, Optional
+
+from sniffer import AnomalyDetector
+
+MAGIC = b"ADSN"
+VERSION = 1
+SNAPSHOT_INTERVAL_SECONDS = 30
+
+_HEADER = struct.Struct("<4sHddII")
+_STRLEN = struct.Struct("<H")
+
+logger = logging.getLogger("http_sniffer")
+
+
+def _le(arr: array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _read_array(typecode: str, buf: memoryview, offset: int, count: int):
+    arr = array(typecode)
+    end = offset + count * arr.itemsize
+    if end > len(buf):
+        raise ValueError("snapshot truncated")
+    arr.frombytes(buf[offset:end])
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr, end
+
+
+def dump_state(detector: AnomalyDetector) -> bytes:
+    """Serialize detector state to bytes."""
+    # list()/tuple() copies of dicts, deques and sets run entirely in C, so they
+    # are atomic under the GIL and safe while the capture thread keeps adding.
+    times_by_ip = dict(list(detector.request_times.items()))
+    hosts_by_ip = dict(list(detector.hosts_seen.items()))
+    totals_by_ip = dict(list(detector.total_requests.items()))
+    ips = sorted(set(times_by_ip) | set(hosts_by_ip) | set(totals_by_ip))
+
+    host_ids = {}
+    totals, n_times, times, n_hosts, host_refs = (
+        array("Q"), array("I"), array("d"), array("I"), array("I"))
+    for ip in ips:
+        totals.append(totals_by_ip.get(ip, 0))
+        ts = tuple(times_by_ip.get(ip, ()))
+        n_times.append(len(ts))
+        times.extend(ts)
+        hs = tuple(hosts_by_ip.get(ip, ()))
+        n_hosts.append(len(hs))
+        for h in hs:
+            host_refs.append(host_ids.setdefault(h, len(host_ids)))
+
+    parts = [_HEADER.pack(MAGIC, VERSION, float(detector.rate_window), time.time(), len(ips), len(host_ids))]
+    for s in ips + list(host_ids):
+        raw = str(s).encode("utf-8")
+        parts.append(_STRLEN.pack(len(raw)))
+        parts.append(raw)
+    for arr in (totals, n_times, times, n_hosts, host_refs):
+        parts.append(_le(arr))
+    return b"".join(parts)
+
+
+def load_state(data: bytes, detector: Optional[AnomalyDetector] = None,
+               now: Optional[float] = None) -> AnomalyDetector:
+    """
+    Rebuild detector state from dump_state() bytes.
+    If `now` is given, timestamps that already fell out of the rate window are dropped.
+    """
+    buf = memoryview(data)
+    if len(buf) < _HEADER.size:
+        raise ValueError("snapshot truncated")
+    magic, version, rate_window, _created, n_ips, n_host_names = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a detector snapshot")
+    if version != VERSION:
+        raise ValueError(f"unsupported snapshot version: {version}")
+
+    offset = _HEADER.size
+    strings = []
+    for _ in range(n_ips + n_host_names):
+        if offset + _STRLEN.size > len(buf):
+            raise ValueError("snapshot truncated")
+        (n,) = _STRLEN.unpack_from(buf, offset)
+        offset += _STRLEN.size
+        if offset + n > len(buf):
+            raise ValueError("snapshot truncated")
+        strings.append(bytes(buf[offset:offset + n]).decode("utf-8")) # bad utf-8: UnicodeDecodeError, a ValueError
+        offset += n
+    ips, host_names = strings[:n_ips], strings[n_ips:]
+
+    totals, offset = _read_array("Q", buf, offset, n_ips)
+    n_times, offset = _read_array("I", buf, offset, n_ips)
+    times, offset = _read_array("d", buf, offset, sum(n_times))
+    n_hosts, offset = _read_array("I", buf, offset, n_ips)
+    host_refs, offset = _read_array("I", buf, offset, sum(n_hosts))
+
+    if detector is None:
+        detector = AnomalyDetector(rate_window=rate_window)
+    cutoff = None if now is None else now - detector.rate_window
+
+    t_pos = h_pos = 0
+    for i, ip in enumerate(ips):
+        ts = times[t_pos:t_pos + n_times[i]]
+        t_pos += n_times[i]
+        if cutoff is not None:
+            ts = [t for t in ts if t >= cutoff]
+        if ts:
+            detector.request_times[ip] = deque(ts)
+        detector.total_requests[ip] = totals[i]
+        refs = host_refs[h_pos:h_pos + n_hosts[i]]
+        h_pos += n_hosts[i]
+        if refs:
+            detector.hosts_seen[ip] = {host_names[r] for r in refs}
+    return detector
+
+
+def save_snapshot(detector: AnomalyDetector, path: str) -> int:
+    """
+    Write a snapshot atomically (temp file in the same dir, then os.replace).
+    Returns the number of bytes written.
+    """
+    data = dump_state(detector)
+    dirn = os.path.dirname(path) or "."
+    os.makedirs(dirn, exist_ok=True)
+    fd, tmpname = tempfile.mkstemp(prefix="snapshot_", dir=dirn)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpname, path)
+    except Exception:
+        try:
+            os.remove(tmpname)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+
+def restore_snapshot(path: str, detector: Optional[AnomalyDetector] = None,
+                     now: Optional[float] = None) -> AnomalyDetector:
+    """
+    Startup path: load `path` if it exists, otherwise return an empty detector.
+    Timestamps older than the rate window (relative to `now`, default: current time) are dropped.
+    """
+    if not os.path.exists(path):
+        return detector if detector is not None else AnomalyDetector()
+    with open(path, "rb") as f:
+        data = f.read()
+    return load_state(data, detector, now=time.time() if now is None else now)
+
+
+def merge_states(blobs: Iterable[bytes], detector: Optional[AnomalyDetector] = None) -> AnomalyDetector:
+    """
+    Merge snapshots from several sniffer instances into one detector:
+    totals are summed, timestamps merged in order, host sets unioned.
+    """
+    merged = detector if detector is not None else AnomalyDetector()
+    for blob in blobs:
+        part = load_state(blob, AnomalyDetector(rate_window=merged.rate_window))
+        for ip, total in part.total_requests.items():
+            merged.total_requests[ip] += total
+        for ip, ts in part.request_times.items():
+            merged.request_times[ip] = deque(heapq.merge(merged.request_times[ip], ts))
+        for ip, hosts in part.hosts_seen.items():
+            merged.hosts_seen[ip] |= hosts
+    # keep every merged window consistent with the newest timestamp we know about
+    for ip in list(merged.request_times):
+        dq = merged.request_times[ip]
+        if dq:
+            merged._prune_old(ip, now=dq[-1])
+    return merged
+
+
+def merge_snapshots(paths: List[str], detector: Optional[AnomalyDetector] = None) -> AnomalyDetector:
+    blobs = []
+    for p in paths:
+        with open(p, "rb") as f:
+            blobs.append(f.read())
+    return merge_states(blobs, detector)
+
+
+class PeriodicSnapshotter:
+    """
+    Background thread that saves a snapshot every `interval` seconds (and once more on stop).
+    A failed save (disk full, permissions...) is logged and counted in snapshots_failed;
+    the thread keeps going and tries again next interval.
+    """
+
+    def __init__(self, detector: AnomalyDetector, path: str, interval: float = SNAPSHOT_INTERVAL_SECONDS):
+        self.detector = detector
+        self.path = path
+        self.interval = interval
+        self.snapshots_written = 0
+        self.snapshots_failed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="detector-snapshot", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._save()
+            except Exception:
+                self.snapshots_failed += 1
+                logger.exception(f"Saving snapshot to {self.path} failed")
+
+    def _save(self):
+        save_snapshot(self.detector, self.path)
+        self.snapshots_written += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+        self._save()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge detector snapshots from several sniffers")
+    parser.add_argument("output", help="merged snapshot to write")
+    parser.add_argument("inputs", nargs="+", help="snapshots to merge")
+    args = parser.parse_args()
+
+    merged = merge_snapshots(args.inputs)
+    size = save_snapshot(merged, args.output)
+    print(f"Merged {len(args.inputs)} snapshots, {len(merged.total_requests)} sources, {size} bytes")
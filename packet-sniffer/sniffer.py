@@ -6,6 +6,7 @@ from collections import defaultdict, deque
 import time
 import re
 import sys
+from event_sink import AnomalyEventSink
 
 # -------------------- Configuration / thresholds --------------------
 RATE_WINDOW_SECONDS = 10 # sliding window for rate detection
@@ -14,6 +15,7 @@ DISTINCT_HOSTS_THRESHOLD = 10 # many distinct hosts requested by same src
 MAX_HOST_LENGTH = 255
 ANOMALY_LOG_MAX_BYTES = 5 * 1024 * 1024
 ANOMALY_BACKUP_COUNT = 3
+SNAPSHOT_PATH = "state/detector.snap" # restored on startup, rewritten periodically
 
 
 HTTP_METHODS = (b'GET', b'POST', b'HEAD', b'PUT', b'DELETE', b'OPTIONS', b'PATCH')
@@ -59,12 +61,12 @@ class AnomalyDetector:
     def add_request(self, src_ip, host, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
-            dq = self.request_times[src_ip]
-            dq.append(timestamp)
-            self.total_requests[src_ip] += 1
-            if host:
-                self.hosts_seen[src_ip].add(host)
-                self._prune_old(src_ip, now=timestamp)
+        dq = self.request_times[src_ip]
+        dq.append(timestamp)
+        self.total_requests[src_ip] += 1
+        if host:
+            self.hosts_seen[src_ip].add(host)
+        self._prune_old(src_ip, now=timestamp)
 
     def _prune_old(self, src_ip, now=None):
         now = now or time.time()
@@ -88,6 +90,14 @@ class AnomalyDetector:
             'distinct_hosts': len(self.hosts_seen[src_ip]),
         }
     
+
+def report_anomalies(detector, src_ip, sink, timestamp=None):
+    """Push any anomalies for src_ip onto the event sink. Never blocks on disk I/O."""
+    if detector.check_rate_anomaly(src_ip):
+        sink.emit("rate", src_ip, timestamp, **detector.summary_for(src_ip))
+    if detector.check_many_hosts(src_ip):
+        sink.emit("many_hosts", src_ip, timestamp, **detector.summary_for(src_ip))
+
 # -------------------- HTTP Host parsing --------------------
 
 
@@ -136,8 +146,12 @@ def parse_http_host(raw_bytes):
       return (None, None, None)
     
 if __name__ == "__main__":
+    from snapshot import PeriodicSnapshotter, restore_snapshot
+
     logger = setup_logging()
-    detector = AnomalyDetector()
+    # pick up where the last run left off so a redeploy doesn't reset rate windows
+    detector = restore_snapshot(SNAPSHOT_PATH)
+    snapshotter = PeriodicSnapshotter(detector, SNAPSHOT_PATH).start()
 
     src_ip = "192.168.1.100"
 
@@ -146,6 +160,8 @@ if __name__ == "__main__":
         detector.add_request(src_ip, host=f"example{i%3}.com")
         time.sleep(0.05)  # small delay so timestamps are slightly different
 
+    snapshotter.stop() # writes a final snapshot
+
     # print summary
     summary = detector.summary_for(src_ip)
     logger.info(f"Summary for {src_ip}: {summary}")
@@ -157,3 +173,8 @@ if __name__ == "__main__":
     if detector.check_many_hosts(src_ip):
         logger.warning(f"Host anomaly detected for {src_ip}")
 
+    # structured events go through the background writer, not the logger
+    with AnomalyEventSink("logs/anomalies.jsonl") as sink:
+        report_anomalies(detector, src_ip, sink)
+    logger.info(f"Anomaly events written: {sink.written}, suppressed: {sink.suppressed}, lost to write errors: {sink.write_failed}")
+
@@ -0,0 +1,51 @@
+from scapy.all import rdpcap, IP, TCP, Raw
+
+import bench
+from bench import generate_pcap, replay, run_benchmark
+from sniffer import parse_http_host
+
+
+def test_generated_pcap_is_readable(tmp_path):
+    path = str(tmp_path / "synthetic.pcap")
+    counts = generate_pcap(path, packets=200, ips=20, http_ratio=1.0, fragment_ratio=0.0)
+    pkts = rdpcap(path)
+
+    assert counts["packets"] == len(pkts) == 200
+    first = pkts[0]
+    assert first[TCP].dport == 80
+    host, path_, method = parse_http_host(bytes(first[Raw].load))
+    assert method in ("GET", "POST", "HEAD")
+    assert host.endswith(".test")
+    assert len({p[IP].src for p in pkts}) <= 20
+
+
+def test_fragmented_requests_take_two_segments(tmp_path):
+    path = str(tmp_path / "synthetic.pcap")
+    counts = generate_pcap(path, packets=100, ips=5, http_ratio=1.0, fragment_ratio=1.0)
+    assert counts["fragmented"] == counts["packets"] // 2
+
+
+def test_replay_counts_http_requests(tmp_path):
+    path = str(tmp_path / "synthetic.pcap")
+    counts = generate_pcap(path, packets=500, ips=10, http_ratio=0.5, fragment_ratio=0.2, rate=100.0)
+    stats = replay(path)
+
+    assert stats["packets"] == 500
+    # only the first segment of a split request starts with the method
+    assert stats["http"] == counts["http_requests"]
+    assert stats["sources"] <= 10
+    assert stats["packets_per_sec"] > 0
+    assert set(stats["stage_cpu_seconds"]) == {"dissect", "parse", "detect"}
+
+
+def test_run_benchmark_reports_memory():
+    result = run_benchmark(packets=100, ips=5)
+    assert result["replay"]["packets"] == 100
+    assert result["peak_traced_bytes"] > 0
+    assert result["max_rss_kib"] > 0
+
+
+def test_run_benchmark_without_resource_module(monkeypatch):
+    monkeypatch.setattr(bench, "resource", None) # e.g. Windows
+    result = run_benchmark(packets=50, ips=5, memory=False)
+    assert result["replay"]["packets"] == 50 and "max_rss_kib" not in result
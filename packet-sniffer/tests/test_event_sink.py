@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+from event_sink import AlertThrottle, AnomalyEventSink
+
+
+def read_jsonl(path, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "rb") as f:
+        return [json.loads(line) for line in f.read().splitlines() if line]
+
+
+def test_events_written_as_jsonl(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    with AnomalyEventSink(path, flush_interval=0.05) as sink:
+        sink.emit("rate", "10.0.0.1", timestamp=100.0, recent_rate=25)
+        sink.emit("many_hosts", "10.0.0.2", timestamp=100.0)
+
+    records = read_jsonl(path)
+    assert [r["kind"] for r in records] == ["rate", "many_hosts"]
+    assert records[0]["src_ip"] == "10.0.0.1"
+    assert records[0]["recent_rate"] == 25
+    assert sink.written == 2
+
+
+def test_compressed_output(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    with AnomalyEventSink(path, compress=True, flush_interval=0.05) as sink:
+        for i in range(5):
+            sink.emit("rate", f"10.0.0.{i}", timestamp=100.0)
+
+    assert sink.path.endswith(".gz")
+    assert len(read_jsonl(sink.path, compress=True)) == 5
+
+
+def test_repeated_alerts_are_deduplicated():
+    throttle = AlertThrottle(window=10, max_per_ip=100)
+    assert throttle.allow("1.1.1.1", "rate", 0.0) == (True, 0)
+    assert throttle.allow("1.1.1.1", "rate", 1.0) == (False, 0)
+    assert throttle.allow("1.1.1.1", "rate", 2.0) == (False, 0)
+    # a different kind from the same ip is not a duplicate
+    assert throttle.allow("1.1.1.1", "many_hosts", 2.0) == (True, 0)
+    # once the window passes the alert goes through carrying the suppressed count
+    assert throttle.allow("1.1.1.1", "rate", 11.0) == (True, 2)
+
+
+def test_per_ip_cap():
+    throttle = AlertThrottle(window=10, max_per_ip=2)
+    assert throttle.allow("1.1.1.1", "a", 0.0)[0]
+    assert throttle.allow("1.1.1.1", "b", 0.0)[0]
+    assert not throttle.allow("1.1.1.1", "c", 0.0)[0]
+    assert throttle.allow("2.2.2.2", "c", 0.0)[0]
+
+
+def test_write_errors_are_counted_and_writer_keeps_going(tmp_path, monkeypatch):
+    path = str(tmp_path / "events.jsonl")
+    sink = AnomalyEventSink(path, flush_interval=0.05)
+    real_write, calls = sink._write_batch, []
+    def flaky_write(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OSError(28, "No space left on device")
+        real_write(batch)
+    monkeypatch.setattr(sink, "_write_batch", flaky_write)
+    with sink:
+        sink.emit("rate", "10.0.0.1", timestamp=100.0)
+        time.sleep(0.3) # first batch fails
+        sink.emit("rate", "10.0.0.2", timestamp=100.0)
+    assert sink.write_failed == 1 and isinstance(sink.last_error, OSError)
+    assert [r["src_ip"] for r in read_jsonl(path)] == ["10.0.0.2"]
+
+
+def test_close_does_not_hang_when_writer_is_stuck(tmp_path):
+    sink = AnomalyEventSink(str(tmp_path / "events.jsonl"), queue_size=2)
+    release = threading.Event()
+    sink._writer = threading.Thread(target=release.wait, daemon=True) # alive, never drains
+    sink._writer.start()
+    for i in range(5):
+        sink.emit("rate", f"10.0.0.{i}", timestamp=100.0)
+    assert sink.dropped == 3
+    t0 = time.monotonic()
+    sink.close(timeout=0.2)
+    assert time.monotonic() - t0 < 2.0
+    release.set()
+
+
+def test_prune_forgets_quiet_keys_including_suppressed_counts():
+    throttle = AlertThrottle(window=10, max_per_ip=1)
+    for i in range(100): # capped ip: only suppressed counts, no last_seen
+        throttle.allow("1.1.1.1", f"kind{i}", 0.0)
+    throttle.allow("2.2.2.2", "rate", 5.0)
+    throttle.allow("2.2.2.2", "rate", 6.0) # suppressed, still fresh at 12
+    throttle.prune(12.0)
+    assert set(throttle._suppressed) == {("2.2.2.2", "rate")}
+    assert set(throttle._last_seen) == {("2.2.2.2", "rate")}
+    assert throttle.allow("2.2.2.2", "rate", 15.0) == (True, 1)
+    throttle.prune(100.0)
+    assert not (throttle._last_seen or throttle._suppressed or throttle._ip_budget)
+
+
+def test_drop_rechecks_keys_used_since_the_scan():
+    throttle = AlertThrottle(window=10)
+    throttle.allow("1.1.1.1", "rate", 0.0)
+    stale = throttle.stale(20.0)
+    assert throttle.allow("1.1.1.1", "rate", 20.0) == (True, 0) # emit() got in between
+    throttle.drop(stale, 20.0)
+    assert throttle.allow("1.1.1.1", "rate", 21.0) == (False, 0) # still deduplicated
+
+
+def test_emit_never_blocks_when_queue_full(tmp_path):
+    # writer not started, so nothing drains the queue
+    sink = AnomalyEventSink(str(tmp_path / "events.jsonl"), queue_size=2,
+                            throttle=AlertThrottle(window=0, max_per_ip=1000))
+    results = [sink.emit("rate", f"10.0.0.{i}", timestamp=1.0) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert sink.dropped == 3
+
+
+def test_size_rotation(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    with AnomalyEventSink(path, max_bytes=200, backup_count=2, batch_size=1,
+                          flush_interval=0.05,
+                          throttle=AlertThrottle(window=0, max_per_ip=1000)) as sink:
+        for i in range(20):
+            sink.emit("rate", f"10.0.0.{i}", timestamp=1.0, padding="x" * 40)
+
+    assert sink.rotations > 0
+    assert os.path.exists(path + ".1")
+    assert not os.path.exists(path + ".3")
@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+import snapshot
+from sniffer import AnomalyDetector
+from snapshot import (dump_state, load_state, merge_states, restore_snapshot,
+                      save_snapshot, PeriodicSnapshotter)
+
+
+def make_detector():
+    d = AnomalyDetector(rate_window=10)
+    for i in range(5):
+        d.add_request("10.0.0.1", f"host{i % 2}.test", timestamp=100.0 + i)
+    d.add_request("10.0.0.2", "other.test", timestamp=104.0)
+    d.add_request("10.0.0.3", None, timestamp=104.0)
+    return d
+
+
+def test_roundtrip_preserves_state():
+    d = make_detector()
+    restored = load_state(dump_state(d))
+
+    assert restored.rate_window == 10
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        assert restored.summary_for(ip) == d.summary_for(ip)
+    assert list(restored.request_times["10.0.0.1"]) == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert restored.hosts_seen["10.0.0.1"] == {"host0.test", "host1.test"}
+
+
+def test_snapshot_is_compact():
+    d = AnomalyDetector()
+    for i in range(1000):
+        d.add_request("10.0.0.1", "same.test", timestamp=float(i) / 1000)
+    # 8 bytes per timestamp plus a small fixed overhead
+    assert len(dump_state(d)) < 1000 * 8 + 200
+
+
+def test_restore_drops_expired_timestamps(tmp_path):
+    path = str(tmp_path / "detector.snap")
+    save_snapshot(make_detector(), path)
+
+    restored = restore_snapshot(path, now=112.5)
+    assert list(restored.request_times["10.0.0.1"]) == [103.0, 104.0]
+    assert restored.total_requests["10.0.0.1"] == 5
+
+
+def test_restore_missing_file_gives_empty_detector(tmp_path):
+    restored = restore_snapshot(str(tmp_path / "missing.snap"))
+    assert restored.total_requests == {}
+
+
+def test_merge_from_several_instances():
+    a = AnomalyDetector(rate_window=10)
+    b = AnomalyDetector(rate_window=10)
+    for i in range(12):
+        a.add_request("10.0.0.1", "a.test", timestamp=100.0 + i * 0.5)
+        b.add_request("10.0.0.1", "b.test", timestamp=100.25 + i * 0.5)
+    b.add_request("10.0.0.9", "b.test", timestamp=105.0)
+
+    merged = merge_states([dump_state(a), dump_state(b)], AnomalyDetector(rate_window=10, rate_threshold=20))
+    ts = list(merged.request_times["10.0.0.1"])
+    assert ts == sorted(ts)
+    assert merged.total_requests["10.0.0.1"] == 24
+    assert merged.hosts_seen["10.0.0.1"] == {"a.test", "b.test"}
+    assert merged.total_requests["10.0.0.9"] == 1
+    # neither instance alone crossed the threshold, the global view does
+    assert not a.check_rate_anomaly("10.0.0.1")
+    assert merged.check_rate_anomaly("10.0.0.1")
+
+
+def test_periodic_snapshotter_writes_on_stop(tmp_path):
+    path = str(tmp_path / "detector.snap")
+    d = make_detector()
+    with PeriodicSnapshotter(d, path, interval=60):
+        pass
+    assert os.path.exists(path)
+    assert restore_snapshot(path, now=104.0).summary_for("10.0.0.1") == d.summary_for("10.0.0.1")
+
+
+def test_truncated_snapshot_raises_value_error():
+    data = dump_state(make_detector())
+    for cut in range(len(data)): # every prefix, including ones ending inside the strings section
+        with pytest.raises(ValueError):
+            load_state(data[:cut])
+
+
+def test_periodic_snapshotter_survives_failed_saves(tmp_path, monkeypatch):
+    path = str(tmp_path / "detector.snap")
+    real_save, calls = snapshot.save_snapshot, []
+    def flaky_save(detector, p):
+        calls.append(p)
+        if len(calls) <= 2:
+            raise OSError("No space left on device")
+        return real_save(detector, p)
+    monkeypatch.setattr(snapshot, "save_snapshot", flaky_save)
+    snap = PeriodicSnapshotter(make_detector(), path, interval=0.01).start()
+    deadline = time.time() + 5
+    while snap.snapshots_written == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    snap.stop()
+    assert snap.snapshots_failed == 2 and snap.snapshots_written >= 2
+    assert os.path.exists(path)
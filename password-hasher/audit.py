@@ -0,0 +1,155 @@
+"""
+Offline password audit for legacy hasher.py records ("sha256$<salt_hex>$<hash_hex>").
+
+The defensive version of demo.py's brute-force loop: check a breached-password
+wordlist against our own stored hashes, to find accounts that must reset.
+
+- the wordlist is streamed in batches (never loaded whole) and fed to a process
+  pool with a bounded number of batches in flight
+- records are grouped by salt; per salt the SHA-256 state after hashing the salt is
+  computed once and copied for every candidate, so each guess only hashes the word
+- a hit is a dict lookup of the digest in that salt's digest -> users table
+
+Records file: one "username:sha256$salt$hash" per line (a bare hash uses the line
+number as the name). Wordlist: one password per line, UTF-8.
+
+python3 audit.py users.txt rockyou.txt --workers 4 --batch 20000
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Tuple
+
+from hasher import ALG
+
+BATCH_SIZE = 10_000 # words per job
+
+# salt -> {digest: [usernames]}
+Records = Dict[bytes, Dict[bytes, List[str]]]
+
+
+def parse_records(lines) -> Records:
+    records: Records = {}
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        user, sep, stored = line.rpartition(":")
+        if not sep:
+            user = f"line{lineno}"
+        try:
+            alg, salt_hex, hash_hex = stored.split("$", 2)
+            if alg != ALG:
+                continue # bcrypt/argon2 records aren't worth auditing this way
+            salt, digest = bytes.fromhex(salt_hex), bytes.fromhex(hash_hex)
+        except ValueError:
+            raise ValueError(f"line {lineno}: not a sha256$salt$hash record")
+        records.setdefault(salt, {}).setdefault(digest, []).append(user)
+    return records
+
+
+def load_records(path: str) -> Records:
+    with open(path, encoding="utf-8") as f:
+        return parse_records(f)
+
+
+def stream_wordlist(path: str, batch_size: int = BATCH_SIZE) -> Iterator[List[bytes]]:
+    """Batches of candidate passwords as UTF-8 bytes (what hash_password_sha hashes)."""
+    batch: List[bytes] = []
+    with open(path, "rb") as f:
+        for line in f:
+            word = line.rstrip(b"\r\n")
+            if word:
+                batch.append(word)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+# ---- worker side: records are sent once per process, not once per batch ----
+_salt_states: List[Tuple["hashlib._Hash", Dict[bytes, List[str]]]] = []
+
+
+def _init_worker(records: Records):
+    global _salt_states
+    _salt_states = [(hashlib.sha256(salt), digests) for salt, digests in records.items()]
+
+
+def check_batch(words: List[bytes]) -> List[Tuple[str, str]]:
+    """(username, password) for every hit in this batch."""
+    hits = []
+    for prefix, digests in _salt_states:
+        copy = prefix.copy
+        for word in words:
+            h = copy()
+            h.update(word)
+            users = digests.get(h.digest())
+            if users:
+                pw = word.decode("utf-8", "replace")
+                hits.extend((u, pw) for u in users)
+    return hits
+
+
+def audit(records: Records, batches: Iterator[List[bytes]], workers: int | None = None,
+          max_in_flight: int | None = None) -> dict:
+    """
+    Runs check_batch over every batch. At most max_in_flight (default 2 x workers)
+    batches exist at once, so memory stays flat however long the wordlist is.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    matches: List[Tuple[str, str]] = []
+    words = 0
+    peak_in_flight = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(records,)) as pool:
+        pending = set()
+        for batch in batches:
+            words += len(batch)
+            pending.add(pool.submit(check_batch, batch))
+            peak_in_flight = max(peak_in_flight, len(pending))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    matches.extend(fut.result())
+        for fut in pending:
+            matches.extend(fut.result())
+    elapsed = time.perf_counter() - start
+    hashes = words * len(records)
+    return {
+        "records": sum(len(u) for d in records.values() for u in d.values()),
+        "salts": len(records),
+        "words": words,
+        "hashes": hashes,
+        "seconds": elapsed,
+        "hashes_per_sec": hashes / elapsed if elapsed else 0.0,
+        "peak_batches_in_flight": peak_in_flight,
+        "matches": sorted(matches),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit sha256$salt$hash records against a wordlist")
+    parser.add_argument("records", help="file with username:sha256$salt$hash lines")
+    parser.add_argument("wordlist", help="one candidate password per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="words per job")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = audit(load_records(args.records), stream_wordlist(args.wordlist, args.batch), args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for user, pw in report["matches"]:
+            print(f"WEAK  {user}: {pw}")
+        print(f"{report['records']} records / {report['salts']} salts, {report['words']} words, "
+              f"{report['hashes']} hashes in {report['seconds']:.2f}s "
+              f"({report['hashes_per_sec'] / 1e6:.2f} M hashes/s), {len(report['matches'])} weak")
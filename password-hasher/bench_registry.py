@@ -0,0 +1,93 @@
+"""
+Benchmark for registry.py.
+
+1) verify throughput per algorithm through registry.verify (prefix dispatch + parse cache)
+2) migration under load: a user table that starts 100% legacy SHA-256 gets a stream of
+   logins from `--threads` threads; every successful login of a legacy user stores the
+   Argon2 hash verify_and_migrate() returns. Reports logins/s and the legacy share after
+   each round, so you can see throughput drop to Argon2 speed as the table migrates.
+
+python3 bench_registry.py --users 200 --rounds 5 --threads 4
+python3 bench_registry.py --fast      (cheap Argon2/bcrypt parameters, quick smoke run)
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import hasher
+import registry
+import secure_hasher
+import secure_hasher2
+
+
+def verify_throughput(seconds: float = 1.0) -> dict:
+    pw = "correct horse battery staple"
+    stored = {
+        "sha256": hasher.hash_password_sha(pw),
+        "bcrypt": secure_hasher.hash_password(pw),
+        "argon2": secure_hasher2.hash_password(pw),
+    }
+    results = {}
+    for name, h in stored.items():
+        n = 0
+        deadline = time.perf_counter() + seconds
+        start = time.perf_counter()
+        while time.perf_counter() < deadline:
+            registry.verify(pw, h)
+            n += 1
+        results[name] = n / (time.perf_counter() - start)
+    return results
+
+
+def migration_under_load(users: int = 200, rounds: int = 5, threads: int = 4, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    passwords = {f"user{i}": f"pw-{i}" for i in range(users)}
+    table = {u: hasher.hash_password_sha(pw) for u, pw in passwords.items()}
+    lock = threading.Lock()
+
+    def login(user):
+        ok, new_hash = registry.verify_and_migrate(passwords[user], table[user])
+        if ok and new_hash:
+            with lock:
+                table[user] = new_hash
+        return ok
+
+    report = []
+    with ThreadPoolExecutor(threads) as pool:
+        for r in range(rounds):
+            batch = [rng.choice(list(passwords)) for _ in range(users)] # some users log in twice, some never
+            start = time.perf_counter()
+            ok = list(pool.map(login, batch))
+            elapsed = time.perf_counter() - start
+            legacy = sum(registry.identify(h) == "sha256" for h in table.values())
+            report.append({
+                "round": r + 1,
+                "logins_per_sec": len(batch) / elapsed,
+                "failed": ok.count(False),
+                "legacy_pct": 100.0 * legacy / users,
+            })
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registry verify throughput and SHA-256 -> Argon2 migration")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=1.0, help="per algorithm in the throughput test")
+    parser.add_argument("--fast", action="store_true", help="use cheap hash parameters")
+    args = parser.parse_args()
+
+    if args.fast:
+        secure_hasher.configure(4)
+        secure_hasher2.configure(time_cost=1, memory_cost=8 * 1024, parallelism=1)
+
+    print(f"{'algorithm':<10}{'verifies/s':>14}")
+    for name, rate in verify_throughput(args.seconds).items():
+        print(f"{name:<10}{rate:>14.1f}")
+    print()
+    print(f"{'round':<8}{'logins/s':>12}{'legacy %':>10}{'failed':>8}")
+    for row in migration_under_load(args.users, args.rounds, args.threads):
+        print(f"{row['round']:<8}{row['logins_per_sec']:>12.1f}{row['legacy_pct']:>10.1f}{row['failed']:>8}")
@@ -0,0 +1,183 @@
+"""
+Parallel, batched hashing service around secure_hasher (bcrypt) and secure_hasher2 (Argon2).
+
+The hash functions are slow on purpose and block the caller. HashingService runs
+them in a bounded executor so async code (web workers) keeps serving requests:
+
+- executor="process": a spawn-context ProcessPoolExecutor, one core per worker
+- executor="thread": a ThreadPoolExecutor; bcrypt and argon2-cffi release the GIL
+  while hashing, so threads scale across cores too and skip the pickling/IPC cost
+- max_concurrency caps the batches in flight; extra callers wait on a semaphore
+  instead of piling up in the pool queue, so hashing can't eat every core
+
+Bulk calls (hash_many / verify_many) are split into batches so a 10k-user import is
+a few hundred executor jobs, not 10k.
+
+    async with HashingService("argon2", max_workers=4) as svc:
+        hashes = await svc.hash_many(passwords)
+        ok = await svc.verify_many(zip(passwords, hashes))
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from argon2 import PasswordHasher
+
+import secure_hasher
+import secure_hasher2
+
+ALGORITHMS = ("bcrypt", "argon2")
+EXECUTORS = ("process", "thread")
+MAX_BATCH = 32 # passwords per executor job
+
+
+def _default_workers() -> int:
+    # leave a core for the event loop / the rest of the app
+    return max(1, (os.cpu_count() or 1) - 1)
+
+
+def _current_params(algorithm: str, cost: Optional[int]):
+    """What the parent is configured with; spawned workers don't see configure() calls."""
+    if algorithm == "bcrypt":
+        return cost if cost is not None else secure_hasher.DEFAULT_COST
+    ph = secure_hasher2.ph
+    return (ph.time_cost, ph.memory_cost, ph.parallelism)
+
+
+@lru_cache(maxsize=8)
+def _argon2_hasher(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHasher:
+    return PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+# module level so they can be pickled into worker processes
+def _hash_batch(algorithm: str, passwords: Sequence[str], params) -> List[str]:
+    if algorithm == "bcrypt":
+        return [secure_hasher.hash_password(p, params) for p in passwords]
+    # a hasher of our own: calling secure_hasher2.configure() here would reset the whole
+    # app's Argon2 settings (thread mode runs in the parent process)
+    ph = _argon2_hasher(*params)
+    return [ph.hash(p + secure_hasher2.PEPPER) for p in passwords] # peppered like secure_hasher2.hash_password
+
+
+def _verify_batch(algorithm: str, pairs: Sequence[Tuple[str, str]]) -> List[bool]:
+    if algorithm == "bcrypt":
+        return [secure_hasher.verify_password(p, h) for p, h in pairs]
+    return [secure_hasher2.verify_password(p, h) for p, h in pairs]
+
+
+def _batches(items: list, workers: int) -> List[list]:
+    """Enough batches to keep every worker busy, none bigger than MAX_BATCH."""
+    if not items:
+        return []
+    size = max(1, min(MAX_BATCH, -(-len(items) // (workers * 2))))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class HashingService:
+    def __init__(self, algorithm: str = "argon2", executor: str = "process",
+                 max_workers: Optional[int] = None, max_concurrency: Optional[int] = None,
+                 cost: Optional[int] = None):
+        """
+        algorithm: "bcrypt" (secure_hasher) or "argon2" (secure_hasher2)
+        max_concurrency: batches running at once (default: max_workers)
+        cost: bcrypt rounds, None = secure_hasher's configured/library default.
+        Argon2 uses secure_hasher2's current parameters (see secure_hasher2.configure).
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm: {algorithm!r}")
+        if executor not in EXECUTORS:
+            raise ValueError(f"unknown executor: {executor!r}")
+        self.algorithm = algorithm
+        self.max_workers = max_workers or _default_workers()
+        self.max_concurrency = max_concurrency or self.max_workers
+        self._cost = cost
+        self._executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.peak_in_flight = 0 # highest number of concurrent batches seen
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self._executor_kind == "process":
+                self._executor = ProcessPoolExecutor(self.max_workers, mp_context=mp.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="hasher")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        async with self._sem:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+            finally:
+                self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        params = _current_params(self.algorithm, self._cost)
+        return (await self._run(_hash_batch, self.algorithm, [password], params))[0]
+
+    async def verify(self, password: str, stored: str) -> bool:
+        return (await self._run(_verify_batch, self.algorithm, [(password, stored)]))[0]
+
+    async def hash_many(self, passwords: Iterable[str]) -> List[str]:
+        """Hashes in input order."""
+        batches = _batches(list(passwords), self.max_workers)
+        params = _current_params(self.algorithm, self._cost)
+        results = await asyncio.gather(*(self._run(_hash_batch, self.algorithm, b, params) for b in batches))
+        return [h for batch in results for h in batch]
+
+    async def verify_many(self, pairs: Iterable[Tuple[str, str]]) -> List[bool]:
+        """pairs of (password, stored hash); results in input order."""
+        batches = _batches(list(pairs), self.max_workers)
+        results = await asyncio.gather(*(self._run(_verify_batch, self.algorithm, b) for b in batches))
+        return [ok for batch in results for ok in batch]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        # shutdown(wait=True) blocks, keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Hash N passwords sequentially vs through HashingService")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="argon2")
+    parser.add_argument("--executor", choices=EXECUTORS, default="process")
+    parser.add_argument("--count", type=int, default=64)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    pws = [f"user-{i}-password" for i in range(args.count)]
+    start = time.perf_counter()
+    _hash_batch(args.algorithm, pws, _current_params(args.algorithm, None))
+    sequential = time.perf_counter() - start
+
+    async def main():
+        async with HashingService(args.algorithm, args.executor, args.workers) as svc:
+            await svc.hash(pws[0]) # start the pool outside the timing
+            start = time.perf_counter()
+            await svc.hash_many(pws)
+            return time.perf_counter() - start, svc.max_workers
+
+    parallel, workers = asyncio.run(main())
+    print(f"sequential {args.count / sequential:8.1f} hashes/s")
+    print(f"{args.executor:<10} {args.count / parallel:8.1f} hashes/s ({workers} workers, {sequential / parallel:.1f}x)")
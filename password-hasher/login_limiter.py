@@ -0,0 +1,251 @@
+"""
+Login rate limiting in front of the slow password hashers.
+
+A bcrypt/Argon2 verify costs ~100 ms of CPU, so an attacker who can send logins
+for free can burn all our cores. LoginLimiter decides *before* hashing:
+
+1. negative cache: the same (user, stored hash, attempted password) failed a
+   moment ago -> answer False again without hashing (the attempt is kept only
+   as a keyed HMAC, never in plain text)
+2. token buckets per IP and per username (burst + steady refill), plus an
+   optional global bucket that caps hashes/second for the whole process
+   (only attempts that hash spend it, so unknown-user floods can't drain it)
+3. sliding-window counter of failures per username: too many in `window`
+   seconds and the account is throttled until they age out
+
+Rejections raise LoginThrottled (with retry_after) so the caller can answer 429;
+a real verify only runs when every check passes, so hashing CPU during an
+attack is bounded by the bucket rates. All tables are bounded (LRU eviction).
+
+    limiter = LoginLimiter()
+    try:
+        ok = limiter.verify(username, ip, password, stored, secure_hasher2.verify_password)
+    except LoginThrottled as e:
+        return "slow down", 429, {"Retry-After": str(int(e.retry_after) + 1)}
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+MAX_KEYS = 100_000 # per table; oldest entries are evicted past this
+
+
+class LoginThrottled(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"login throttled ({reason}), retry in {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Per-key buckets: `capacity` attempts in a burst, refilled at `rate` per second.
+    A key whose bucket would be full again is the same as an absent key, so idle
+    keys cost nothing once evicted.
+    """
+    def __init__(self, capacity: float, rate: float, max_keys: int = MAX_KEYS):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict() # key -> (tokens, last)
+
+    def _tokens(self, key: str, now: float) -> float:
+        state = self._buckets.get(key)
+        if state is None:
+            return self.capacity
+        tokens, last = state
+        return min(self.capacity, tokens + (now - last) * self.rate)
+
+    def retry_after(self, key: str, now: float, cost: float = 1.0) -> float:
+        """0 if `cost` tokens are available now, else seconds until they are."""
+        missing = cost - self._tokens(key, now)
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def consume(self, key: str, now: float, cost: float = 1.0):
+        self._buckets[key] = (self._tokens(key, now) - cost, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding window (two fixed windows, the previous one weighted by
+    how much of it still overlaps): O(1) memory per key instead of a timestamp list.
+    """
+    def __init__(self, limit: int, window: float, max_keys: int = MAX_KEYS):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._counts: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict() # key -> (window no, current, previous)
+
+    def _state(self, key: str, now: float) -> Tuple[int, int, int]:
+        current_no = int(now // self.window)
+        no, cur, prev = self._counts.get(key, (current_no, 0, 0))
+        if no == current_no:
+            return no, cur, prev
+        if no == current_no - 1:
+            return current_no, 0, cur
+        return current_no, 0, 0 # idle for 2+ windows
+
+    def count(self, key: str, now: float) -> float:
+        no, cur, prev = self._state(key, now)
+        overlap = 1.0 - (now - no * self.window) / self.window
+        return cur + prev * overlap
+
+    def retry_after(self, key: str, now: float) -> float:
+        """Seconds until count() drops below limit again, assuming no new hits."""
+        if self.count(key, now) < self.limit:
+            return 0.0
+        no, cur, prev = self._state(key, now)
+        start = no * self.window
+        if cur < self.limit:
+            # enough of the previous window has to slide out
+            wait = start + self.window * (1 - (self.limit - cur) / prev) - now
+        else:
+            # the current window becomes "previous" and then has to slide out too
+            wait = start + self.window * (2 - self.limit / cur) - now
+        return max(wait, 0.0) + 1e-3 # just past the boundary, where count() < limit
+
+    def hit(self, key: str, now: float):
+        no, cur, prev = self._state(key, now)
+        self._counts[key] = (no, cur + 1, prev)
+        self._counts.move_to_end(key)
+        while len(self._counts) > self.max_keys:
+            self._counts.popitem(last=False)
+
+    def evict_idle(self, now: float) -> int:
+        """Drop keys with nothing left in either window; returns how many."""
+        stale = [k for k, (no, _c, _p) in self._counts.items() if no < int(now // self.window) - 1]
+        for k in stale:
+            del self._counts[k]
+        return len(stale)
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class NegativeCache:
+    """Recently failed (user, stored hash, attempt) triples, keyed by an HMAC with a per-process secret."""
+    def __init__(self, ttl: float = 60.0, max_entries: int = MAX_KEYS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._secret = os.urandom(32)
+        self._entries: "OrderedDict[bytes, float]" = OrderedDict() # digest -> expiry
+
+    def _key(self, username: str, stored: str, password: str) -> bytes:
+        msg = b"\0".join(s.encode("utf-8") for s in (username, stored, password))
+        return hmac.new(self._secret, msg, hashlib.sha256).digest()
+
+    def contains(self, username: str, stored: str, password: str, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        key = self._key(username, stored, password)
+        expiry = self._entries.get(key)
+        if expiry is None:
+            return False
+        if expiry <= now:
+            del self._entries[key]
+            return False
+        return True
+
+    def add(self, username: str, stored: str, password: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        key = self._key(username, stored, password)
+        self._entries[key] = now + self.ttl
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LoginLimiter:
+    """
+    Defaults: 5 attempts burst then 1 per 10 s per IP, 5 then 1 per 30 s per user,
+    10 failures per user per 15 min, no global cap (set global_rate to bound hashes/s).
+    """
+    def __init__(self, ip_burst: float = 5, ip_rate: float = 0.1,
+                 user_burst: float = 5, user_rate: float = 1 / 30,
+                 failure_limit: int = 10, failure_window: float = 900.0,
+                 global_burst: Optional[float] = None, global_rate: Optional[float] = None,
+                 negative_ttl: float = 60.0, max_keys: int = MAX_KEYS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.per_ip = TokenBucket(ip_burst, ip_rate, max_keys)
+        self.per_user = TokenBucket(user_burst, user_rate, max_keys)
+        self.failures = SlidingWindowCounter(failure_limit, failure_window, max_keys)
+        self.global_bucket = None
+        if global_rate is not None:
+            self.global_bucket = TokenBucket(global_burst or global_rate, global_rate, 1)
+        self.negative = NegativeCache(negative_ttl, max_keys)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.stats = {"allowed": 0, "throttled": 0, "negative_hits": 0, "hashes": 0}
+
+    def acquire(self, username: str, ip: str, hashing: bool = True):
+        """
+        Spend one attempt for (username, ip) or raise LoginThrottled. No hashing happens here.
+        hashing=False (unknown user) still needs the global budget, so known and unknown
+        users are throttled alike, but doesn't spend it.
+        """
+        with self._lock:
+            now = self._clock()
+            checks = [("ip", self.per_ip.retry_after(ip, now)),
+                      ("user", self.per_user.retry_after(username, now)),
+                      ("failures", self.failures.retry_after(username, now))]
+            if self.global_bucket is not None:
+                checks.append(("global", self.global_bucket.retry_after("*", now)))
+            reason, wait = max(checks, key=lambda c: c[1])
+            if wait > 0:
+                self.stats["throttled"] += 1
+                raise LoginThrottled(reason, wait)
+            # all or nothing: a rejected attempt doesn't drain the other buckets
+            self.per_ip.consume(ip, now)
+            self.per_user.consume(username, now)
+            if self.global_bucket is not None and hashing:
+                self.global_bucket.consume("*", now)
+            self.stats["allowed"] += 1
+
+    def record_failure(self, username: str):
+        with self._lock:
+            self.failures.hit(username, self._clock())
+
+    def verify(self, username: str, ip: str, password: str, stored: Optional[str],
+               verify_fn: Callable[[str, str], bool]) -> bool:
+        """
+        Limited stand-in for verify_fn(password, stored). stored=None (unknown user) is
+        charged like a real attempt so usernames can't be probed for free; it never hashes,
+        so it doesn't spend the global hash budget.
+        """
+        with self._lock:
+            cached = stored is not None and self.negative.contains(username, stored, password, self._clock())
+            if cached:
+                self.stats["negative_hits"] += 1
+        if cached:
+            return False
+        self.acquire(username, ip, hashing=stored is not None)
+        ok = False
+        if stored is not None:
+            with self._lock:
+                self.stats["hashes"] += 1
+            ok = verify_fn(password, stored)
+        if not ok:
+            self.record_failure(username)
+            if stored is not None:
+                with self._lock:
+                    self.negative.add(username, stored, password, self._clock())
+        return ok
+
+    def evict_idle(self) -> int:
+        """Housekeeping for long-running processes; token buckets and caches evict by LRU on their own."""
+        with self._lock:
+            return self.failures.evict_idle(self._clock())
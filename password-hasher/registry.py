@@ -0,0 +1,154 @@
+"""
+One verifier for every stored hash format in this project:
+
+    sha256$<salt_hex>$<hash_hex>    hasher.py (legacy, fast, must go)
+    $2a$ / $2b$ / $2y$<cost>$...    secure_hasher.py (bcrypt)
+    $argon2id$v=19$m=..,t=..,p=..$  secure_hasher2.py (Argon2 + pepper)
+
+The scheme is read from the prefix with one dict lookup, never by trying each
+verifier in turn. Parsed parameters (salt bytes, costs) are cached per stored
+string so hot accounts don't re-parse on every login.
+
+verify_and_migrate() upgrades on a successful login: legacy SHA-256 and
+out-of-date bcrypt/Argon2 hashes come back re-hashed with the default scheme.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import hmac
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from argon2 import extract_parameters
+
+import hasher
+import secure_hasher
+import secure_hasher2
+
+DEFAULT_SCHEME = "argon2"
+PARSE_CACHE_SIZE = 4096
+
+
+class Scheme(NamedTuple):
+    name: str
+    hash: Callable[[str], str]
+    verify: Callable[[str, "ParsedHash"], bool]
+    needs_rehash: Callable[["ParsedHash"], bool]
+    parse: Callable[[str], object]
+
+
+class ParsedHash(NamedTuple):
+    scheme: str
+    stored: str
+    params: object # whatever the scheme's parse() returns
+
+
+# ---- per-scheme helpers ----
+def _sha256_parse(stored: str) -> Tuple[bytes, bytes]:
+    _alg, salt_hex, hash_hex = stored.split("$", 2)
+    return bytes.fromhex(salt_hex), bytes.fromhex(hash_hex)
+
+def _sha256_verify(password: str, parsed: ParsedHash) -> bool:
+    # same check as hasher.verify_password_sha256, minus re-parsing the hex
+    salt, expected = parsed.params
+    actual = hashlib.sha256(salt + password.encode("utf-8")).digest()
+    return hmac.compare_digest(actual, expected)
+
+def _bcrypt_verify(password: str, parsed: ParsedHash) -> bool:
+    return secure_hasher.verify_password(password, parsed.stored)
+
+def _bcrypt_needs_rehash(parsed: ParsedHash) -> bool:
+    return secure_hasher.needs_rehash(parsed.stored)
+
+def _argon2_verify(password: str, parsed: ParsedHash) -> bool:
+    return secure_hasher2.verify_password(password, parsed.stored)
+
+def _argon2_needs_rehash(parsed: ParsedHash) -> bool:
+    ph = secure_hasher2.ph
+    p = parsed.params
+    return (p.type, p.time_cost, p.memory_cost, p.parallelism, p.hash_len, p.salt_len) != \
+        (ph.type, ph.time_cost, ph.memory_cost, ph.parallelism, ph.hash_len, ph.salt_len)
+
+
+_BCRYPT = Scheme("bcrypt", secure_hasher.hash_password, _bcrypt_verify, _bcrypt_needs_rehash, secure_hasher.get_cost)
+_ARGON2 = Scheme("argon2", secure_hasher2.hash_password, _argon2_verify, _argon2_needs_rehash, extract_parameters)
+
+# prefix (up to and including the second "$", or the first one for "sha256$") -> scheme
+_PREFIXES: Dict[str, Scheme] = {
+    "sha256$": Scheme("sha256", hasher.hash_password_sha, _sha256_verify, lambda parsed: True, _sha256_parse),
+    "$2a$": _BCRYPT,
+    "$2b$": _BCRYPT,
+    "$2y$": _BCRYPT,
+    "$argon2id$": _ARGON2,
+    "$argon2i$": _ARGON2,
+    "$argon2d$": _ARGON2,
+}
+_SCHEMES: Dict[str, Scheme] = {s.name: s for s in _PREFIXES.values()}
+
+
+def register(prefix: str, scheme: Scheme):
+    """Add a format, e.g. register("$scrypt$", Scheme(...))."""
+    _PREFIXES[prefix] = scheme
+    _SCHEMES[scheme.name] = scheme
+    parse.cache_clear()
+
+
+def _prefix(stored: str) -> str:
+    start = 1 if stored.startswith("$") else 0
+    end = stored.find("$", start)
+    if end < 0:
+        raise ValueError("stored hash has no scheme prefix")
+    return stored[:end + 1]
+
+
+def identify(stored: str) -> str:
+    """Scheme name for a stored hash; ValueError for unknown formats."""
+    if not isinstance(stored, str):
+        raise TypeError("stored must be str")
+    scheme = _PREFIXES.get(_prefix(stored))
+    if scheme is None:
+        raise ValueError(f"unknown hash format: {stored[:12]!r}")
+    return scheme.name
+
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse(stored: str) -> ParsedHash:
+    """Scheme + parsed parameters, cached (stored strings are immutable and salted, so safe keys)."""
+    name = identify(stored)
+    try:
+        params = _SCHEMES[name].parse(stored)
+    except Exception as e:
+        raise ValueError(f"malformed {name} hash") from e
+    return ParsedHash(name, stored, params)
+
+
+def hash_password(password: str, scheme: str = DEFAULT_SCHEME) -> str:
+    if scheme not in _SCHEMES:
+        raise ValueError(f"unknown scheme: {scheme!r}")
+    return _SCHEMES[scheme].hash(password)
+
+
+def verify(password: str, stored: str) -> bool:
+    """Verify against any supported format. Unknown or malformed hashes raise ValueError."""
+    parsed = parse(stored)
+    return _SCHEMES[parsed.scheme].verify(password, parsed)
+
+
+def needs_update(stored: str, scheme: str = DEFAULT_SCHEME) -> bool:
+    """True for other schemes than `scheme` (legacy SHA-256 always) or outdated parameters."""
+    parsed = parse(stored)
+    if parsed.scheme != scheme:
+        return True
+    return _SCHEMES[scheme].needs_rehash(parsed)
+
+
+def verify_and_migrate(password: str, stored: str, scheme: str = DEFAULT_SCHEME) -> Tuple[bool, Optional[str]]:
+    """
+    Login helper: (ok, new_hash). new_hash is set when the password matched and the stored
+    hash should be replaced (legacy SHA-256 -> Argon2, or old cost parameters).
+    """
+    if not verify(password, stored):
+        return False, None
+    if needs_update(stored, scheme):
+        return True, hash_password(password, scheme)
+    return True, None
@@ -9,14 +9,27 @@ Production-ready password hashing using bcrypt.
 from __future__ import annotations
 import bcrypt
 
+LIBRARY_COST = 12 # bcrypt.gensalt() default
+DEFAULT_COST: int | None = None # set by configure() / calibrate.apply_profile()
+
+def configure(cost: int | None):
+    """Set the cost used when hash_password() gets none (None = library default)."""
+    global DEFAULT_COST
+    if cost is not None and not 4 <= cost <= 31:
+        raise ValueError("bcrypt cost must be between 4 and 31")
+    DEFAULT_COST = cost
+
 def hash_password(password: str, cost: int | None = None) -> str:
     """
     Returns a bcrypt hash string (e.g., "$2b$12$..."), UTF-8 decoded.
-    `cost` (aka rounds) defaults to library default (~12). Higher = slower & safer.
+    `cost` (aka rounds) defaults to the configured cost, else the library default (~12).
+    Higher = slower & safer.
     """
     if not isinstance(password, str):
         raise TypeError("password must be str")
 
+    if cost is None:
+        cost = DEFAULT_COST
     if cost is None:
         salt = bcrypt.gensalt()                # default cost
     else:
@@ -32,3 +45,29 @@ def verify_password(password: str, stored: str) -> bool:
     if not isinstance(stored, str):
         raise TypeError("stored must be str")
     return bcrypt.checkpw(password.encode("utf-8"), stored.encode("utf-8"))
+
+def get_cost(stored: str) -> int:
+    """Rounds embedded in a bcrypt hash ("$2b$12$..." -> 12)."""
+    try:
+        return int(stored.split("$")[2])
+    except (IndexError, ValueError):
+        raise ValueError("stored hash is not a bcrypt hash")
+
+def needs_rehash(stored: str, cost: int | None = None) -> bool:
+    """
+    True when the stored hash wasn't made with the current cost (or is an old $2a$/$2y$
+    variant), i.e. it should be replaced on the next successful login.
+    """
+    target = cost or DEFAULT_COST or LIBRARY_COST
+    return not stored.startswith("$2b$") or get_cost(stored) != target
+
+def verify_and_update(password: str, stored: str, cost: int | None = None) -> tuple[bool, str | None]:
+    """
+    verify_password() plus rehash-on-login: returns (ok, new_hash). new_hash is only set
+    when the password matched and the stored hash is out of date; save it in place of `stored`.
+    """
+    if not verify_password(password, stored):
+        return False, None
+    if needs_rehash(stored, cost):
+        return True, hash_password(password, cost)
+    return True, None
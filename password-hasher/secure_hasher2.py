@@ -1,8 +1,17 @@
 import os
+from typing import Optional, Tuple
 from argon2 import PasswordHasher
 
 ph = PasswordHasher()
 
+def configure(time_cost: int, memory_cost: int, parallelism: int):
+    """
+    Swap in a hasher with new parameters (memory_cost in KiB), e.g. from calibrate.py.
+    Existing hashes still verify; needs_rehash() flags them for an upgrade.
+    """
+    global ph
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
 PEPPER= os.getenv("APP_PEPER", "G2KNW")
 
 def hash_password(password:str) -> str:
@@ -23,3 +32,21 @@ def verify_password(password:str, stored_hash: str) -> bool:
           return ph.verify(stored_hash, password_with_pepper)
      except Exception:
           return False
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True when stored_hash was made with other parameters than the current hasher."""
+    try:
+        return ph.check_needs_rehash(stored_hash)
+    except Exception: # not an argon2 hash at all
+        return True
+
+def verify_and_update(password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Rehash-on-login: (ok, new_hash), new_hash is set only after a successful
+    verify of an outdated hash. Store it in place of stored_hash.
+    """
+    if not verify_password(password, stored_hash):
+        return False, None
+    if needs_rehash(stored_hash):
+        return True, hash_password(password)
+    return True, None
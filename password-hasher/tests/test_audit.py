@@ -0,0 +1,38 @@
+import pytest
+from audit import audit, load_records, parse_records, stream_wordlist
+from hasher import hash_password_sha
+
+@pytest.fixture
+def files(tmp_path):
+    users = {"alice": "letmein", "bob": "correct horse", "carol": "Zx9!unlikely", "dave": "pässwörd"}
+    records = tmp_path / "users.txt"
+    records.write_text("\n".join(f"{u}:{hash_password_sha(p)}" for u, p in users.items()) + "\n", encoding="utf-8")
+    words = [f"word{i}" for i in range(2500)] + ["letmein", "pässwörd", "correct horse"]
+    wordlist = tmp_path / "words.txt"
+    wordlist.write_bytes("\r\n".join(words).encode("utf-8"))
+    return records, wordlist
+
+def test_stream_wordlist_batches(files):
+    _records, wordlist = files
+    batches = list(stream_wordlist(str(wordlist), batch_size=1000))
+    assert [len(b) for b in batches] == [1000, 1000, 503]
+    assert batches[-1][-1] == b"correct horse" # line endings stripped
+
+def test_parse_records_groups_by_salt():
+    stored = hash_password_sha("pw")
+    records = parse_records([f"a:{stored}", f"b:{stored}", "", "# comment", "$2b$12$bcryptishere"])
+    assert len(records) == 1
+    (digests,) = records.values()
+    assert list(digests.values()) == [["a", "b"]]
+    with pytest.raises(ValueError):
+        parse_records(["x:sha256$zz$zz"])
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_audit_finds_weak_passwords(files, workers):
+    records, wordlist = files
+    report = audit(load_records(str(records)), stream_wordlist(str(wordlist), batch_size=500),
+                   workers=workers, max_in_flight=2)
+    assert report["matches"] == [("alice", "letmein"), ("bob", "correct horse"), ("dave", "pässwörd")]
+    assert report["words"] == 2503
+    assert report["hashes"] == 2503 * 4
+    assert report["peak_batches_in_flight"] <= 2
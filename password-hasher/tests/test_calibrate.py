@@ -0,0 +1,54 @@
+import pytest
+import calibrate
+import secure_hasher
+import secure_hasher2
+
+@pytest.fixture
+def restore_hashers():
+    cost, ph = secure_hasher.DEFAULT_COST, secure_hasher2.ph
+    yield
+    secure_hasher.DEFAULT_COST, secure_hasher2.ph = cost, ph
+
+def test_bcrypt_calibration_respects_bounds():
+    r = calibrate.calibrate_bcrypt(target_ms=1, min_cost=4, max_cost=6, repeat=1)
+    assert 4 <= r["cost"] <= 6
+    # a huge budget stops at max_cost
+    assert calibrate.calibrate_bcrypt(target_ms=10_000, min_cost=4, max_cost=5, repeat=1)["cost"] == 5
+
+def test_argon2_calibration_grows_memory_first():
+    r = calibrate.calibrate_argon2(target_ms=10_000, max_memory_kib=64, min_memory_kib=16,
+                                   min_time_cost=1, parallelism=1, repeat=1)
+    assert r["memory_cost"] == 64
+    assert r["time_cost"] == calibrate.MAX_ARGON2_TIME
+    tiny = calibrate.calibrate_argon2(target_ms=0.001, max_memory_kib=64, min_memory_kib=16,
+                                      min_time_cost=1, parallelism=1, repeat=1)
+    assert (tiny["memory_cost"], tiny["time_cost"]) == (16, 1) # floors are kept even over budget
+
+def test_bcrypt_rehash_on_login(restore_hashers):
+    old = secure_hasher.hash_password("pw", cost=4)
+    secure_hasher.configure(5)
+    assert secure_hasher.needs_rehash(old)
+    assert secure_hasher.verify_and_update("wrong", old) == (False, None)
+    ok, new = secure_hasher.verify_and_update("pw", old)
+    assert ok and new is not None
+    assert secure_hasher.get_cost(new) == 5
+    assert secure_hasher.verify_password("pw", new) # plain verify still returns a bool
+    assert secure_hasher.verify_and_update("pw", new) == (True, None)
+
+def test_argon2_rehash_on_login(restore_hashers):
+    old = secure_hasher2.hash_password("pw")
+    secure_hasher2.configure(time_cost=1, memory_cost=1024, parallelism=1)
+    assert secure_hasher2.verify_password("pw", old) # old hashes keep working
+    assert secure_hasher2.needs_rehash(old)
+    ok, new = secure_hasher2.verify_and_update("pw", old)
+    assert ok and not secure_hasher2.needs_rehash(new)
+    assert secure_hasher2.needs_rehash("not-a-hash")
+
+def test_profile_roundtrip_and_apply(tmp_path, restore_hashers):
+    profile = {"target_ms": 1, "bcrypt": {"cost": 6, "ms": 1.0},
+               "argon2": {"time_cost": 1, "memory_cost": 2048, "parallelism": 1, "ms": 1.0}}
+    path = tmp_path / "profile.json"
+    calibrate.save_profile(profile, str(path))
+    calibrate.apply_profile(calibrate.load_profile(str(path)))
+    assert secure_hasher.get_cost(secure_hasher.hash_password("x")) == 6
+    assert secure_hasher2.ph.memory_cost == 2048
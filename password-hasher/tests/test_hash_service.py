@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from hash_service import HashingService, _batches
+from secure_hasher import verify_password as bcrypt_verify
+from secure_hasher2 import verify_password as argon_verify
+
+def test_batches_cover_input_in_order():
+    items = list(range(100))
+    batches = _batches(items, workers=4)
+    assert [x for b in batches for x in b] == items
+    assert len(batches) >= 4
+    assert _batches([], 4) == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("executor", ["thread", "process"])
+async def test_bcrypt_hash_many_roundtrip(executor):
+    pws = [f"pw-{i}" for i in range(12)]
+    async with HashingService("bcrypt", executor, max_workers=2, cost=4) as svc:
+        hashes = await svc.hash_many(pws)
+        assert all(bcrypt_verify(p, h) for p, h in zip(pws, hashes))
+        assert await svc.verify_many(zip(pws, hashes)) == [True] * len(pws)
+        assert await svc.verify_many([("wrong", hashes[0])]) == [False]
+
+@pytest.mark.asyncio
+async def test_argon2_single_and_bulk():
+    async with HashingService("argon2", "thread", max_workers=2) as svc:
+        stored = await svc.hash("s3cret")
+        assert argon_verify("s3cret", stored)
+        assert await svc.verify("s3cret", stored)
+        assert await svc.verify_many([("s3cret", stored), ("nope", stored)]) == [True, False]
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_is_enforced():
+    async with HashingService("bcrypt", "thread", max_workers=4, max_concurrency=2, cost=4) as svc:
+        await asyncio.gather(*(svc.hash(f"pw-{i}") for i in range(20)))
+        assert svc.peak_in_flight <= 2
+        assert svc.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive():
+    ticks = 0
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    t = asyncio.create_task(ticker())
+    async with HashingService("bcrypt", "thread", max_workers=2, cost=8) as svc:
+        await svc.hash_many([f"pw-{i}" for i in range(16)])
+    t.cancel()
+    assert ticks > 0 # a blocking hash on the loop would starve the ticker
+
+def test_rejects_unknown_options():
+    with pytest.raises(ValueError):
+        HashingService("md5")
+    with pytest.raises(ValueError):
+        HashingService("bcrypt", executor="gpu")
+
+@pytest.mark.asyncio
+async def test_process_workers_use_configured_argon2_params():
+    from argon2 import extract_parameters
+    import secure_hasher2
+    ph = secure_hasher2.ph
+    secure_hasher2.configure(time_cost=1, memory_cost=2048, parallelism=1)
+    try:
+        async with HashingService("argon2", "process", max_workers=1) as svc:
+            stored = await svc.hash("pw")
+        assert extract_parameters(stored).memory_cost == 2048
+        assert not secure_hasher2.needs_rehash(stored)
+    finally:
+        secure_hasher2.ph = ph
+
+def test_hash_batch_leaves_app_argon2_config_alone():
+    import secure_hasher2
+    from hash_service import _current_params, _hash_batch
+    old_ph = secure_hasher2.ph
+    try:
+        secure_hasher2.configure(1, 8192, 1)
+        captured = _current_params("argon2", None)
+        secure_hasher2.configure(2, 16384, 1) # reconfigured while a batch is queued
+        [stored] = _hash_batch("argon2", ["pw"], captured)
+        assert "$m=8192,t=1,p=1$" in stored # hashed with the captured params
+        assert (secure_hasher2.ph.time_cost, secure_hasher2.ph.memory_cost) == (2, 16384) # not reset
+        assert secure_hasher2.verify_password("pw", stored) # pepper applied as usual
+    finally:
+        secure_hasher2.ph = old_ph
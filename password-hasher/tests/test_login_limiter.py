@@ -0,0 +1,124 @@
+import pytest
+import secure_hasher
+from login_limiter import LoginLimiter, LoginThrottled, NegativeCache, SlidingWindowCounter, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+class CountingVerify:
+    def __init__(self, real=secure_hasher.verify_password):
+        self.calls = 0
+        self.real = real
+    def __call__(self, password, stored):
+        self.calls += 1
+        return self.real(password, stored)
+
+@pytest.fixture(scope="module")
+def stored():
+    return secure_hasher.hash_password("right", cost=4)
+
+def test_token_bucket_burst_and_refill():
+    b = TokenBucket(capacity=3, rate=1.0)
+    for _ in range(3):
+        assert b.retry_after("k", 0.0) == 0
+        b.consume("k", 0.0)
+    assert b.retry_after("k", 0.0) == pytest.approx(1.0)
+    assert b.retry_after("k", 1.0) == 0
+
+def test_token_bucket_evicts_lru_keys():
+    b = TokenBucket(capacity=1, rate=1.0, max_keys=2)
+    for k in ("a", "b", "c"):
+        b.consume(k, 0.0)
+    assert len(b) == 2
+    assert b.retry_after("a", 0.0) == 0 # evicted -> full bucket again
+
+def test_sliding_window_counts_and_ages_out():
+    w = SlidingWindowCounter(limit=3, window=10.0)
+    for t in (0.0, 1.0, 2.0):
+        w.hit("u", t)
+    wait = w.retry_after("u", 5.0)
+    assert wait > 0
+    assert w.count("u", 5.0 + wait) < 3 # the estimate is honest
+    assert w.count("u", 25.0) == 0
+    assert w.evict_idle(25.0) == 1 and len(w) == 0
+
+def test_negative_cache_expires():
+    c = NegativeCache(ttl=5.0)
+    c.add("bob", "h", "guess", now=0.0)
+    assert c.contains("bob", "h", "guess", now=1.0)
+    assert not c.contains("bob", "h", "other", now=1.0)
+    assert not c.contains("bob", "h2", "guess", now=1.0) # new stored hash (password reset)
+    assert not c.contains("bob", "h", "guess", now=6.0)
+
+def test_repeated_wrong_password_is_not_rehashed(stored):
+    limiter = LoginLimiter(clock=FakeClock())
+    verify = CountingVerify()
+    assert not limiter.verify("bob", "1.2.3.4", "wrong", stored, verify)
+    assert not limiter.verify("bob", "1.2.3.4", "wrong", stored, verify)
+    assert verify.calls == 1
+    assert limiter.stats["negative_hits"] == 1
+    assert limiter.verify("bob", "1.2.3.4", "right", stored, verify)
+
+def test_ip_bucket_rejects_before_hashing(stored):
+    clock = FakeClock()
+    limiter = LoginLimiter(ip_burst=3, ip_rate=0.5, clock=clock)
+    verify = CountingVerify()
+    for i in range(3):
+        limiter.verify(f"user{i}", "6.6.6.6", f"guess{i}", stored, verify)
+    with pytest.raises(LoginThrottled) as e:
+        limiter.verify("user9", "6.6.6.6", "guess9", stored, verify)
+    assert e.value.reason == "ip"
+    assert e.value.retry_after == pytest.approx(2.0)
+    assert verify.calls == 3
+    assert limiter.verify("user9", "7.7.7.7", "right", stored, verify) # other IPs unaffected
+    clock.now += 2.0
+    limiter.verify("user9", "6.6.6.6", "guess9", stored, verify)
+
+def test_failure_window_locks_the_account(stored):
+    clock = FakeClock()
+    limiter = LoginLimiter(user_burst=100, ip_burst=100, failure_limit=3, failure_window=60, clock=clock)
+    for i in range(3):
+        assert not limiter.verify("alice", f"10.0.0.{i}", f"guess{i}", stored, CountingVerify())
+    with pytest.raises(LoginThrottled) as e:
+        limiter.verify("alice", "10.0.0.9", "right", stored, CountingVerify())
+    assert e.value.reason == "failures"
+    clock.now += e.value.retry_after
+    assert limiter.verify("alice", "10.0.0.9", "right", stored, CountingVerify())
+
+def test_unknown_user_is_charged_but_never_hashed():
+    limiter = LoginLimiter(user_burst=2, clock=FakeClock())
+    verify = CountingVerify()
+    assert not limiter.verify("ghost", "1.1.1.1", "x", None, verify)
+    assert not limiter.verify("ghost", "1.1.1.2", "y", None, verify)
+    with pytest.raises(LoginThrottled):
+        limiter.verify("ghost", "1.1.1.3", "z", None, verify)
+    assert verify.calls == 0
+
+def test_global_bucket_bounds_hashing_during_an_attack(stored):
+    clock = FakeClock()
+    limiter = LoginLimiter(global_burst=10, global_rate=5, clock=clock)
+    verify = CountingVerify(real=lambda p, s: False)
+    for second in range(10):
+        for i in range(100): # 100 distinct users/IPs per second
+            try:
+                limiter.verify(f"u{second}-{i}", f"ip{second}-{i}", "pw", stored, verify)
+            except LoginThrottled:
+                pass
+        clock.now += 1.0
+    assert verify.calls <= 10 + 5 * 10
+
+def test_unknown_users_dont_drain_the_global_budget(stored):
+    clock = FakeClock()
+    limiter = LoginLimiter(global_burst=3, global_rate=1, clock=clock)
+    verify = CountingVerify(real=lambda p, s: p == "right")
+    for i in range(50): # made-up usernames from many IPs
+        assert not limiter.verify(f"ghost{i}", f"ip{i}", "pw", None, verify)
+    assert limiter.verify("alice", "10.0.0.1", "right", stored, verify)
+    for i in range(2): # the real budget is spent by real hashes only...
+        limiter.verify(f"user{i}", f"10.0.1.{i}", "wrong", stored, verify)
+    with pytest.raises(LoginThrottled) as e: # ...and once it's empty unknown users are refused too
+        limiter.verify("ghost", "10.0.2.1", "pw", None, verify)
+    assert e.value.reason == "global" and verify.calls == 3
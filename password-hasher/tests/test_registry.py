@@ -0,0 +1,59 @@
+import pytest
+import hasher
+import registry
+import secure_hasher
+import secure_hasher2
+
+@pytest.fixture
+def cheap_hashers():
+    cost, ph = secure_hasher.DEFAULT_COST, secure_hasher2.ph
+    secure_hasher.configure(4)
+    secure_hasher2.configure(time_cost=1, memory_cost=1024, parallelism=1)
+    yield
+    secure_hasher.DEFAULT_COST, secure_hasher2.ph = cost, ph
+
+def test_identify_by_prefix(cheap_hashers):
+    assert registry.identify(hasher.hash_password_sha("pw")) == "sha256"
+    assert registry.identify(secure_hasher.hash_password("pw")) == "bcrypt"
+    assert registry.identify(secure_hasher2.hash_password("pw")) == "argon2"
+    for bad in ("plaintext", "$md5$abc", "md5$salt$hash"):
+        with pytest.raises(ValueError):
+            registry.identify(bad)
+
+@pytest.mark.parametrize("make", [hasher.hash_password_sha, secure_hasher.hash_password, secure_hasher2.hash_password])
+def test_verify_every_format(cheap_hashers, make):
+    stored = make("s3cret")
+    assert registry.verify("s3cret", stored)
+    assert not registry.verify("wrong", stored)
+
+def test_parse_is_cached(cheap_hashers):
+    stored = secure_hasher.hash_password("pw")
+    registry.parse.cache_clear()
+    registry.verify("pw", stored)
+    registry.verify("pw", stored)
+    info = registry.parse.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    assert registry.parse(stored).params == 4
+
+def test_malformed_hash_raises():
+    with pytest.raises(ValueError):
+        registry.verify("pw", "sha256$nothex$zz")
+
+def test_sha256_migrates_to_argon2_on_login(cheap_hashers):
+    legacy = hasher.hash_password_sha("pw")
+    assert registry.needs_update(legacy)
+    assert registry.verify_and_migrate("wrong", legacy) == (False, None)
+    ok, new = registry.verify_and_migrate("pw", legacy)
+    assert ok and registry.identify(new) == "argon2"
+    assert secure_hasher2.verify_password("pw", new) # pepper applied like any other Argon2 hash
+    assert registry.verify_and_migrate("pw", new) == (True, None)
+
+def test_outdated_parameters_are_upgraded(cheap_hashers):
+    old = secure_hasher2.hash_password("pw")
+    secure_hasher2.configure(time_cost=2, memory_cost=1024, parallelism=1)
+    ok, new = registry.verify_and_migrate("pw", old)
+    assert ok and not registry.needs_update(new)
+    # bcrypt users move to argon2 unless bcrypt is asked for
+    b = secure_hasher.hash_password("pw")
+    assert registry.needs_update(b)
+    assert not registry.needs_update(b, scheme="bcrypt")
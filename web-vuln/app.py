@@ -6,6 +6,7 @@ from flask_wtf import CSRFProtect
 from flask_wtf.csrf import CSRFError
 from flask_login import LoginManager, UserMixin, login_user, login_required, current_user
 from passlib.hash import bcrypt
+from login_limiter import LoginLimiter, LoginThrottled
 
 
 app = Flask(__name__)
@@ -232,14 +233,25 @@ def signup_safe():
     return render_template("signup_safe.html")
 
 
+# every bcrypt.verify burns ~100ms of CPU: throttle per user/IP *before* hashing
+# (global_rate caps verifies/second for the whole app during a login storm; only
+# attempts on existing users spend it, so a flood of made-up usernames can't lock everyone out)
+login_limiter = LoginLimiter(global_burst=20, global_rate=10)
+
 @app.route("/login_safe", methods=["GET", "POST"])
 def login_safe():
     if request.method == "POST":
-        username = request.form.get("username")
-        password = request.form.get("password")
+        username = request.form.get("username") or ""
+        password = request.form.get("password") or ""
 
         user = User.query.filter_by(username=username).first()
-        if user and bcrypt.verify(password, user.password):   # ✅ hash verify
+        try:
+            # unknown users are charged too, so usernames can't be probed for free
+            ok = login_limiter.verify(username, request.remote_addr or "?", password,
+                                      user.password if user else None, bcrypt.verify)   # ✅ hash verify
+        except LoginThrottled as e:
+            return "⏳ Too many login attempts, try again later", 429, {"Retry-After": str(int(e.retry_after) + 1)}
+        if ok:
             login_user(user)
             return redirect(url_for("dashboard"))
         return "❌ Invalid credentials"